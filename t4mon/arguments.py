@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import sys
 import logging
 import argparse
@@ -86,20 +87,45 @@ def read_config(settings_file=None, **kwargs):
             username =  ; empty: load from ~/.ssh/config
             password =
             ip_or_hostname = ssh-gateway
+            connections = 2  ; parallel SSH transports to this gateway
+
+            [GATEWAY2]
+            ip_or_hostname = ssh-gateway2  ; systems spread across gateways
 
             [MISC]
             calculations_file = calc.cfg
             graphs_definition_file = graphs_list.cfg
             html_template = reports_template.html
             remote_log_cmd = @command_on_destination_host.com
+            parser_processes = 4  ; processes parsing the CSV files
+            parser_backlog = 8  ; files held in memory waiting to be parsed
+            max_workers = 10  ; systems collected at the same time
+            ssh_idle_timeout = 300  ; seconds, close unused SSH connections
+            cache_folder = cache  ; keep the files already downloaded
+            cache_size = 1024  ; MB
+            listing_cache_file = store/listings.db  ; folder listings
+            calculations_scope = graphs  ; only those in the reports
+            calculations_mode = consolidated  ; once for all systems
+            calculation_threads = 4  ; evaluate independent calculations
+            aggregate_by = cluster_id  ; virtual system per value (sum_systems)
+            aggregate_frequency = 5min  ; align the systems' sample times
 
             [CLUSTER1]
             ip_or_hostname = 10.0.1.5
             cluster_id = sys1
+            collection_timeout = 600  ; seconds, give up after this time
+            sftp_channels = 4  ; files downloaded in parallel
+            sftp_prefetch = yes  ; pipelined reads (large files, high latency)
+            sftp_prefetch_window = 64  ; max. concurrent read requests
+            sftp_read_size = 1048576  ; bytes
+            listing_cache_ttl = 3600  ; seconds, reuse folder listings
+            poll_interval = 60  ; seconds between collections (--daemon)
+            gateway = GATEWAY2  ; tunnel always through this gateway
 
             [CLUSTER2]
             ip_or_hostname = 10.0.2.5
             cluster_id = clu2
+            remote_compress_cmd = zip "-jq" {archive} {files}  ; 1 download
 
             [CLUSTER3]
             ip_or_hostname = 10.0.3.5
@@ -119,6 +145,59 @@ def read_config(settings_file=None, **kwargs):
     return config
 
 
+def get_option(conf, section, option, fallback=None, kind=str):
+    """
+    Return the value of an optional setting, ``fallback`` if the option is
+    not configured, empty or cannot be converted to ``kind``
+
+    Arguments:
+        conf (ConfigParser): configuration object
+        section (str): section name, options in DEFAULT section are inherited
+        option (str): option name
+    Keyword Arguments:
+        fallback: value returned when the option is not set
+        kind (type): one of ``str``, ``int``, ``float`` or ``bool``
+    """
+    try:
+        value = conf.get(section, option)
+    except six.moves.configparser.Error:
+        return fallback
+    value = re.split(r'\s[;#]', value)[0].strip()  # drop inline comments
+    if not value:
+        return fallback
+    if kind is bool:
+        return value.lower() in ('1', 'yes', 'true', 'on')
+    try:
+        return kind(value)
+    except ValueError:
+        return fallback
+
+
+def get_gateways(conf):
+    """
+    Return the SSH gateway sections: ``GATEWAY`` and any other one which name
+    starts with it (i.e. ``GATEWAY2``)
+
+    Arguments:
+        conf (ConfigParser): configuration object
+    Return: list
+    """
+    return [section for section in conf.sections()
+            if section.upper().startswith('GATEWAY')]
+
+
+def get_systems(conf):
+    """
+    Return the system sections, i.e. all but ``MISC`` and the gateways
+
+    Arguments:
+        conf (ConfigParser): configuration object
+    Return: list
+    """
+    return [section for section in conf.sections()
+            if section != 'MISC' and section not in get_gateways(conf)]
+
+
 def __check_for_sysargs(parser, args=None):
     """
     Check if relevant parameters were specified or ask the user to proceed
@@ -185,7 +264,7 @@ def _parse_arguments_cli(args=None):
     parser.add_argument('filename', type=str, nargs='?',
                         help=argparse.SUPPRESS)
     parser.add_argument('--system', help=argparse.SUPPRESS)
-    for null_argument in ['help', 'all', 'noreports', 'nologs']:
+    for null_argument in ['help', 'all', 'noreports', 'nologs', 'daemon']:
         parser.add_argument('--{0}'.format(null_argument),
                             action='store_true',
                             help=argparse.SUPPRESS)
@@ -230,6 +309,9 @@ def _parse_arguments_main(args=None):
                              'and stored locally')
     parser.add_argument('--nologs', action='store_true',
                         help='Skip log collection from remote hosts')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep running, collecting data from each host '
+                             'every poll_interval seconds')
     # Hook to bypass (y/n) question when no arguments are passed to CLI parser
     parser.add_argument('--dummy', type=str, nargs='?',
                         help=argparse.SUPPRESS)
@@ -0,0 +1,485 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+"""
+Persistent local cache for the dataframes obtained from remote T4-CSV files
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+import pandas as pd
+from six import BytesIO
+from t4mon import df_tools
+from six.moves import cPickle
+from t4mon.logger import init_logger
+
+__all__ = ('DownloadCache',
+           'FileTail',
+           'ListingCache')
+
+CACHE_EXTENSION = '.pkl'  #: Extension of the cache entries
+TAIL_TAG = 'tail'  #: Distinguishes the :class:`FileTail` entries
+DEFAULT_MAX_SIZE = 1 << 30  #: Default maximum size of the cache (1GB)
+LISTING_MAX_AGE = 7 * 86400  #: Listings not refreshed since then are purged
+
+
+class FileTail(object):
+
+    """
+    Where the parsing of a remote T4-CSV file stopped, so only the bytes
+    appended since then need to be fetched the next time (i.e. today's file,
+    which keeps growing during the day).
+
+    Only complete lines are parsed, the bytes after the last line break are
+    fetched again the next time.
+
+    Attributes:
+        field_names (list): header of the file
+        offset (int): byte offset after the last complete line
+        last_line (bytes): last complete line, used to check the file was
+            not replaced before appending to it
+        last_sample: :const:`t4mon.df_tools.DATETIME_TAG` of the last sample
+        size (int): size of the file when fetched
+        mtime (int): modification time of the file when fetched
+    """
+
+    def __init__(self, field_names, offset, last_line, size, mtime):
+        self.field_names = field_names
+        self.offset = offset
+        self.last_line = last_line
+        self.last_sample = None
+        self.size = size
+        self.mtime = mtime
+
+    @classmethod
+    def from_data(cls, data, size, mtime):
+        """
+        Return the tail of a T4-CSV file given its contents, ``None`` if the
+        file is closed (has a ``Column Average`` footer), has several headers
+        or is not a T4-CSV file
+        """
+        return cls.from_file(BytesIO(data), size, mtime)
+
+    @classmethod
+    def from_file(cls,
+                  file_descriptor,
+                  size,
+                  mtime,
+                  blocksize=df_tools.READ_BLOCKSIZE):
+        """
+        Same as :meth:`from_data` for a seekable file object opened in binary
+        mode, which is scanned by blocks instead of read into memory
+        """
+        try:
+            (field_names, stream) = df_tools._extract_t4csv(file_descriptor,
+                                                            blocksize)
+        except df_tools.ExtractCSVException:
+            return None
+        start = stream.data_offset
+        tags = (df_tools.START_HEADER_TAG_B, df_tools.AVERAGE_TAG_B)
+        overlap = max(len(tag) for tag in tags) - 1
+        file_descriptor.seek(start)
+        block = b''
+        while True:
+            data = file_descriptor.read(blocksize)
+            if not data:
+                break
+            # keep the end of the previous block, a tag may be split
+            block = block[-overlap:] + data
+            if any(tag in block for tag in tags):
+                return None
+        # read back from the end until the last complete line is found
+        file_descriptor.seek(0, os.SEEK_END)
+        position = file_descriptor.tell()
+        data = b''
+        while position > start and data.count(b'\n') < 2:
+            block_start = max(position - blocksize, start)
+            file_descriptor.seek(block_start)
+            data = file_descriptor.read(position - block_start) + data
+            position = block_start
+        end = data.rfind(b'\n') + 1
+        begin = data.rfind(b'\n', 0, max(end - 1, 0)) + 1
+        return cls(field_names,
+                   position + end,
+                   data[begin:end],
+                   size,
+                   mtime)
+
+    @property
+    def start(self):
+        """ Offset where the next fetch starts, from :attr:`last_line` """
+        return self.offset - len(self.last_line)
+
+    def append(self, dataframe, data, size, mtime):
+        """
+        Append to ``dataframe`` (obtained the last time) the samples in
+        ``data``, read from :attr:`start` up to the end of the file.
+
+        Return:
+            ``pandas.DataFrame`` or ``None`` if ``data`` cannot be appended
+            (file was replaced, a new header was found or parsing failed)
+        """
+        if not data.startswith(self.last_line) or \
+           df_tools.START_HEADER_TAG_B in data:
+            return None
+        end = data.rfind(b'\n') + 1
+        if end > len(self.last_line):  # new complete lines
+            try:
+                new_samples = df_tools.to_dataframe(
+                    self.field_names,
+                    df_tools.T4DataStream(BytesIO(data[:end]))
+                )
+            except df_tools.ToDfError:
+                return None
+            if self.last_sample is not None:
+                new_samples = new_samples[
+                    new_samples.index > self.last_sample
+                ]
+            dataframe = pd.concat([dataframe, new_samples])
+            begin = data.rfind(b'\n', 0, end - 1) + 1
+            (self.offset, self.last_line) = (self.start + end,
+                                             data[begin:end])
+        if not dataframe.empty:
+            self.last_sample = dataframe.index.max()
+        (self.size, self.mtime) = (size, mtime)
+        return dataframe
+
+
+class DownloadCache(object):
+
+    """
+    On-disk cache of the dataframes parsed from remote files, so unchanged
+    files are neither downloaded nor parsed again.
+
+    Entries are addressed by a hash of (system, remote path, size, mtime),
+    a file which changed in size or modification time makes a new entry while
+    the old one gets eventually evicted. When the cache grows beyond
+    ``max_size`` bytes, the least recently used entries are removed. The
+    entries are indexed in memory, the folder is only scanned on start.
+
+    The :class:`FileTail` of each file is also kept, so a file which only
+    grew since the last run can be fetched from where it was left.
+
+    Arguments:
+        folder (str): local folder where the cache entries are stored
+    Keyword Arguments:
+        max_size (int): maximum size of the cache in bytes
+        logger (Optional[logging.Logger]): logging instance
+    """
+
+    def __init__(self, folder, max_size=DEFAULT_MAX_SIZE, logger=None):
+        self.folder = folder
+        self.max_size = max_size
+        self.logger = logger or init_logger()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        self._scan()
+
+    def __getstate__(self):
+        """ Method enabling class pickle """
+        odict = self.__dict__.copy()
+        odict['loggername'] = self.logger.name
+        for item in ['logger', '_lock', '_entries', '_size']:
+            del odict[item]
+        return odict
+
+    def __setstate__(self, state):
+        """ Method enabling class pickle """
+        state['logger'] = init_logger(name=state.pop('loggername', None))
+        state['_lock'] = threading.Lock()
+        self.__dict__.update(state)
+        self._scan()
+
+    def __str__(self):
+        return 'Download cache at {0}: {1} hits, {2} misses'.format(
+            self.folder,
+            self.hits,
+            self.misses
+        )
+
+    def _get_filename(self, *key):
+        """ Return the name of the cache entry for a key """
+        key = '|'.join('{0}'.format(item) for item in key)
+        return os.path.join(
+            self.folder,
+            '{0}{1}'.format(hashlib.sha1(key.encode('utf-8')).hexdigest(),
+                            CACHE_EXTENSION)
+        )
+
+    def _scan(self):
+        """ Index the entries found in the cache folder, oldest first """
+        entries = []
+        for filename in os.listdir(self.folder):
+            if not filename.endswith(CACHE_EXTENSION):
+                continue
+            filename = os.path.join(self.folder, filename)
+            try:
+                stat = os.stat(filename)
+            except OSError:  # already removed
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename))
+        with self._lock:
+            self._entries = OrderedDict(
+                (filename, size) for (_, size, filename) in sorted(entries)
+            )
+            self._size = sum(self._entries.values())
+
+    def _touch(self, filename, size):
+        """ Flag an entry as the most recently used, lock must be held """
+        self._size += size - self._entries.pop(filename, 0)
+        self._entries[filename] = size
+
+    def _load(self, filename):
+        """ Return the object stored in a cache entry, ``None`` if missing """
+        try:
+            with open(filename, 'rb') as cache_file:
+                item = cPickle.load(cache_file)
+                size = os.fstat(cache_file.fileno()).st_size
+            os.utime(filename, None)  # flag as most recently used
+        except (IOError, OSError, EOFError, cPickle.UnpicklingError):
+            return None
+        except (AttributeError, ImportError, ValueError) as exc:
+            # stored by another version of pandas or t4mon
+            self.logger.debug('Cannot load cache entry {0}: {1}'
+                              .format(filename, repr(exc)))
+            return None
+        with self._lock:
+            self._touch(filename, size)
+        return item
+
+    def _store(self, item, filename):
+        """ Store an object in a cache entry, return whether it succeeded """
+        try:
+            # write to a temporary file first, other threads may be reading
+            (handle, temp_name) = tempfile.mkstemp(dir=self.folder,
+                                                   suffix='.tmp')
+            with os.fdopen(handle, 'wb') as temp_file:
+                cPickle.dump(item,
+                             temp_file,
+                             protocol=cPickle.HIGHEST_PROTOCOL)
+            if os.path.exists(filename):  # os.rename fails on Windows
+                os.remove(filename)
+            os.rename(temp_name, filename)
+            size = os.path.getsize(filename)
+        except (IOError, OSError, cPickle.PicklingError) as exc:
+            self.logger.error('Could not write to cache: {0}'
+                              .format(repr(exc)))
+            return False
+        with self._lock:
+            self._touch(filename, size)
+        return True
+
+    def get(self, system, path, size, mtime):
+        """
+        Return the dataframe cached for a remote file, ``None`` if not found
+
+        Arguments:
+            system (str): system where the file is located
+            path (str): remote file name
+            size (int): remote file size
+            mtime (int): remote file modification time
+        Return:
+            ``pandas.DataFrame`` or ``None``
+        """
+        dataframe = self._load(
+            self._get_filename(system, path, size, int(mtime))
+        )
+        with self._lock:
+            if dataframe is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self.logger.debug('{0} | Loaded from cache: {1}'.format(system, path))
+        return dataframe
+
+    def put(self, dataframe, system, path, size, mtime):
+        """
+        Store the dataframe obtained from a remote file, then evict the least
+        recently used entries if the cache grew beyond :attr:`max_size`.
+        Empty dataframes are not cached.
+
+        Arguments:
+            dataframe (pandas.DataFrame): dataframe obtained from the file
+            system (str): system where the file is located
+            path (str): remote file name
+            size (int): remote file size
+            mtime (int): remote file modification time
+        """
+        if dataframe is None or dataframe.empty:
+            return
+        if self._store(dataframe,
+                       self._get_filename(system, path, size, int(mtime))):
+            self.evict()
+
+    def discard(self, system, path, size, mtime):
+        """ Remove the dataframe cached for a remote file, if any """
+        filename = self._get_filename(system, path, size, int(mtime))
+        with self._lock:
+            self._size -= self._entries.pop(filename, 0)
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+    def get_tail(self, system, path):
+        """
+        Return the :class:`FileTail` stored for a remote file, ``None`` if
+        not found
+        """
+        return self._load(self._get_filename(system, path, TAIL_TAG))
+
+    def put_tail(self, tail, system, path):
+        """ Store the :class:`FileTail` of a remote file """
+        self._store(tail, self._get_filename(system, path, TAIL_TAG))
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the size of the cache
+        is below :attr:`max_size`
+        """
+        with self._lock:
+            while self._size > self.max_size and self._entries:
+                (filename, size) = self._entries.popitem(last=False)
+                self._size -= size
+                self.logger.debug('Evicting cache entry {0}'.format(filename))
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
+
+
+class ListingCache(object):
+
+    """
+    Persistent cache of the folder listings, kept in a SQLite database so
+    it is shared across runs (i.e. successive cron jobs) and threads.
+
+    Entries are addressed by (system, folder, remote filespec), the same key
+    as :attr:`t4mon.collector.Collector.filecache`. A listing is valid while
+    it is younger than the TTL given when reading it and, if known, the
+    modification time of the folder did not change since it was listed.
+    The database is not created until the first listing is stored.
+
+    Arguments:
+        filename (str): SQLite database file
+    Keyword Arguments:
+        logger (Optional[logging.Logger]): logging instance
+    """
+
+    def __init__(self, filename, logger=None):
+        self.filename = filename
+        self.logger = logger or init_logger()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """ Method enabling class pickle """
+        odict = self.__dict__.copy()
+        odict['loggername'] = self.logger.name
+        for item in ['logger', '_lock']:
+            del odict[item]
+        return odict
+
+    def __setstate__(self, state):
+        """ Method enabling class pickle """
+        state['logger'] = init_logger(name=state.pop('loggername', None))
+        state['_lock'] = threading.Lock()
+        self.__dict__.update(state)
+
+    def __str__(self):
+        return 'Listing cache at {0}: {1} hits, {2} misses'.format(
+            self.filename,
+            self.hits,
+            self.misses
+        )
+
+    @contextmanager
+    def _connect(self):
+        """ Open the database, creating it if needed, commit when done """
+        folder = os.path.dirname(os.path.abspath(self.filename))
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        connection = sqlite3.connect(self.filename, timeout=30.0)
+        try:
+            with connection:  # commit or rollback the transaction
+                connection.execute('CREATE TABLE IF NOT EXISTS listings ('
+                                   'system TEXT, folder TEXT, filespec TEXT, '
+                                   'mtime INTEGER, stamp REAL, files TEXT, '
+                                   'PRIMARY KEY (system, folder, filespec))')
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, key, ttl, mtime=None):
+        """
+        Return the cached listing of a folder, ``None`` if not found, older
+        than ``ttl`` seconds or the folder was modified since it was listed
+
+        Arguments:
+            key (tuple): (system, folder, remote filespec)
+            ttl (float): maximum age of the listing in seconds
+        Keyword Arguments:
+            mtime (Optional[int]):
+                current modification time of the folder, ``None`` if unknown
+        Return:
+            list or ``None``
+        """
+        row = None
+        if os.path.exists(self.filename):
+            try:
+                with self._connect() as connection:
+                    row = connection.execute(
+                        'SELECT files, mtime, stamp FROM listings '
+                        'WHERE system=? AND folder=? AND filespec=?',
+                        key
+                    ).fetchone()
+            except (sqlite3.Error, OSError) as exc:
+                self.logger.warning('Could not read listing cache: {0}'
+                                    .format(repr(exc)))
+        fresh = row is not None and time.time() - row[2] <= ttl
+        valid = fresh and (mtime is None or row[1] in (None, mtime))
+        with self._lock:
+            if not valid:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self.logger.debug('{0} | Using cached listing of {1}'.format(key[0],
+                                                                     key[1]))
+        return json.loads(row[0])
+
+    def put(self, key, files, mtime=None):
+        """
+        Store the listing of a folder, purging the listings not refreshed
+        for :const:`LISTING_MAX_AGE` seconds
+
+        Arguments:
+            key (tuple): (system, folder, remote filespec)
+            files (list): names of the files in the folder
+        Keyword Arguments:
+            mtime (Optional[int]):
+                modification time of the folder, ``None`` if unknown
+        """
+        now = time.time()
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO listings '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    tuple(key) + (mtime, now, json.dumps(list(files)))
+                )
+                connection.execute('DELETE FROM listings WHERE stamp < ?',
+                                   (now - LISTING_MAX_AGE, ))
+        except (sqlite3.Error, OSError) as exc:
+            self.logger.error('Could not write to listing cache: {0}'
+                              .format(repr(exc)))
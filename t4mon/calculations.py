@@ -12,16 +12,71 @@ Note:
         C = (A + B) / B  ; A and B are valid columns
         D = (C + 100.0) / (A + C)  # lines are processed in order
 
+    Operators are applied from left to right, use parenthesis to set the
+    precedence (``A + B * C`` is ``(A + B) * C``).
+
+    Window functions are applied to each system separately, over its
+    samples sorted by time::
+
+        E = delta(A)  ; difference with the previous sample
+        F = rate(A_CUMULATIVE)  ; delta per second
+        G = rolling_mean(A, 12)  ; mean of the last 12 samples
+        H = rolling_max(A + B, 12)  ; maximum of the last 12 samples
+        I = ewm(A, 0.1)  ; exponentially weighted mean, alpha=0.1
+
+    ``delta`` and ``rate`` handle the counters going backwards: as a 32-bit
+    wrap if the previous value was in the upper half of the range, as a
+    reset to zero otherwise.
+
+    Aggregations over the systems make up virtual systems (see
+    :func:`aggregate_calcs`), they must be the whole expression::
+
+        TOTAL_A = sum_systems(A)  ; also mean_, max_ and min_systems
+        PEAK_E = max_systems(E / 300)
+
+The calculations file is compiled once into expression trees (see
+:func:`compile_calcs`), which are evaluated on the column arrays.
 """
 
+import os
 import re
 import sys
+import threading
 from numbers import Number
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+import six
+import numpy as np
+import pandas as pd
+from t4mon.logger import init_logger
 
 TTAG = '__calculations_tmp'  # temporal column names tag
 
+#: Functions for the arithmetic operators allowed in the calculations file
+OPERATORS = {'+': np.add,
+             '-': np.subtract,
+             '*': np.multiply,
+             '/': np.true_divide}
+TOKEN_PATTERN = re.compile(r'\s*(?:([+\-*/(),])|([^\s+\-*/(),]+))')
+COUNTER_WRAP = 2 ** 32  #: counters wrap to zero after this value
+COMMENTS_PATTERN = re.compile(r'^([^#]*)[#;](.*)$')
+
+#: Aggregations over the systems allowed in the calculations file,
+#: ``{name: pandas aggregation}``
+AGGREGATES = {'sum_systems': 'sum',
+              'mean_systems': 'mean',
+              'max_systems': 'max',
+              'min_systems': 'min'}
+AGGREGATE_SYSTEM = 'ALL'  #: virtual system aggregating all the systems
 
-__all__ = ('apply_calcs', 'clean_calcs')
+_TIME_ORDER = ('time order', )  # key of the sample order in the arrays
+_PLANS = {}  # compiled calculation files: {filename: (signature, plan)}
+_PLANS_LOCK = threading.Lock()
+
+
+__all__ = ('aggregate_calcs', 'apply_calcs', 'clean_calcs', 'compile_calcs',
+           'CalcPlan')
 
 
 def oper(self, oper1, funct, oper2):
@@ -154,7 +209,535 @@ def clean_comments(line, pattern=None):
         return line.strip()
 
 
-def apply_calcs(dataframe, calc_file, system=None):
+def _delta(values, times):
+    """ Difference with the previous sample, handling wraps and resets """
+    current = values[1:]
+    previous = values[:-1]
+    delta = current - previous
+    backwards = delta < 0
+    wrapped = backwards & (previous >= COUNTER_WRAP // 2) & \
+        (previous < COUNTER_WRAP)
+    reset = backwards & ~wrapped
+    delta[wrapped] += COUNTER_WRAP
+    delta[reset] = current[reset]  # counted again from zero
+    return np.concatenate(([np.nan], delta))
+
+
+def _rate(values, times):
+    """ Difference with the previous sample per second """
+    seconds = np.diff(np.asarray(times, dtype='datetime64[ns]')
+                      .astype('int64')) / 1e9
+    seconds[seconds <= 0] = np.nan
+    return _delta(values, times) / np.concatenate(([np.nan], seconds))
+
+
+def _rolling_mean(values, times, window):
+    """ Mean of the last ``window`` samples """
+    return pd.Series(values).rolling(int(window), min_periods=1).mean().values
+
+
+def _rolling_max(values, times, window):
+    """ Maximum of the last ``window`` samples """
+    return pd.Series(values).rolling(int(window), min_periods=1).max().values
+
+
+def _ewm(values, times, alpha):
+    """ Exponentially weighted mean with smoothing factor ``alpha`` """
+    return pd.Series(values).ewm(alpha=alpha).mean().values
+
+
+#: Window functions allowed in the calculations file, ``{name: (function,
+#: number of arguments)}``, each function called with the values and times
+#: of a system sorted by time followed by the rest of arguments
+FUNCTIONS = {'delta': (_delta, 1),
+             'rate': (_rate, 1),
+             'rolling_mean': (_rolling_mean, 2),
+             'rolling_max': (_rolling_max, 2),
+             'ewm': (_ewm, 2)}
+
+
+class CalcPlan(object):
+
+    """
+    Calculations file compiled into expression trees, evaluated straight on
+    the column arrays of a dataframe: the intermediate results are kept in
+    scratch arrays instead of temporary columns.
+
+    An expression tree is made of tuples: ``('num', value)``,
+    ``('col', name)`` for the dataframe columns, ``('ref', index)`` for the
+    result of a previous calculation, ``('op', operator, left_tree,
+    right_tree)``, ``('call', function, argument_trees...)`` or
+    ``('agg', aggregation, argument_tree)``. The ``ref`` nodes make up the
+    dependency graph, so a subset of the calculations can be evaluated (see
+    :meth:`required`).
+
+    Aggregations over the systems are not evaluated with the rest of
+    calculations but afterwards by :meth:`aggregate`, and their results
+    cannot be used by other calculations.
+
+    Arguments:
+        calcs (list): ``(result column, expression tree)`` in file order, the
+            tree is ``None`` for the expressions which could not be parsed
+
+    Attributes:
+        calcs (list): calculations as passed to ``calcs`` argument, with the
+            names of previous results replaced by ``ref`` nodes
+        dependencies (list): indices of the calculations used by each one
+        inputs (list): dataframe columns used by each calculation
+        aggregates (set): indices of the aggregations over the systems
+    """
+
+    def __init__(self, calcs):
+        self.calcs = []
+        self.dependencies = []
+        self.inputs = []
+        self.aggregates = set()
+        self._reported = set()  # missing columns already reported
+        last_index = {}  # position of the last calculation of each result
+        for (index, (result, tree)) in enumerate(calcs):
+            tree = _resolve(tree, last_index)
+            references = list(_references(tree))
+            self.calcs.append((result, tree))
+            self.dependencies.append(set(reference for reference in references
+                                         if isinstance(reference, int)))
+            self.inputs.append(set(reference for reference in references
+                                   if not isinstance(reference, int)))
+            if tree and tree[0] == 'agg':
+                self.aggregates.add(index)
+            else:
+                last_index[result] = index
+
+    def __len__(self):
+        return len(self.calcs)
+
+    def required(self, variables):
+        """
+        Return the positions of the calculations whose results match any of
+        ``variables`` (partial column names as in the graphs definition file,
+        case insensitive) together with the ones they depend on
+
+        Arguments:
+            variables (list): regular expressions matching column names
+        Return: set
+        """
+        try:
+            regex = re.compile('^.*({0}).*$'.format('|'.join(variables)),
+                               re.IGNORECASE)
+        except re.error:
+            return set(range(len(self.calcs)))
+        return self._closure(index for (index, (result, _))
+                             in enumerate(self.calcs) if regex.search(result))
+
+    def _closure(self, selection):
+        """ Add to the selected calculations all the ones they depend on """
+        pending = list(selection)
+        selection = set()
+        while pending:
+            index = pending.pop()
+            if index not in selection:
+                selection.add(index)
+                pending.extend(self.dependencies[index])
+        return selection
+
+    def evaluate(self, dataframe, logger=None, system=None, selection=None,
+                 threads=1):
+        """
+        Evaluate the calculations, in order, on a dataframe
+
+        Arguments:
+            dataframe (pandas.DataFrame): dataframe with the input columns
+        Keyword Arguments:
+            logger (Optional[logging.Logger]): logging instance
+            system (Optional[str]): system name, only used for logging
+            selection (Optional[set]): positions of the calculations to
+                evaluate (see :meth:`required`), all if ``None``
+            threads (int): evaluate independent calculations in parallel
+        Return:
+            ``OrderedDict`` of ``{result column: numpy array or float}``
+        """
+        logger = logger or init_logger()
+        prefix = '{0} | '.format(system) if system else ''
+        indices = sorted(set(range(len(self.calcs)) if selection is None
+                             else self._closure(selection)) - self.aggregates)
+        missing = set().union(*[self.inputs[index] for index in indices]) - \
+            set(dataframe.columns)
+        if missing - self._reported:
+            logger.warning('{0}Columns not found in dataset, the calculations '
+                           'using them will be NaN: {1}'.format(
+                               prefix,
+                               ', '.join(sorted(missing - self._reported))
+                           ))
+            self._reported.update(missing)
+        arrays = {}  # input columns already converted
+        values = {}  # result of each calculation
+
+        def _run(index):
+            (result, tree) = self.calcs[index]
+            value = float('NaN')
+            if tree and not self.inputs[index] & missing:
+                try:
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        (value, scratch) = _evaluate(tree,
+                                                     dataframe,
+                                                     arrays,
+                                                     values)
+                    if isinstance(value, np.ndarray) and not scratch:
+                        value = value.copy()  # i.e. 'D = A'
+                except (KeyError, TypeError, ValueError) as exc:
+                    logger.warning('{0}Might be an error in the equation, {1} '
+                                   'is NaN ({2})'.format(prefix,
+                                                         result,
+                                                         repr(exc)))
+            values[index] = value
+
+        if threads > 1:
+            pool = ThreadPool(processes=threads)
+            try:
+                pending = indices
+                while pending:  # independent calculations at once
+                    ready = [index for index in pending
+                             if self.dependencies[index] <= set(values)]
+                    pool.map(_run, ready)
+                    pending = [index for index in pending
+                               if index not in values]
+            finally:
+                pool.close()
+        else:
+            for index in indices:
+                _run(index)
+        results = OrderedDict()
+        for index in indices:
+            results[self.calcs[index][0]] = values[index]
+        return results
+
+    def aggregate(self, dataframe, groups=None, freq=None, logger=None,
+                  selection=None):
+        """
+        Evaluate the aggregations over the systems on a ``(Sample Time,
+        system)`` dataframe where the rest of calculations were applied
+
+        The values of each system are first averaged by sample time (aligned
+        to ``freq`` if given), then aggregated over the systems of each
+        group with a single ``groupby``.
+
+        Arguments:
+            dataframe (pandas.DataFrame): consolidated data
+        Keyword Arguments:
+            groups (Optional[dict]): ``{system: virtual system}``, systems not
+                listed are left out. All systems are aggregated as
+                :const:`AGGREGATE_SYSTEM` if ``None``
+            freq (Optional[str]): align the sample times of the systems to
+                this frequency (i.e. ``5min``)
+            logger (Optional[logging.Logger]): logging instance
+            selection (Optional[set]): positions of the calculations to
+                evaluate (see :meth:`required`), all if ``None``
+        Return:
+            ``pandas.DataFrame`` with the rows of the virtual systems
+        """
+        logger = logger or init_logger()
+        indices = sorted(self.aggregates if selection is None
+                         else self.aggregates & self._closure(selection))
+        if not indices or dataframe.empty:
+            return pd.DataFrame()
+        if 'system' not in dataframe.index.names:
+            logger.warning('Aggregations over the systems need the '
+                           'consolidated data, skipped')
+            return pd.DataFrame()
+        arrays = {}
+        values = dict(  # the rest of calculations are columns by now
+            (index, np.asarray(dataframe[self.calcs[index][0]], dtype=float))
+            for index in self._closure(indices) - self.aggregates
+            if self.calcs[index][0] in dataframe
+        )
+        columns = OrderedDict()
+        aggregations = {}
+        for index in indices:
+            (result, (_, name, tree)) = self.calcs[index]
+            try:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    (value, _) = _evaluate(tree, dataframe, arrays, values)
+            except (KeyError, TypeError, ValueError) as exc:
+                logger.warning('Might be an error in the equation, {0} is '
+                               'NaN ({1})'.format(result, repr(exc)))
+                value = float('NaN')
+            columns[result] = np.broadcast_to(value, (len(dataframe), ))
+            aggregations[result] = AGGREGATES[name]
+        times = dataframe.index.get_level_values(0)
+        if freq:
+            times = times.floor(freq)
+        systems = dataframe.index.get_level_values('system')
+        virtual = [AGGREGATE_SYSTEM] * len(systems) if groups is None \
+            else [groups.get(system) for system in systems]
+        by_system = pd.DataFrame(columns).groupby([times,
+                                                   virtual,
+                                                   systems]).mean()
+        aggregated = by_system.groupby(level=[0, 1]).agg(aggregations)
+        aggregated.index.names = [dataframe.index.names[0], 'system']
+        return aggregated[list(columns)]
+
+
+def _resolve(tree, last_index):
+    """
+    Replace the column names which are results of previous calculations by
+    ``ref`` nodes
+    """
+    if not tree or tree[0] == 'num':
+        return tree
+    if tree[0] == 'col':
+        return ('ref', last_index[tree[1]]) if tree[1] in last_index \
+            else tree
+    return tree[:2] + tuple(_resolve(subtree, last_index)
+                            for subtree in tree[2:])
+
+
+def _has_aggregate(tree):
+    """ Whether there is an aggregation over the systems in a tree """
+    if not tree or tree[0] in ('num', 'col', 'ref'):
+        return False
+    return tree[0] == 'agg' or any(_has_aggregate(subtree)
+                                   for subtree in tree[2:])
+
+
+def _references(tree):
+    """
+    Yield the column names (``str``) and previous calculations (``int``)
+    used in an expression tree
+    """
+    if not tree or tree[0] == 'num':
+        return
+    if tree[0] in ('col', 'ref'):
+        yield tree[1]
+        return
+    for subtree in tree[2:]:
+        for reference in _references(subtree):
+            yield reference
+
+
+def _tokenize(expression):
+    """ Split an expression into operators, parenthesis and operands """
+    expression = expression.strip()
+    tokens = []
+    position = 0
+    while position < len(expression):
+        match = TOKEN_PATTERN.match(expression, position)
+        tokens.append(match.group(1) or match.group(2))
+        position = match.end()
+    return tokens
+
+
+def _parse(expression):
+    """
+    Return the expression tree for an expression, ``ValueError`` if the
+    syntax is not valid
+    """
+    tokens = _tokenize(expression)
+    (tree, position) = _parse_expression(tokens, 0)
+    if position < len(tokens):
+        raise ValueError('unexpected {0}'.format(repr(tokens[position])))
+    if _has_aggregate(tree[2] if tree[0] == 'agg' else tree):
+        raise ValueError('aggregations over the systems must be the whole '
+                         'expression')
+    return tree
+
+
+def _parse_expression(tokens, position):
+    """ Parse operands joined by operators, from left to right """
+    (tree, position) = _parse_operand(tokens, position)
+    while position < len(tokens) and tokens[position] in OPERATORS:
+        (right, next_position) = _parse_operand(tokens, position + 1)
+        tree = ('op', tokens[position], tree, right)
+        position = next_position
+    return (tree, position)
+
+
+def _parse_operand(tokens, position):
+    """ Parse a number, a column name or an expression in parenthesis """
+    if position >= len(tokens):
+        raise ValueError('unexpected end of expression')
+    token = tokens[position]
+    if token == '(':
+        (tree, position) = _parse_expression(tokens, position + 1)
+        if position >= len(tokens) or tokens[position] != ')':
+            raise ValueError('missing closing parenthesis')
+        return (tree, position + 1)
+    if token in OPERATORS or token in '),':
+        raise ValueError('unexpected {0}'.format(repr(token)))
+    if tokens[position + 1:position + 2] == ['(']:
+        return _parse_call(tokens, position)
+    try:
+        return (('num', float(token)), position + 1)
+    except ValueError:
+        return (('col', token), position + 1)
+
+
+def _parse_call(tokens, position):
+    """ Parse a function call: name, parenthesis and arguments """
+    name = tokens[position]
+    if name not in FUNCTIONS and name not in AGGREGATES:
+        raise ValueError('unknown function {0}'.format(repr(name)))
+    arguments = []
+    position += 1
+    while position < len(tokens) and tokens[position] in '(,':
+        (argument, position) = _parse_expression(tokens, position + 1)
+        arguments.append(argument)
+    if position >= len(tokens) or tokens[position] != ')':
+        raise ValueError('missing closing parenthesis')
+    (_, arity) = FUNCTIONS.get(name, (None, 1))
+    if len(arguments) != arity:
+        raise ValueError('{0} takes {1} arguments'.format(name, arity))
+    node = ('agg' if name in AGGREGATES else 'call', name)
+    return (node + tuple(arguments), position + 1)
+
+
+def _evaluate(tree, dataframe, arrays, values):
+    """
+    Evaluate an expression tree, return ``(value, scratch)`` where ``scratch``
+    tells whether value is an intermediate array which can be overwritten
+    """
+    if tree[0] == 'num':
+        return (tree[1], False)
+    if tree[0] == 'ref':
+        return (values[tree[1]], False)
+    if tree[0] == 'col':
+        if tree[1] not in arrays:
+            arrays[tree[1]] = np.asarray(dataframe[tree[1]], dtype=float)
+        return (arrays[tree[1]], False)
+    if tree[0] == 'call':
+        arguments = [_evaluate(subtree, dataframe, arrays, values)[0]
+                     for subtree in tree[2:]]
+        return (_window(tree[1], dataframe, arrays, *arguments), True)
+    (_, funct, left, right) = tree
+    (oper1, scratch1) = _evaluate(left, dataframe, arrays, values)
+    (oper2, scratch2) = _evaluate(right, dataframe, arrays, values)
+    out = oper1 if scratch1 else oper2 if scratch2 else None
+    if out is None:
+        value = OPERATORS[funct](oper1, oper2)
+        return (value, isinstance(value, np.ndarray))
+    return (OPERATORS[funct](oper1, oper2, out=out), True)
+
+
+def _window(name, dataframe, arrays, values, *parameters):
+    """
+    Apply a window function to each system's values, sorted by time
+    """
+    if not all(isinstance(parameter, Number) for parameter in parameters):
+        raise ValueError('{0} parameters must be numbers'.format(name))
+    if _TIME_ORDER not in arrays:
+        arrays[_TIME_ORDER] = _time_order(dataframe.index)
+    (order, bounds, times) = arrays[_TIME_ORDER]
+    values = np.broadcast_to(values, (len(order), ))[order]
+    result = np.empty(len(order))
+    (function, _) = FUNCTIONS[name]
+    for (start, end) in bounds:
+        if end > start:
+            result[order[start:end]] = function(values[start:end],
+                                                times[start:end],
+                                                *parameters)
+    return result
+
+
+def _time_order(index):
+    """
+    Return the positions of the samples sorted by system and time, the
+    ``(start, end)`` bounds of each system in that order and the sorted times
+
+    Arguments:
+        index (pandas.Index): time index or ``(time, system)`` MultiIndex
+    """
+    if isinstance(index, pd.MultiIndex):
+        times = np.asarray(index.get_level_values(0))
+        systems = pd.factorize(index.get_level_values('system'))[0]
+        order = np.lexsort((times, systems))
+        changes = np.flatnonzero(np.diff(systems[order])) + 1
+    else:
+        times = np.asarray(index)
+        order = np.argsort(times, kind='mergesort')
+        changes = np.array([], dtype=int)
+    starts = np.concatenate(([0], changes))
+    ends = np.concatenate((changes, [len(order)]))
+    return (order, list(zip(starts, ends)), times[order])
+
+
+def compile_calcs(calc_file, logger=None):
+    """
+    Return the :class:`CalcPlan` for a calculations file, compiled again
+    only if the file was modified since the last call
+
+    Arguments:
+        calc_file (str): Calculations filename
+    Keyword Arguments:
+        logger (Optional[logging.Logger]): logging instance
+    Return: :class:`CalcPlan`
+    """
+    logger = logger or init_logger()
+    calc_file = os.path.abspath(calc_file)
+    stat = os.stat(calc_file)
+    signature = (stat.st_mtime, stat.st_size)
+    with _PLANS_LOCK:
+        (cached_signature, plan) = _PLANS.get(calc_file, (None, None))
+        if cached_signature != signature:
+            plan = _compile(calc_file, logger)
+            _PLANS[calc_file] = (signature, plan)
+    return plan
+
+
+def _compile(calc_file, logger):
+    """
+    Parse all lines of a calculations file into a :class:`CalcPlan`,
+    reporting the results used before being calculated
+    """
+    calcs = []
+    with open(calc_file, 'r') as calcfile:
+        for line in calcfile:
+            line = clean_comments(line, COMMENTS_PATTERN)
+            if not line:
+                continue
+            (result, equal_sign, expression) = line.partition('=')
+            result = result.strip()
+            if not equal_sign or not result:
+                logger.warning('Skipping calculation, not like '
+                               '"result = expression": {0}'.format(line))
+                continue
+            try:
+                calcs.append((result, _parse(expression)))
+            except ValueError as exc:
+                logger.warning('Might be an error in the equation, {0} will '
+                               'be NaN ({1})'.format(result, exc))
+                calcs.append((result, None))
+    plan = CalcPlan(calcs)
+    for (index, (result, _)) in enumerate(plan.calcs):
+        for later in plan.inputs[index] & set(name for (name, _)
+                                              in plan.calcs[index + 1:]):
+            logger.warning('{0} is used by {1} before being calculated'
+                           .format(later, result))
+    logger.debug('Compiled {0} calculations from {1}'
+                 .format(len(plan), calc_file))
+    return plan
+
+
+def _assign_columns(dataframe, results):
+    """
+    Write the calculation results to the dataframe, the new columns all at
+    once
+    """
+    new_columns = [column for column in results if column not in dataframe]
+    for column in results:
+        if column not in new_columns:
+            dataframe[column] = results[column]
+    if not new_columns:
+        return
+    values = np.empty((len(dataframe), len(new_columns)))
+    for (position, column) in enumerate(new_columns):
+        values[:, position] = results[column]
+    try:
+        dataframe[new_columns] = values
+    except KeyError:  # older pandas cannot add several columns at once
+        for (position, column) in enumerate(new_columns):
+            dataframe[column] = values[:, position]
+
+
+def apply_calcs(dataframe, calc_file, system=None, variables=None,
+                threads=1):
     """
     Apply inplace calculations to dataframe as specified by ``calc_file``
     entries
@@ -164,30 +747,61 @@ def apply_calcs(dataframe, calc_file, system=None):
         calc_file (str): Calculations filename
     Keyword Arguments:
         system (Optional[str]): System name, only used for logging purposes
+        variables (Optional[list]): only the calculations needed for the
+            columns matching these partial names (i.e. those in the graphs
+            definition file), all of them if ``None``
+        threads (int): threads evaluating the independent calculations
     """
     try:
-        # Define regex patterns
-        arithmetic_pattern = re.compile(r'([+\-*/])')  # allowed functions
-        parenthesis_pattern = re.compile(r'.*\(+([\w .+\-*/]+)\)+.*')
-        comments_pattern = re.compile(r'^([^#]*)[#;](.*)$')
-        with open(calc_file, 'r') as calcfile:
-            for line in calcfile:
-                line = clean_comments(line, comments_pattern)
-                if not line:
-                    continue
-                dataframe.logger.debug('{0}Processing: {1}'.format(
-                    '{0} | '.format(system) if system else '',
-                    line
-                ))
-                dataframe.recursive_lis(arithmetic_pattern,
-                                        parenthesis_pattern,
-                                        *line.split('='))
-        # Delete temporary columns (starting with TTAG)
-        for colname in dataframe.columns[[TTAG in col for col in dataframe]]:
-            del dataframe[colname]
-    except IOError:
+        plan = compile_calcs(calc_file, logger=dataframe.logger)
+    except (IOError, OSError):
+        dataframe.logger.error("Could not process calculation file: {0}"
+                               .format(calc_file))
+        return
+    selection = plan.required(variables) if variables else None
+    dataframe.logger.debug('{0}Applying {1} of {2} calculations'.format(
+        '{0} | '.format(system) if system else '',
+        len(plan) if selection is None else len(selection),
+        len(plan)
+    ))
+    _assign_columns(dataframe,
+                    plan.evaluate(dataframe,
+                                  dataframe.logger,
+                                  system,
+                                  selection=selection,
+                                  threads=threads))
+
+
+def aggregate_calcs(dataframe, calc_file, groups=None, freq=None,
+                    variables=None):
+    """
+    Return the virtual systems made up by the aggregations over the systems
+    (``sum_systems``, ...) in ``calc_file``, evaluated on consolidated data
+    where :func:`apply_calcs` was already run
+
+    Arguments:
+        dataframe (pandas.Dataframe): ``(Sample Time, system)`` dataframe
+        calc_file (str): Calculations filename
+    Keyword Arguments:
+        groups (Optional[dict]): ``{system: virtual system}``, all systems
+            aggregated as :const:`AGGREGATE_SYSTEM` if ``None``
+        freq (Optional[str]): align the sample times to this frequency
+        variables (Optional[list]): as in :func:`apply_calcs`
+    Return:
+        ``pandas.DataFrame``
+    """
+    try:
+        plan = compile_calcs(calc_file, logger=dataframe.logger)
+    except (IOError, OSError):
         dataframe.logger.error("Could not process calculation file: {0}"
                                .format(calc_file))
+        return pd.DataFrame()
+    return plan.aggregate(dataframe,
+                          groups=groups,
+                          freq=freq,
+                          logger=dataframe.logger,
+                          selection=plan.required(variables) if variables
+                          else None)
 
 
 def clean_calcs(dataframe, calc_file):
@@ -20,28 +20,41 @@
 import os
 import re
 import gzip
+import time
+import shutil
 import zipfile
-import datetime as dt
 import tempfile
+import datetime as dt
 import threading
+from collections import OrderedDict
 from contextlib import contextmanager
+from multiprocessing import Pool
 
 import six
 
 import tqdm
 import pandas as pd
 import sshtunnel
-from t4mon import df_tools, gen_plot, arguments, calculations
-from paramiko import SFTPClient, SSHException
+from t4mon import df_tools, gen_plot, arguments, gen_report, calculations
+from paramiko import SSHException
 from six.moves import queue, cPickle, builtins, cStringIO
+from t4mon.cache import FileTail, ListingCache, DownloadCache
 from t4mon.logger import init_logger
-from t4mon.sftpsession import SftpSession, SFTPSessionError
+from t4mon.sftpsession import SftpSession, SftpSessionPool, SFTPSessionError
 
 __all__ = ('add_methods_to_pandas_dataframe',
            'Collector',
            'load_zipfile',
            'read_pickle')
 
+#: Wildcard file specifications which can be passed to the remote listing
+VMS_FILESPEC = re.compile(r'^[\w$*-]+\.[\w$*-]+$')
+DEFAULT_POLL_INTERVAL = 300.0  #: Seconds between collections in daemon mode
+POLL_TICK = 1.0  #: Seconds between checks for due systems in daemon mode
+#: Seconds a cancelled worker keeps counting against ``MISC/max_workers``
+CANCEL_GRACE = 30.0
+#: Maximum length of the remote commands, as DCL limits the command line
+MAX_COMMAND_LENGTH = 1000
 # Avoid using locale in Linux+Windows environments, keep these lowercase
 MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
           'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
@@ -82,6 +95,39 @@ def get_filename(filespec):
     return filespec.strip().split(separator)[-1]
 
 
+def get_remote_filespec(spec_list):
+    """
+    Return a wildcard file specification for the remote (OpenVMS) directory
+    listing, so only files likely to match every item in ``spec_list`` are
+    listed, i.e. ``['.csv', '17oct2015', 'sys1']`` -> ``*17OCT2015*.*``.
+    Files are filtered afterwards anyway, so this may be less strict.
+
+    The ``.csv`` extension is not used, since CSV files may be compressed
+    (i.e. ``x.csv.gz``, the OpenVMS file type of which is ``.GZ``).
+    """
+    spec_list = [item for item in spec_list if item]
+    extensions = [item for item in spec_list
+                  if item.startswith('.') and item.lower() != '.csv']
+    tags = sorted((item for item in spec_list if not item.startswith('.')),
+                  key=len)
+    filespec = '*{0}*{1}'.format(tags[-1] if tags else '',
+                                 extensions[0] if extensions else '.*')
+    filespec = filespec.replace('**', '*').upper()
+    return filespec if VMS_FILESPEC.match(filespec) else '*.*'
+
+
+def get_hostname_from_filename(filename):
+    """
+    Try to infer the hostname from a T4 archive file name, i.e.
+    ``t4_host1_xxx_2015_0101_xxx.zip``. Return ``None`` if not found.
+    """
+    regex = r't4_(\w+)[0-9]_\w+_[0-9]{{4}}_[0-9]{{4}}_\w+.{0}'.format(
+        os.path.splitext(filename)[-1]
+    )
+    match = re.search(regex, filename)
+    return match.groups()[0] if match else None
+
+
 def is_running_from_ipython():
     try:
         from IPython import get_ipython
@@ -90,6 +136,137 @@ def is_running_from_ipython():
         return false
 
 
+class TunnelGroup(object):
+
+    """
+    SSH tunnels opened through one or several gateway connections, each one
+    an ``sshtunnel.SSHTunnelForwarder`` with its own SSH transport, used as a
+    single tunnel server (see :meth:`Collector.init_tunnels`)
+
+    Attributes:
+        servers (list): ``SSHTunnelForwarder`` instances
+        tunnelports (dict): local tunnel port for each system
+    """
+
+    def __init__(self):
+        self.servers = []
+        self.tunnelports = {}
+
+    def add(self, server, systems, gateway=None):
+        """
+        Add a (started) tunnel server with the tunnels for several systems
+
+        Arguments:
+            server (sshtunnel.SSHTunnelForwarder): tunnel server
+            systems (list): systems in the same order as the tunnels
+        Keyword Arguments:
+            gateway (Optional[str]): gateway section of the server
+        """
+        server.gateway = gateway
+        server.systems = list(systems)
+        server.tunnelports = dict(zip(systems, server.local_bind_ports))
+        self.servers.append(server)
+        self.tunnelports.update(server.tunnelports)
+
+    def replace(self, server, new_server):
+        """
+        Replace a tunnel server (i.e. its gateway connection went down) with
+        a new one for the same systems
+        """
+        self.servers.remove(server)
+        self.add(new_server, server.systems, server.gateway)
+
+    @property
+    def is_alive(self):
+        """ Whether all the gateway connections are up """
+        return bool(self.servers) and \
+            all(server.is_alive for server in self.servers)
+
+    @property
+    def tunnel_is_up(self):
+        """ ``{local address: bool}`` for the tunnels of all servers """
+        tunnel_is_up = {}
+        for server in self.servers:
+            tunnel_is_up.update(server.tunnel_is_up)
+        return tunnel_is_up
+
+    def start(self):
+        """ Start all the tunnel servers """
+        for server in self.servers:
+            server.start()
+
+    def stop(self):
+        """ Stop all the tunnel servers """
+        for server in self.servers:
+            server.stop()
+
+
+class FileIndex(object):
+
+    """
+    Index of the names of the files in a folder, built once per listing so
+    :meth:`Collector.files_lookup` does not normalize and scan every name
+    for every filter item on each call (slow for archives with many files).
+
+    Names are upper-cased once. The names matching each filter item (an
+    extension, date tag, cluster ID...) are searched for only the first
+    time the item is used and kept in the index, so successive lookups
+    (i.e. for other systems or for a range of days) are set intersections.
+
+    Arguments:
+        names (list): file names in the folder
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._upper = [name.upper() for name in self.names]
+        self._matches = {}  # filter item: positions of the matching names
+
+    def __eq__(self, other):
+        return isinstance(other, FileIndex) and self.names == other.names
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _lookup(self, item):
+        """ Return the positions of the names containing ``item`` """
+        item = item.upper()
+        if item not in self._matches:
+            self._matches[item] = set(
+                position for (position, name) in enumerate(self._upper)
+                if item in name
+            )
+        return self._matches[item]
+
+    def match(self, spec_list, any_of=None):
+        """
+        Return the names containing every item in ``spec_list`` (case
+        insensitive), in the same order as listed
+
+        Arguments:
+            spec_list (list): filter items, i.e. ``['.csv', 'sys1']``
+        Keyword Arguments:
+            any_of (Optional[list]):
+                names must also contain at least one of these items, i.e.
+                the date tags of a range of days
+        Return:
+            list
+        """
+        positions = set(range(len(self.names)))
+        for item in spec_list:
+            positions &= self._lookup(item)
+        if any_of is not None:
+            positions &= set().union(*[self._lookup(item)
+                                       for item in any_of])
+        return [self.names[position] for position in sorted(positions)]
+
+
 class Collector(object):
 
     """
@@ -158,9 +335,22 @@ class Collector(object):
 
         filecache (dict):
             (key, value) dictionary containting for each remote folder for a
-            system (key=(system, folder)), the list of files (value) in the
-            remote system (or localfs if working locally) cached to avoid
-            doing sucessive file lookups (slow when number of files is high).
+            system (key=(system, folder, remote filespec)), the
+            :class:`FileIndex` of the files (value) in the remote system (or
+            localfs if working locally) cached to avoid doing sucessive file
+            lookups (slow when number of files is high).
+            Default: empty dict
+
+        listing_cache (t4mon.cache.ListingCache):
+            Persistent counterpart of :attr:`filecache`, shared across runs,
+            used for the systems with a ``listing_cache_ttl`` (seconds) set.
+            Stored in ``MISC/listing_cache_file``, defaults to
+            ``listings.db`` in ``MISC/store_folder``.
+
+        fileattrs (dict):
+            Size and modification time of the remote files (value) listed by
+            the last file lookup, for each (system, file) (key), so they do
+            not need to be requested again before downloading the files.
             Default: empty dict
 
         logger (Optional[logging.Logger]):
@@ -179,17 +369,26 @@ class Collector(object):
             Default: ``False``
 
         results_queue (queue.Queue)
-            Queue containing the system IDs which data collection is ready.
+            Queue containing ``(system ID, dataframe)`` tuples for the systems
+            which data collection is ready. :attr:`data` is built from these
+            results once all systems are done. Each run of
+            :meth:`_run_systemwide` has its own queue, which is the one its
+            worker threads see here.
             Default: empty ``Queue`` object
 
         safe (boolean):
             Define the mode (safe vs threaded) for most of this class methods.
             Default: ``False``
 
-        server (SSHTunnel.SSHTunnelForwarder):
-            Object representing the tunnel server.
+        server (TunnelGroup):
+            Object representing the tunnel servers, one per gateway
+            connection.
             Default: ``None``
 
+        session_pool (t4mon.sftpsession.SftpSessionPool):
+            SSH connections reused by the SFTP sessions to each system, i.e.
+            when collecting the data for several days.
+
         settings_file(str):
             Name of the file containing the settings
             Default: :const:`t4mon.arguments.DEFAULT_SETTINGS_FILE`
@@ -199,6 +398,12 @@ class Collector(object):
             sections.
             Default: empty list
 
+        virtual_systems (list):
+            Systems made up by the aggregations over the systems in the
+            calculations file (i.e. ``sum_systems``), grouped by the value of
+            their ``MISC/aggregate_by`` setting.
+            Default: empty list
+
       Examples:
 
         >>> with Collector(**options) as col:
@@ -224,15 +429,25 @@ class Collector(object):
         self.conf = arguments.read_config(settings_file)
         self.data = pd.DataFrame()
         self.filecache = {}
+        self.fileattrs = {}  # (system, file): (size, mtime), see files_lookup
         self.logger = logger or init_logger(loglevel)
         self.logs = {}
         self.nologs = nologs
-        self.results_queue = queue.Queue()
+        self._results_queue = queue.Queue()
         self.safe = safe
         self.settings_file = settings_file or arguments.DEFAULT_SETTINGS_FILE
         self.server = None
-        self.systems = [item for item in self.conf.sections()
-                        if item not in ['GATEWAY', 'MISC']]
+        self.systems = arguments.get_systems(self.conf)
+        self.virtual_systems = []
+        self._active_sessions = {}  # {system: [open sessions, channels]}
+        # cancelled workers not returned yet, as (thread, release time)
+        self._hung_workers = []
+        self._worker = threading.local()  # results queue of a worker
+        self._parser_pool = None  # CSV parsing processes, see start()
+        self._parser_slots = None  # files allowed to wait for the pool
+        self.download_cache = self._init_download_cache()
+        self.listing_cache = self._init_listing_cache()
+        self.session_pool = self._init_session_pool()
         add_methods_to_pandas_dataframe(self.logger)
 
     def __enter__(self, system=None):
@@ -258,6 +473,63 @@ class Collector(object):
                           )
                 )
 
+    def _init_download_cache(self):
+        """
+        Return the cache of downloaded files if ``MISC/cache_folder`` is set
+        (relative to the settings file location), up to ``MISC/cache_size``
+        MB, otherwise ``None``
+        """
+        cache_folder = arguments.get_option(self.conf, 'MISC', 'cache_folder')
+        if not cache_folder:
+            return None
+        if not os.path.isabs(cache_folder):
+            cache_folder = os.path.join(
+                os.path.dirname(os.path.abspath(self.settings_file)),
+                cache_folder
+            )
+        cache_size = arguments.get_option(self.conf,
+                                          'MISC',
+                                          'cache_size',
+                                          fallback=1024,
+                                          kind=int)
+        return DownloadCache(cache_folder,
+                             max_size=cache_size << 20,
+                             logger=self.logger)
+
+    def _init_listing_cache(self):
+        """
+        Return the persistent cache of folder listings, stored in
+        ``MISC/listing_cache_file`` or ``listings.db`` under
+        ``MISC/store_folder``
+        """
+        filename = arguments.get_option(self.conf,
+                                        'MISC',
+                                        'listing_cache_file')
+        if not filename:
+            filename = os.path.join(
+                arguments.get_option(self.conf,
+                                     'MISC',
+                                     'store_folder',
+                                     fallback='store'),
+                'listings.db'
+            )
+        # files_lookup changes the working directory
+        return ListingCache(os.path.abspath(filename), logger=self.logger)
+
+    def _init_session_pool(self):
+        """
+        Return the pool of SSH connections shared by the SFTP sessions, idle
+        connections are closed after ``MISC/ssh_idle_timeout`` seconds
+        """
+        return SftpSessionPool(
+            idle_timeout=arguments.get_option(self.conf,
+                                              'MISC',
+                                              'ssh_idle_timeout',
+                                              fallback=300.0,
+                                              kind=float),
+            logger=self.logger
+        )
+
     def _check_if_using_gateway(self, system=None):
         """ Check if the connection is tunneled over an SSH gateway or not """
         try:
@@ -270,8 +542,10 @@ class Collector(object):
         odict = self.__dict__.copy()
         if self.logger:
             odict['loggername'] = self.logger.name
-        for item in ['logger', 'results_queue', 'server']:
-            del odict[item]
+        for item in ['logger', '_results_queue', 'server', '_active_sessions',
+                     '_hung_workers', '_worker', '_parser_pool',
+                     '_parser_slots', 'session_pool']:
+            odict.pop(item, None)
         return odict
 
     def __setstate__(self, state):
@@ -279,9 +553,24 @@ class Collector(object):
         state['logger'] = init_logger(name=state.get('loggername'))
         if 'loggername' in state:
             del state['loggername']
-        state['results_queue'] = queue.Queue()
+        state.pop('results_queue', None)
+        state['_results_queue'] = queue.Queue()
         state['server'] = None
+        state['_active_sessions'] = {}
+        state['_hung_workers'] = []
+        state['_worker'] = threading.local()
+        state['_parser_pool'] = None
+        state['_parser_slots'] = None
         self.__dict__.update(state)
+        self.session_pool = self._init_session_pool()
+
+    @property
+    def results_queue(self):
+        """
+        Queue where the results are left, the one of the run a worker thread
+        was started for (see :meth:`_run_worker`)
+        """
+        return getattr(self._worker, 'results_queue', self._results_queue)
 
     def dump_config(self):
         """
@@ -314,6 +603,11 @@ class Collector(object):
         """
         Initialize SSH tunnels using ``sshtunnel`` and ``paramiko`` libraries.
 
+        The systems are spread across the gateway sections (``GATEWAY``,
+        ``GATEWAY2``, ...) and the ``connections`` opened to each of them,
+        every one with its own SSH transport; unless pinned to a gateway with
+        their ``gateway`` setting.
+
         Arguments:
         - system
 
@@ -327,8 +621,8 @@ class Collector(object):
 
         Return:
 
-            ``SSHTunnelForwarder`` instance (non-started) with all tunnels
-            already established
+            :class:`TunnelGroup` instance (started) with all tunnels already
+            established
         """
         if not self._check_if_using_gateway(system):
             return
@@ -336,31 +630,88 @@ class Collector(object):
         if not self.conf:
             self.conf = arguments.read_config(self.settings_file)
 
-        jumpbox_addr = self.conf.get('GATEWAY', 'ip_or_hostname')
-        jumpbox_port = self.conf.getint('GATEWAY', 'ssh_port')
-        rbal = []
-        lbal = []
-        tunnelports = {}
         systems = [system] if system else self.systems
         sshtunnel.SSH_TIMEOUT = arguments.DEFAULT_SSH_TIMEOUT
+        tunnelports = [self.conf.getint(_sys, 'tunnel_port')
+                       for _sys in systems]
+        tunnelports = [port for port in tunnelports if port]  # 0: random
+        if len(tunnelports) != len(set(tunnelports)):
+            self.logger.error('Local tunnel ports MUST be different: {0}'
+                              .format(tunnelports))
+            raise sshtunnel.BaseSSHTunnelForwarderError
+        self.server = TunnelGroup()
+        try:
+            for ((gateway, _), gateway_systems) in \
+                    six.iteritems(self._assign_gateways(systems)):
+                self.server.add(self._open_tunnel(gateway, gateway_systems),
+                                gateway_systems,
+                                gateway)
+        except sshtunnel.BaseSSHTunnelForwarderError:
+            self.server.stop()
+            raise
+        self.logger.debug('Registered tunnels: {0}'
+                          .format(self.server.tunnelports))
+        return self.server
 
+    def _assign_gateways(self, systems):
+        """
+        Spread the systems across the gateway connections, round-robin except
+        for the systems with a ``gateway`` setting
+
+        Arguments:
+            systems (list): systems which connect through a gateway
+        Return:
+            ``OrderedDict`` of ``{(gateway, connection number): [systems]}``
+        """
+        slots = OrderedDict(
+            ((gateway, index), [])
+            for gateway in arguments.get_gateways(self.conf) or ['GATEWAY']
+            for index in range(max(1, arguments.get_option(self.conf,
+                                                           gateway,
+                                                           'connections',
+                                                           fallback=1,
+                                                           kind=int)))
+        )
+        for _sys in systems:
+            gateway = arguments.get_option(self.conf, _sys, 'gateway')
+            candidates = [slot for slot in slots if slot[0] == gateway]
+            if gateway and not candidates:
+                self.logger.warning('{0} | Gateway {1} not found, using any '
+                                    'of them'.format(_sys, gateway))
+            # least loaded connection, first one when tied
+            slot = min(candidates or slots, key=lambda slot: len(slots[slot]))
+            slots[slot].append(_sys)
+        return OrderedDict((slot, slot_systems)
+                           for (slot, slot_systems) in six.iteritems(slots)
+                           if slot_systems)
+
+    def _open_tunnel(self, gateway, systems):
+        """
+        Open a connection to a gateway with the tunnels to several systems
+
+        Arguments:
+            gateway (str): gateway section in the settings
+            systems (list): systems reached through this connection
+        Return:
+            ``sshtunnel.SSHTunnelForwarder`` instance (started)
+        """
+        jumpbox_addr = self.conf.get(gateway, 'ip_or_hostname')
+        jumpbox_port = self.conf.getint(gateway, 'ssh_port')
+        rbal = []
+        lbal = []
         for _sys in systems:
             rbal.append((self.conf.get(_sys, 'ip_or_hostname'),
                          self.conf.getint(_sys, 'ssh_port')))
             lbal.append(('', self.conf.getint(_sys, 'tunnel_port')))
-        if len(tunnelports) != len(set(tunnelports.values())):
-            self.logger.error('Local tunnel ports MUST be different: {0}'
-                              .format(tunnelports))
-            raise sshtunnel.BaseSSHTunnelForwarderError
         try:
-            pwd = self.conf.get('GATEWAY', 'password').strip("\"' ") or None \
-                if self.conf.has_option('GATEWAY', 'password') else None
-            pkey = self.conf.get('GATEWAY', 'identity_file').strip("\"' ") \
-                or None if self.conf.has_option('GATEWAY', 'identity_file') \
+            pwd = self.conf.get(gateway, 'password').strip("\"' ") or None \
+                if self.conf.has_option(gateway, 'password') else None
+            pkey = self.conf.get(gateway, 'identity_file').strip("\"' ") \
+                or None if self.conf.has_option(gateway, 'identity_file') \
                 else None
-            user = self.conf.get('GATEWAY', 'username') or None \
-                if self.conf.has_option('GATEWAY', 'username') else None
-            self.server = sshtunnel.open_tunnel(
+            user = self.conf.get(gateway, 'username') or None \
+                if self.conf.has_option(gateway, 'username') else None
+            server = sshtunnel.open_tunnel(
                 ssh_address_or_host=(jumpbox_addr, jumpbox_port),
                 ssh_username=user,
                 ssh_password=pwd,
@@ -375,34 +726,31 @@ class Collector(object):
                 mute_exceptions=True,
                 skip_tunnel_checkup=False,
             )
-            self.server.is_use_local_check_up = True  # Check local side
-            self._start_server()
-            assert self.server.is_alive
-            # Add the system<>port bindings to the return object
-            self.server.tunnelports = dict(
-                list(zip(systems, self.server.local_bind_ports))
-            )
-            self.logger.debug('Registered tunnels: {0}'
-                              .format(self.server.tunnelports))
+            server.is_use_local_check_up = True  # Check local side
+            self._start_server(server)
+            assert server.is_alive
+            return server
         except (sshtunnel.BaseSSHTunnelForwarderError, AssertionError):
             self.logger.error('{0}Could not open connection to remote server: '
                               '{1}:{2}'.format(
-                                  '{0} | '.format(system) if system else '',
+                                  '{0} | '.format(systems[0])
+                                  if len(systems) == 1 else '',
                                   jumpbox_addr,
                                   jumpbox_port
                               ))
             raise sshtunnel.BaseSSHTunnelForwarderError
 
-    def _start_server(self):  # pragma: no cover
+    def _start_server(self, server=None):  # pragma: no cover
         """
-        Start the SSH tunnels
+        Start the SSH tunnels, of :attr:`server` unless another one is given
         """
-        if not self.server:
+        server = server or self.server
+        if not server:
             raise sshtunnel.BaseSSHTunnelForwarderError
         try:
             self.logger.info('Opening connection to gateway')
-            self.server.start()
-            if not self.server.is_alive:
+            server.start()
+            if not server.is_alive:
                 raise sshtunnel.BaseSSHTunnelForwarderError(
                     "Couldn't start server"
                 )
@@ -411,8 +759,10 @@ class Collector(object):
 
     def stop_server(self):  # pragma: no cover
         """
-        Stop the SSH tunnels
+        Stop the SSH tunnels, closing first the pooled connections going
+        through them
         """
+        self.session_pool.close()
         try:
             self.logger.info('Closing connection to gateway')
             self.server.stop()
@@ -490,13 +840,35 @@ class Collector(object):
                     'ssh_timeout'
                 ) else arguments.DEFAULT_SSH_TIMEOUT
 
-            return SftpSession(hostname=remote_system_address,
-                               ssh_user=user,
-                               ssh_pass=ssh_pass,
-                               ssh_key=ssh_key,
-                               ssh_timeout=ssh_timeout,
-                               ssh_port=remote_system_port,
-                               logger=self.logger)
+            prefetch = arguments.get_option(self.conf,
+                                            system,
+                                            'sftp_prefetch',
+                                            fallback=False,
+                                            kind=bool)
+            session = SftpSession(hostname=remote_system_address,
+                                  read_size=arguments.get_option(
+                                      self.conf,
+                                      system,
+                                      'sftp_read_size',
+                                      kind=int
+                                  ),
+                                  prefetch_window=arguments.get_option(
+                                      self.conf,
+                                      system,
+                                      'sftp_prefetch_window',
+                                      fallback=0,
+                                      kind=int
+                                  ) if prefetch else None,
+                                  ssh_user=user,
+                                  ssh_pass=ssh_pass,
+                                  ssh_key=ssh_key,
+                                  ssh_timeout=ssh_timeout,
+                                  ssh_port=remote_system_port,
+                                  pool=self.session_pool,
+                                  logger=self.logger)
+            # keep track of it in case it has to be cancelled
+            self._track(system, session)
+            return session
         except SFTPSessionError:
             raise SFTPSessionError('connection to {0} failed'.format(system))
 
@@ -526,13 +898,17 @@ class Collector(object):
                 list of files to look for (valid filespecs may contain
                 wildcards (``*``))
             compressed (Optional[boolean]):
-                whether to look for compressed or plain (CSV) files
+                whether to look for compressed (ZIP) or plain (CSV) files,
+                CSV files compressed with gzip, bzip2 or xz (i.e.
+                ``.csv.gz``) are matched as plain files
                 Default: ``False`` (look for CSV files)
         Keyword Arguments:
             sftp_session (paramiko.SFTPClient):
                 already established sftp session
             files_folder: folder where files are located, either on sftp srv or
           local filesystem
+            date_tags (list): files must also match one of these date tags
+                (see :func:`get_datetag`), i.e. for a range of days
 
         Return:
            list:
@@ -554,32 +930,44 @@ class Collector(object):
             self.logger.debug('Using established sftp session...')
             self.logger.debug("Looking for remote files ({0}) at '{1}'"
                               .format(spec_list, files_folder))
-            folder_files = [get_filename(f) for f in sftp_session.run_command(
-                'dir /noheading /notrailing {0}'.format(files_folder)
-            )]
             filesource = sftp_session
+            # Let the remote side filter on an OpenVMS directory
+            remote_filespec = get_remote_filespec(spec_list) \
+                if files_folder[-1] in ':]>' else ''
         else:
             self.logger.debug('Using local filesystem to get the files')
             self.logger.debug("Looking for local files ({0}) at '{1}'"
                               .format(spec_list,
                                       os.path.abspath(files_folder)))
-            folder_files = os.listdir(files_folder)
             filesource = os
+            remote_filespec = ''
         # get file list by filtering with taglist (case insensitive)
         try:
             with change_dir(directory=files_folder,
                             module=filesource):
-                key = (hostname or 'localfs', files_folder)
+                key = (hostname or 'localfs', files_folder, remote_filespec)
+                attributes = {}
                 if key not in self.filecache:  # fill the cache in
-                    self.filecache[key] = folder_files
+                    self.filecache[key] = FileIndex(self._list_folder_cached(
+                        key,
+                        files_folder,
+                        sftp_session,
+                        remote_filespec,
+                        hostname,
+                        attributes
+                    ))
                 else:
                     self.logger.debug(
                         'Using cached file list for {0}'.format(key)
                     )
+                matches = self.filecache[key].match(spec_list,
+                                                    kwargs.get('date_tags'))
                 files = ['{0}/{1}'.format(filesource.getcwd(), f)
-                         for f in self.filecache[key]
-                         if all([v.upper() in f.upper() for v in spec_list])
-                         ]
+                         for f in matches]
+                # keep the attributes of the matching files only
+                for (a_file, name) in zip(files, matches):
+                    if name in attributes:
+                        self.fileattrs[(hostname, a_file)] = attributes[name]
             if not files and not sftp_session:
                 files = filespec_list  # Relative and absolute paths (local)
         except EnvironmentError:  # files could not be fetched
@@ -588,11 +976,88 @@ class Collector(object):
             return
         return files
 
+    def _list_folder_cached(self,
+                            key,
+                            files_folder,
+                            sftp_session=None,
+                            remote_filespec='',
+                            hostname=None,
+                            attributes=None):
+        """
+        Return the names of the files in a local or remote folder from
+        :attr:`listing_cache` if the system has a ``listing_cache_ttl`` set
+        (``MISC`` section when working locally) and the listing is still
+        valid, otherwise list the folder and refresh the cache.
+        A listing is no longer valid once the modification time of the folder
+        changes, if it can be obtained.
+        ``attributes`` is filled in only when the folder is actually listed,
+        see :meth:`_list_folder`.
+        """
+        ttl = arguments.get_option(self.conf,
+                                   hostname or 'MISC',
+                                   'listing_cache_ttl',
+                                   fallback=0,
+                                   kind=float)
+        if ttl <= 0:
+            return self._list_folder(files_folder,
+                                     sftp_session,
+                                     remote_filespec,
+                                     attributes)
+        try:  # called from files_lookup, already in files_folder
+            folder_mtime = int((sftp_session or os).stat('.').st_mtime)
+        except (EnvironmentError, SSHException, AttributeError, TypeError):
+            folder_mtime = None  # not reported, rely on the TTL only
+        folder_files = self.listing_cache.get(key, ttl, folder_mtime)
+        if folder_files is None:
+            folder_files = self._list_folder(files_folder,
+                                             sftp_session,
+                                             remote_filespec,
+                                             attributes)
+            self.listing_cache.put(key, folder_files, folder_mtime)
+        return folder_files
+
+    def _list_folder(self,
+                     files_folder,
+                     sftp_session=None,
+                     remote_filespec='',
+                     attributes=None):
+        """
+        Return the names of the files in a local or remote folder.
+
+        Remote folders are listed with the OpenVMS ``dir`` command, where
+        ``remote_filespec`` filters the files server side. If the SFTP session
+        cannot run commands, ``SFTPClient.listdir_attr`` is used instead and,
+        when ``attributes`` is a dictionary, the size and modification time
+        of each file are stored in it by file name, so that they are not
+        requested again for the files being downloaded.
+        """
+        # called from files_lookup, already in files_folder
+        if not sftp_session:
+            return os.listdir('.')
+        if hasattr(sftp_session, 'run_command'):
+            command = 'dir /noheading /notrailing {0}{1}'.format(
+                files_folder,
+                remote_filespec
+            )
+            return [get_filename(f) for f in sftp_session.run_command(command)]
+        folder_files = []
+        for file_attributes in sftp_session.listdir_attr('.'):
+            folder_files.append(file_attributes.filename)
+            if attributes is not None:
+                attributes[file_attributes.filename] = (
+                    file_attributes.st_size,
+                    file_attributes.st_mtime
+                )
+        return folder_files
+
     def get_stats_from_host(self,
                             filespec_list=None,
                             hostname=None,
                             compressed=False,
                             sftp_session=None,
+                            chunksize=None,
+                            sftp_channels=1,
+                            remote_compress_cmd=None,
                             **kwargs):
         """
         Optionally connect to a remote system via SFTP to read CSV files, which
@@ -608,16 +1073,35 @@ class Collector(object):
                 Default: working with local filesystem
             compressed (Optional[boolean]):
                 Whether or not the files matching ``filespec_list`` are
-                compressed (deflate)
+                ZIP archives. CSV files compressed with gzip, bzip2 or xz are
+                decompressed on the fly without setting this.
                 Default: ``False`` (not compressed)
             sftp_session (Optional[paramiko.SFTPClient]):
                 SFTP session to the remote ``hostname``
                 Default: ``None`` (work with local filesystem)
+            chunksize (Optional[int]):
+                If set, return an iterator yielding dataframes of up to
+                ``chunksize`` rows instead of a single dataframe, keeping the
+                memory usage bounded.
+                Default: ``None`` (return a single dataframe)
+            sftp_channels (Optional[int]):
+                Number of SFTP sessions over which the (uncompressed) files
+                are downloaded in parallel, additional sessions are opened
+                over the SSH transport of ``sftp_session``.
+                Default: 1 (download one file after another)
+            remote_compress_cmd (Optional[str]):
+                Command run on the remote host to archive the (uncompressed)
+                files into a single ZIP file, which is downloaded instead
+                (see :meth:`_compress_remote_files`).
+                Default: ``None`` (download the files as they are)
             files_folder (Optional[str]):
                 folder where files are located, either on sftp server or local
                 filesystem
+            date_tags (Optional[list]):
+                files must also match one of these date tags, i.e. for a range
+                of days (see :meth:`files_lookup`)
         Return:
-            ``pandas.DataFrame``
+            ``pandas.DataFrame`` or iterator of ``pandas.DataFrame``
         """
         _df = pd.DataFrame()
 
@@ -631,7 +1115,33 @@ class Collector(object):
                               'selected for pattern "{1}"'
                               .format(hostname or 'local system',
                                       filespec_list))
-            return _df
+            return iter([]) if chunksize else _df
+
+        if remote_compress_cmd and not compressed and \
+           hasattr(sftp_session, 'run_command'):
+            archive = self._compress_remote_files(files,
+                                                  sftp_session,
+                                                  remote_compress_cmd,
+                                                  kwargs.get('files_folder',
+                                                             '.'),
+                                                  hostname)
+            if archive:
+                frames = self._iter_remote_archive(archive,
+                                                   sftp_session,
+                                                   chunksize)
+                if chunksize:
+                    return frames
+                try:
+                    return next(frames, _df)
+                finally:
+                    frames.close()  # remove the remote archive
+
+        if chunksize:
+            return self._iter_stats_from_host(files,
+                                              hostname=hostname,
+                                              compressed=compressed,
+                                              sftp_session=sftp_session,
+                                              chunksize=chunksize)
 
         progressbar_prefix = 'Loading {0}files{1}'.format(
             'compressed ' if compressed else '',
@@ -639,33 +1149,389 @@ class Collector(object):
         )
         tqdm_call = tqdm.tqdm_notebook if is_running_from_ipython() \
                     else tqdm.tqdm
-        for a_file in tqdm_call(files,
-                                leave=True,
-                                desc=progressbar_prefix,
-                                disable=compressed,
-                                unit='Archive' if compressed else 'File'):
-            if compressed:
-                _df = _df.combine_first(
-                    self._load_zipfile(zip_file=a_file,
-                                       sftp_session=sftp_session)
+        if not compressed and sftp_channels > 1 and len(files) > 1:
+            frames = self._load_files_multichannel(
+                files,
+                sftp_session,
+                sftp_channels,
+                progressbar=tqdm_call(total=len(files),
+                                      leave=True,
+                                      desc=progressbar_prefix,
+                                      unit='File'),
+                hostname=hostname
+            )
+        else:
+            frames = []
+            for a_file in tqdm_call(files,
+                                    leave=True,
+                                    desc=progressbar_prefix,
+                                    disable=compressed,
+                                    unit='Archive' if compressed else 'File'):
+                if compressed:
+                    frames.append(self._load_zipfile(
+                        zip_file=a_file,
+                        sftp_session=sftp_session
+                    ))
+                    hostname = hostname or get_hostname_from_filename(a_file)
+                else:
+                    frames.append(self._load_file(a_file,
+                                                  sftp_session,
+                                                  hostname))
+        frames = [frame if isinstance(frame, pd.DataFrame) else frame.get()
+                  for frame in frames if frame is not None]
+        # Merge all at once, earlier files win on overlapping timestamps
+        _df = df_tools.merge_dataframes(frames)
+        if compressed and hostname and not _df.empty:
+            _df = df_tools.consolidate_data(_df, system=hostname)
+        return _df
+
+    def _compress_remote_files(self,
+                               files,
+                               sftp_session,
+                               command,
+                               files_folder='.',
+                               hostname=None):
+        """
+        Archive the remote ``files`` into a single ZIP file by running
+        ``command`` (``remote_compress_cmd`` setting) on the remote host,
+        i.e. ``zip "-jq" {archive} {files}``.
+
+        ``{archive}`` is replaced by the name of the archive to be created
+        and ``{files}`` by the space separated list of files, both in the
+        notation of ``files_folder`` (i.e. ``DSA3:[STATS]T4_SYS1.CSV;1``).
+        The command is run as many times as needed to keep each command line
+        within :const:`MAX_COMMAND_LENGTH`, each time with some of the files,
+        so ``command`` must add them to the archive if it already exists.
+
+        Return:
+            str: path of the archive for the SFTP session, ``None`` if it
+            was not created
+        """
+        if files_folder[-1] in ':]>':  # OpenVMS device or directory
+            remote_path = '{0}{1}'.format
+        else:
+            remote_path = '{0}/{1}'.format
+        archive = 't4mon_{0}_{1}_{2}.zip'.format(
+            re.sub(r'[^\w-]', '_', hostname or 'localfs'),
+            os.getpid(),
+            int(time.time() * 1000)
+        )
+        sftp_folder = files[0].rsplit('/', 1)[0]
+        self.logger.info('{0} | Archiving {1} files remotely into {2}'
+                         .format(hostname, len(files), archive))
+        archive_path = remote_path(files_folder, archive)
+        names = [remote_path(files_folder, a_file.rsplit('/', 1)[-1])
+                 for a_file in files]
+        try:
+            fixed = command.format(archive=archive_path, files='')
+            free = MAX_COMMAND_LENGTH - len(fixed)
+            batches = [[]]
+            for name in names:  # a batch takes at least one file
+                batch_length = len(' '.join(batches[-1] + [name]))
+                if batches[-1] and batch_length > free:
+                    batches.append([])
+                batches[-1].append(name)
+            for batch in batches:
+                sftp_session.run_command(command.format(
+                    archive=archive_path,
+                    files=' '.join(batch)
+                ))
+            sftp_session.stat('{0}/{1}'.format(sftp_folder, archive))
+        except (EnvironmentError, SSHException, KeyError, IndexError) as exc:
+            self.logger.warning('{0} | Remote archive could not be created, '
+                                'downloading the files instead: {1}'
+                                .format(hostname, repr(exc)))
+            return None
+        return '{0}/{1}'.format(sftp_folder, archive)
+
+    def _iter_remote_archive(self, archive, sftp_session, chunksize=None):
+        """
+        Generator yielding the data in a remote ZIP archive as
+        :meth:`_iter_zipfile` does, the archive is removed from the remote
+        host once the generator is exhausted or closed
+        """
+        try:
+            for chunk in self._iter_zipfile(archive, sftp_session, chunksize):
+                yield chunk
+        finally:
+            try:
+                sftp_session.remove(archive)
+            except (IOError, SSHException):
+                self.logger.warning('Could not remove remote archive {0}'
+                                    .format(archive))
+
+    def _load_file(self, a_file, sftp_session=None, hostname=None):
+        """
+        Load a single CSV file into a dataframe. If there is a pool of parser
+        processes, the file is downloaded here and an ``AsyncResult`` for
+        the dataframe is returned instead (``None`` if the download failed).
+
+        Remote files go through :attr:`download_cache`, if any.
+        """
+        cache_key = self._get_cache_key(a_file, sftp_session, hostname)
+        if cache_key:
+            return self._load_cached_file(a_file, sftp_session, cache_key)
+        if not self._parser_pool:
+            return df_tools.dataframize(data_file=a_file,
+                                        session=sftp_session,
+                                        logger=self.logger)
+        # download here, parse in another process meanwhile
+        data = self._read_file(a_file, sftp_session)
+        if data is not None:
+            return self._parse_in_pool(data, a_file)
+
+    def _load_cached_file(self, a_file, sftp_session, cache_key):
+        """
+        Load a remote file through :attr:`download_cache`. Unchanged files
+        are taken from the cache, while for files which grew since the last
+        time only the appended bytes are fetched and parsed.
+
+        Otherwise the whole file is downloaded into a temporary file in the
+        cache folder rather than into memory, unless it is to be sent to the
+        pool of parser processes.
+        """
+        dataframe = self.download_cache.get(*cache_key)
+        if dataframe is not None:
+            return dataframe
+        (system, _, size, mtime) = cache_key
+        tail = self.download_cache.get_tail(system, a_file)
+        if tail and size >= tail.size:
+            dataframe = self.download_cache.get(system,
+                                                a_file,
+                                                tail.size,
+                                                tail.mtime)
+        if dataframe is not None:
+            previous = (system, a_file, tail.size, tail.mtime)
+            data = self._read_file(a_file, sftp_session, offset=tail.start)
+            if data is not None:
+                dataframe = tail.append(dataframe, data, size, mtime)
+                if dataframe is not None:
+                    self.logger.info('{0} | {1}: fetched {2} bytes appended '
+                                     'since the last time'
+                                     .format(system, a_file, len(data)))
+                    self._cache_file(dataframe, tail, cache_key)
+                    self.download_cache.discard(*previous)
+                    return dataframe
+            self.logger.debug('{0} | {1}: cannot be appended, fetching the '
+                              'whole file'.format(system, a_file))
+        temp_file = self._download_file(a_file, sftp_session)
+        if temp_file is None:
+            return None
+        with temp_file:
+            # compressed files cannot be fetched partially
+            tail = None if df_tools.get_codec(a_file, temp_file.read(6)) \
+                else FileTail.from_file(temp_file, size, mtime)
+            if tail:  # leave out the last line if it is not complete yet
+                temp_file.truncate(tail.offset)
+            temp_file.seek(0)
+            if self._parser_pool:
+                return self._parse_in_pool(
+                    temp_file.read(),
+                    a_file,
+                    callback=lambda dataframe: self._cache_file(dataframe,
+                                                                tail,
+                                                                cache_key)
                 )
-                # if no hostname, try to infer it from the file name
-                regex = 't4_(\w+)[0-9]_\w+_[0-9]{{4}}_[0-9]{{4}}_\w+.{0}'.\
-                    format(os.path.splitext(a_file)[-1])
-                if not hostname and re.search(regex, a_file):
-                    hostname = re.search(regex, a_file).groups()[0]
+            dataframe = df_tools.dataframize_stream(
+                df_tools.decompress_file(temp_file, a_file),
+                a_file,
+                self.logger
+            )
+        self._cache_file(dataframe, tail, cache_key)
+        return dataframe
+
+    def _parse_in_pool(self, data, a_file, callback=None):
+        """
+        Send the contents of a file to the pool of parser processes and
+        return an ``AsyncResult`` for its dataframe.
+
+        Waits while ``MISC/parser_backlog`` files (default: twice the number
+        of processes) are already waiting to be parsed, so the downloads do
+        not pile up in memory faster than they are parsed. ``callback`` runs
+        in the result handler thread of the pool, any error is logged there.
+        """
+        self._parser_slots.acquire()
 
-                if hostname:
-                    _df = df_tools.consolidate_data(_df,
-                                                    system=hostname)
+        def _parsed(dataframe):
+            try:
+                if callback:
+                    callback(dataframe)
+            except Exception as exc:
+                self.logger.error('{0}: error after parsing the file: {1}'
+                                  .format(a_file, repr(exc)))
+            finally:
+                self._parser_slots.release()
+
+        kwargs = {'callback': _parsed}
+        if six.PY3:  # no error callbacks in python 2
+            kwargs['error_callback'] = \
+                lambda _: self._parser_slots.release()
+        return self._parser_pool.apply_async(df_tools.dataframize_buffer,
+                                             (data,
+                                              a_file,
+                                              self.logger.name),
+                                             **kwargs)
+
+    def _cache_file(self, dataframe, tail, cache_key):
+        """
+        Store in :attr:`download_cache` the dataframe obtained from a remote
+        file and its :class:`~t4mon.cache.FileTail` (if any)
+        """
+        self.download_cache.put(dataframe, *cache_key)
+        if tail and not dataframe.empty:
+            tail.last_sample = dataframe.index.max()
+            self.download_cache.put_tail(tail, *cache_key[:2])
 
+    def _get_cache_key(self, a_file, sftp_session=None, hostname=None):
+        """
+        Return the (system, file name, size, mtime) of a remote file, or
+        ``None`` if it is not to be cached
+        """
+        if not (self.download_cache and sftp_session and hostname):
+            return None
+        # attributes obtained by files_lookup are only used once
+        attributes = self.fileattrs.pop((hostname, a_file), None)
+        if not attributes:
+            try:
+                attributes = sftp_session.stat(a_file)
+            except (IOError, SSHException):
+                return None
+            attributes = (attributes.st_size, attributes.st_mtime)
+        return (hostname, a_file) + tuple(attributes)
+
+    def _load_files_multichannel(self,
+                                 files,
+                                 sftp_session,
+                                 channels,
+                                 progressbar=None,
+                                 hostname=None):
+        """
+        Spread the download of ``files`` across up to ``channels`` SFTP
+        sessions, the ones beyond ``sftp_session`` are opened as new
+        channels over its SSH transport.
+
+        Return:
+            list: result of :meth:`_load_file` for each file, keeping the
+            order of ``files``
+        """
+        channels = min(channels, len(files))
+        sessions = [sftp_session]
+        ssh_transport = getattr(sftp_session, 'ssh_transport', None)
+        try:
+            while ssh_transport and len(sessions) < channels:
+                try:
+                    session = ssh_transport.open_sftp()
+                    self._track(hostname, session)
+                    # same read settings as the main session
+                    for item in ['read_size', 'prefetch_window']:
+                        if hasattr(sftp_session, item):
+                            setattr(session, item, getattr(sftp_session, item))
+                    sessions.append(session)
+                except SSHException as exc:
+                    self.logger.warning('Could not open more SFTP channels, '
+                                        'using {0} ({1})'
+                                        .format(len(sessions), repr(exc)))
+                    break
+            if not ssh_transport:  # local filesystem
+                sessions *= channels
+            self.logger.debug('Loading {0} files over {1} channel(s)'
+                              .format(len(files), len(sessions)))
+            frames = [None] * len(files)
+            errors = []
+            pending = queue.Queue()
+            for item in enumerate(files):
+                pending.put(item)
+
+            def _worker(session):
+                try:
+                    while not errors:
+                        (index, a_file) = pending.get_nowait()
+                        frames[index] = self._load_file(a_file,
+                                                        session,
+                                                        hostname)
+                        if progressbar is not None:
+                            progressbar.update()
+                except queue.Empty:
+                    pass
+                except Exception as exc:
+                    errors.append(exc)
+
+            threads = [threading.Thread(target=_worker, args=(session, ))
+                       for session in sessions]
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            for session in sessions[1:]:
+                if session is not sftp_session:
+                    session.close()
+            if progressbar is not None:
+                progressbar.close()
+        if errors:
+            raise errors[0]
+        return frames
+
+    def _read_file(self, filename, sftp_session=None, offset=0):
+        """
+        Return the contents of a (remote if ``sftp_session`` is set) file
+        from ``offset``, ``None`` if it could not be read
+        """
+        self.logger.debug('Reading file {0}...'.format(filename))
+        try:
+            with df_tools.open_file(filename,
+                                    sftp_session,
+                                    offset) as file_descriptor:
+                return file_descriptor.read()
+        except IOError:
+            self.logger.error('File not found: {0}'.format(filename))
+
+    def _download_file(self, filename, sftp_session=None):
+        """
+        Copy a (remote if ``sftp_session`` is set) file into a temporary file
+        in the :attr:`download_cache` folder, by blocks. Return the temporary
+        file positioned at its start, ``None`` if the file could not be read
+        """
+        self.logger.debug('Downloading file {0}...'.format(filename))
+        temp_file = tempfile.TemporaryFile(dir=self.download_cache.folder,
+                                           suffix='.tmp')
+        try:
+            with df_tools.open_file(filename, sftp_session) as file_descriptor:
+                shutil.copyfileobj(file_descriptor,
+                                   temp_file,
+                                   df_tools.READ_BLOCKSIZE)
+        except IOError:
+            temp_file.close()
+            self.logger.error('File not found: {0}'.format(filename))
+            return None
+        temp_file.seek(0)
+        return temp_file
+
+    def _iter_stats_from_host(self,
+                              files,
+                              hostname=None,
+                              compressed=False,
+                              sftp_session=None,
+                              chunksize=None):
+        """
+        Generator used by :meth:`get_stats_from_host` in chunked mode, yield
+        dataframes of up to ``chunksize`` rows for each file in ``files``
+        """
+        for a_file in files:
+            if compressed:
+                system = hostname or get_hostname_from_filename(a_file)
+                for chunk in self._load_zipfile(zip_file=a_file,
+                                                sftp_session=sftp_session,
+                                                chunksize=chunksize):
+                    yield df_tools.consolidate_data(chunk, system=system) \
+                        if system else chunk
             else:
-                _df = _df.combine_first(
-                    df_tools.dataframize(data_file=a_file,
-                                         session=sftp_session,
-                                         logger=self.logger)
-                )
-        return _df
+                for chunk in df_tools.dataframize(data_file=a_file,
+                                                  session=sftp_session,
+                                                  logger=self.logger,
+                                                  chunksize=chunksize):
+                    yield chunk
 
     def get_system_logs(self, ssh_session, system, command=None):
         """
@@ -695,36 +1561,79 @@ class Collector(object):
                             ', may take a while...'.format(system, command))
         try:  # ignoring stdin and stderr for OpenVMS SSH2
             (_, stdout, _) = ssh_session.exec_command(command)
+            if hasattr(stdout, 'channel'):
+                self._track(system, stdout.channel)
             return stdout.readlines()
         except Exception as _exc:
             self.logger.error('{0} | Error occurred while getting logs: {1}'
                               .format(system, repr(_exc)))
             return None
 
+    def _get_system_logs_async(self, ssh_session, system, command):
+        """
+        Run :meth:`get_system_logs` in a separate thread, which opens its own
+        channel over the SSH transport of ``ssh_session``.
+
+        Return:
+            function: waits for the command to finish and returns its output
+        """
+        output = []
+        thread = threading.Thread(
+            target=lambda: output.append(
+                self.get_system_logs(ssh_session, system, command)
+            ),
+            name='{0}-logs'.format(system)
+        )
+        thread.daemon = True
+        thread.start()
+
+        def wait_for_logs():
+            thread.join()
+            return output[0] if output else None
+        return wait_for_logs
+
     def get_single_day_data(self, given_date=None):
         """
         Given a single date, collect all systems data for such date and put the
         results in :attr:`.data`.
 
+        A list of dates can also be given, the files of all those days are
+        then looked up at once in each system's folder listing::
+
+            >>> col.get_single_day_data([day - dt.timedelta(days=n)
+                                         for n in range(7)])
+
+        The SSH tunnels are opened and closed here unless already open, so
+        several days can be collected over the same tunnels and (pooled)
+        connections::
+
+            >>> with col:
+                    for day in days:
+                        col.get_single_day_data(day)
+
         Arguments:
-            given_date (datetime):
-                define for which day the data will be collected from the remote
-                systems; default: today's datetime.
+            given_date (datetime or list):
+                define for which day(s) the data will be collected from the
+                remote systems; default: today's datetime.
         """
 
         def _single_day_and_system_data(system, given_date=None):
-            given_date = get_datetag(given_date)
+            if isinstance(given_date, (list, tuple)):
+                given_date = [get_datetag(day) for day in given_date]
+            else:
+                given_date = get_datetag(given_date)
             self.logger.info('Collecting data for system: {0}; day: {1}'
                              .format(system, given_date))
             with self.get_sftp_session(system) as session:
                 result_data = self.get_system_data(session,
                                                    system,
                                                    given_date)
-                self.data = df_tools.consolidate_data(result_data,
-                                                      dataframe=self.data,
-                                                      system=system)
-                self.results_queue.put(system)  # flag this system as done
+                # flag this system as done
+                self.results_queue.put((system, result_data))
 
+        if self.server and self.server.is_alive:  # i.e. several days
+            self._run_systemwide(_single_day_and_system_data, given_date)
+            return
         with self:  # open tunnels
             self._run_systemwide(_single_day_and_system_data,
                                  given_date)
@@ -738,8 +1647,9 @@ class Collector(object):
                 **Already initialized** sftp session to the remote system
             system (str):
                 remote system hostname, as present in settings file
-            day (str):
-              String identifying for which day the data will be collected.
+            day (str or list):
+              String identifying for which day the data will be collected,
+              or a list of them to match the files of any of those days.
               Default: ``datetime.date.today()`` in the format ``%d%b%Y``
         Return:
             ``pandas.DataFrame``
@@ -748,36 +1658,193 @@ class Collector(object):
         destdir = self.conf.get(system, 'folder') or '.'
 
         # Filter only on '.csv' extension if alldays
-        tag_list = ['.csv'] + ([] if self.alldays and not day
-                               else [day or get_datetag()])
+        date_tags = day if isinstance(day, (list, tuple)) else None
+        if date_tags is not None or self.alldays and not day:
+            tag_list = ['.csv']
+        else:
+            tag_list = ['.csv', day or get_datetag()]
 
         try:  # if present, also filter on cluster id
             tag_list.append(self.conf.get(system, 'cluster_id').lower())
         except Exception:
             pass
 
-        data = self.get_stats_from_host(hostname=system,
-                                        filespec_list=tag_list,
-                                        sftp_session=session,
-                                        files_folder=destdir)
+        sftp_channels = arguments.get_option(self.conf,
+                                             system,
+                                             'sftp_channels',
+                                             fallback=1,
+                                             kind=int)
+        data = self.get_stats_from_host(
+            hostname=system,
+            filespec_list=tag_list,
+            sftp_session=session,
+            files_folder=destdir,
+            sftp_channels=sftp_channels,
+            remote_compress_cmd=arguments.get_option(self.conf,
+                                                     system,
+                                                     'remote_compress_cmd'),
+            date_tags=date_tags
+        )
         if data.empty:
             self.logger.warning('{0} | No data was obtained!'.format(system))
+        elif self._consolidated_calculations():
+            self.logger.info('{0} | Dataframe shape obtained: {1}'
+                             .format(system, data.shape))
         else:
             self.logger.info('{0} | Dataframe shape obtained: {1}. '
                              'Now applying calculations...'.format(system,
                                                                    data.shape))
-            calc_file = self.conf.get('MISC', 'calculations_file')
-            if not os.path.isabs(calc_file):
-                calc_file = '{0}{1}{2}'.format(
-                    os.path.dirname(os.path.abspath(self.settings_file)),
-                    os.sep,
-                    calc_file
-                )
-            data.apply_calcs(calc_file, system)
+            self._apply_calculations(data, system)
             self.logger.info('{0} | Dataframe shape after calculations: {1}'
                              .format(system, data.shape))
         return data
 
+    def _consolidated_calculations(self):
+        """
+        Whether the calculations are applied once to the consolidated data
+        of all systems (``MISC/calculations_mode`` set to ``consolidated``)
+        instead of to each system's data right after being collected
+        """
+        return arguments.get_option(self.conf,
+                                    'MISC',
+                                    'calculations_mode') == 'consolidated'
+
+    def _apply_calculations(self, data, system=None):
+        """
+        Apply inplace the calculations in ``MISC/calculations_file``
+
+        Arguments:
+            data (pandas.DataFrame): data for a system or consolidated data
+        Keyword Arguments:
+            system (Optional[str]): system name, only used for logging
+        """
+        data.apply_calcs(self._get_calc_file(),
+                         system,
+                         variables=self._get_calculation_variables(),
+                         threads=arguments.get_option(self.conf,
+                                                      'MISC',
+                                                      'calculation_threads',
+                                                      fallback=1,
+                                                      kind=int))
+
+    def _get_calc_file(self):
+        """
+        Return the path to ``MISC/calculations_file``, relative to the
+        settings file
+        """
+        calc_file = self.conf.get('MISC', 'calculations_file')
+        if not os.path.isabs(calc_file):
+            calc_file = '{0}{1}{2}'.format(
+                os.path.dirname(os.path.abspath(self.settings_file)),
+                os.sep,
+                calc_file
+            )
+        return calc_file
+
+    def _aggregate_systems(self, changed=None):
+        """
+        Replace the rows of the virtual systems in :attr:`data` with the
+        aggregations over the systems (``sum_systems``, ...) defined in the
+        calculations file.
+
+        Systems are grouped by the value of the setting named by
+        ``MISC/aggregate_by`` (i.e. ``cluster_id``), or all of them into a
+        single ``ALL`` system. Sample times are aligned to
+        ``MISC/aggregate_frequency`` (i.e. ``5min``) if set. A virtual system
+        named as a real one is prefixed with ``MISC/aggregate_by`` (or
+        ``aggregate``), i.e. ``cluster_id_sys1``.
+
+        Keyword Arguments:
+            changed (Optional[pandas.DatetimeIndex]): sample times where the
+                data changed (i.e. a system was collected again in daemon
+                mode), only those are aggregated again. All if ``None``
+        """
+        if self.data.empty or changed is not None and not len(changed):
+            return
+        aggregate_by = arguments.get_option(self.conf, 'MISC', 'aggregate_by')
+        freq = arguments.get_option(self.conf, 'MISC', 'aggregate_frequency')
+        systems = self.data.index.get_level_values('system')
+        is_virtual = systems.isin(self.virtual_systems)
+        if changed is None:
+            source = self.data = self.data[~is_virtual]
+        else:
+            times = self.data.index.get_level_values(0)
+            if freq:  # the virtual systems' times are already aligned
+                (times, changed) = (times.floor(freq), changed.floor(freq))
+            outdated = times.isin(changed)
+            source = self.data[outdated & ~is_virtual]
+            self.data = self.data[~(outdated & is_virtual)]
+        groups = dict(
+            (system, arguments.get_option(self.conf, system, aggregate_by))
+            for system in self.systems
+        ) if aggregate_by else None
+        aggregated = source.aggregate_calcs(
+            self._get_calc_file(),
+            groups=groups,
+            freq=freq,
+            variables=self._get_calculation_variables()
+        )
+        if aggregated.empty:
+            if changed is None:
+                self.virtual_systems = []
+            return
+        # virtual systems must not be mistaken for real ones when dropped
+        real_systems = set(self.systems) | set(systems[~is_virtual].unique())
+        names = {}
+        for virtual in aggregated.index.get_level_values('system').unique():
+            names[virtual] = virtual
+            while names[virtual] in real_systems:
+                names[virtual] = '{0}_{1}'.format(aggregate_by or 'aggregate',
+                                                  names[virtual])
+            if names[virtual] != virtual:
+                self.logger.warning('{0} | Virtual system named as a real '
+                                    'one, renamed to {1}'
+                                    .format(virtual, names[virtual]))
+        if any(virtual != name for (virtual, name) in six.iteritems(names)):
+            # rename(level=...) is not available in pandas<0.21
+            aggregated.index = pd.MultiIndex.from_arrays(
+                [aggregated.index.get_level_values(0),
+                 [names[virtual] for virtual
+                  in aggregated.index.get_level_values('system')]],
+                names=aggregated.index.names
+            )
+        self.data = pd.concat([self.data, aggregated])
+        if changed is None:
+            self.virtual_systems = []
+        for (virtual, name) in sorted(six.iteritems(names)):
+            if name not in self.virtual_systems:
+                self.virtual_systems.append(name)
+            members = [system for system in self.systems
+                       if (groups or {}).get(system, virtual) == virtual]
+            self.logs[name] = '{0} | Aggregate of {1}'.format(
+                name,
+                ', '.join(members)
+            )
+        self.logger.info('Virtual systems aggregated: {0}'
+                         .format(', '.join(sorted(names.values()))))
+
+    def _get_calculation_variables(self):
+        """
+        Return the variables plotted in the reports when only the
+        calculations needed by them are applied (``MISC/calculations_scope``
+        set to ``graphs``), otherwise ``None``
+        """
+        if arguments.get_option(self.conf,
+                                'MISC',
+                                'calculations_scope') != 'graphs':
+            return None
+        graphs_file = arguments.get_absolute_path(
+            self.conf.get('MISC', 'graphs_definition_file'),
+            self.settings_file
+        )
+        try:
+            return gen_report.get_graphs_variables(graphs_file) or None
+        except IOError:
+            self.logger.warning('Graphs definition file not found: {0}, '
+                                'applying all calculations'
+                                .format(graphs_file))
+            return None
+
     def get_data_and_logs(self, system):
         """
         Collect everything needed for a system.
@@ -789,7 +1856,6 @@ class Collector(object):
             ``pandas.DataFrame``
 
         """
-        # TODO: allow parallel (data | log) collection
         try:
             self.logger.info('{0} | Collecting statistics...'.format(system))
             if (
@@ -804,49 +1870,233 @@ class Collector(object):
             if not sftp_session:
                 raise SFTPSessionError('Cannot open an SFTP session to {0}'
                                        .format(system))
+            log_command = None if self.nologs else arguments.get_option(
+                self.conf, 'MISC', 'remote_log_cmd'
+            )
             with sftp_session as session:  # open the session
-                # Get data from the remote system
+                # Start getting the logs on a separate channel
+                if log_command:
+                    wait_for_logs = self._get_system_logs_async(
+                        sftp_session.ssh_transport,
+                        system,
+                        log_command
+                    )
+                # Meanwhile, get data from the remote system
                 result_data = self.get_system_data(session, system)
-                # Done gathering data, now get the logs
-                if self.nologs or result_data.empty \
-                   or not self.conf.has_option('MISC', 'remote_log_cmd'):
+                result_logs = wait_for_logs() if log_command else None
+                if not log_command or result_data.empty:
                     result_logs = '{0} | Log collection omitted'.format(system)
                     self.logger.info(result_logs)
                 else:
-                    result_logs = self.get_system_logs(
-                        sftp_session.ssh_transport,
-                        system,
-                        self.conf.get('MISC', 'remote_log_cmd')
-                    ) or '{0} | Missing logs!'.format(system)
+                    result_logs = result_logs or \
+                        '{0} | Missing logs!'.format(system)
         except (IOError, SFTPSessionError):
             result_data = pd.DataFrame()
             result_logs = 'Could not get information from this system'
 
-        self.logger.debug('{0} | Consolidating results'.format(system))
-        self.data = df_tools.consolidate_data(result_data,
-                                              dataframe=self.data,
-                                              system=system)
         self.logs[system] = result_logs
-        self.results_queue.put(system)
+        self.results_queue.put((system, result_data))
+
+    def _consolidate_results(self, results, replaced=None):
+        """
+        Add to :attr:`data` the results collected for each system, building
+        the ``(Sample Time, system)`` MultiIndex dataframe in one go.
+
+        The calculations are applied here, in a single pass over the new
+        rows, when ``MISC/calculations_mode`` is set to ``consolidated``.
+        The virtual systems are aggregated afterwards in any case.
+
+        Arguments:
+            results (dict): ``{system: pandas.DataFrame}``
+        Keyword Arguments:
+            replaced (Optional[dict]): ``{system: pandas.DataFrame}``, rows
+                the results replace (see :meth:`_replace_system_data`). Only
+                the sample times where they changed are aggregated again
+        """
+        self.logger.debug('Consolidating results for {0} systems'
+                          .format(len(results)))
+        partial_dataframes = [(system, results[system])
+                              for system in self.systems if system in results]
+        if not self._consolidated_calculations():
+            self.data = df_tools.consolidate_systems(partial_dataframes,
+                                                     dataframe=self.data)
+        else:
+            new_data = df_tools.consolidate_systems(partial_dataframes)
+            if not new_data.empty:
+                self.logger.info('Consolidated dataframe shape: {0}. Now '
+                                 'applying calculations...'
+                                 .format(new_data.shape))
+                self._apply_calculations(new_data)
+                self.logger.info('Dataframe shape after calculations: {0}'
+                                 .format(new_data.shape))
+                self.data = new_data if self.data.empty \
+                    else pd.concat([self.data, new_data])
+        self._aggregate_systems(
+            None if replaced is None else self._changed_times(replaced)
+        )
+
+    def _changed_times(self, replaced):
+        """
+        Return the sample times where the rows of the ``replaced`` systems
+        (``{system: previous rows}``) differ from the ones in :attr:`data`
+        """
+        changed = []
+        for (system, previous) in six.iteritems(replaced):
+            current = self.data.xs(system, level='system') \
+                if system in self.data.index.get_level_values('system') \
+                else pd.DataFrame(columns=previous.columns)
+            # rows found only once were added, removed or modified
+            rows = pd.concat([previous, current]).reset_index()
+            rows = rows.drop_duplicates(keep=False)
+            changed.extend(rows[rows.columns[0]])
+        return pd.Index(changed).unique()
+
+    def _run_worker(self, results, target, system, *args):
+        """
+        Run target for a system, leaving an empty result in ``results`` if it
+        fails. ``results`` is the :attr:`results_queue` seen by this thread,
+        so a worker cancelled in a run cannot deliver into a later one.
+        """
+        self._worker.results_queue = results
+        resources = self._active_sessions[system] = []
+        try:
+            target(system, *args)
+        except Exception as exc:
+            self.logger.error('{0} | Unexpected error during collection: {1}'
+                              .format(system, repr(exc)))
+            results.put((system, pd.DataFrame()))
+        finally:
+            if self._active_sessions.get(system) is resources:
+                del self._active_sessions[system]
+
+    def _track(self, system, resource):
+        """
+        Keep track of a session or channel opened by the worker of a system,
+        to be closed if the system is cancelled
+        """
+        resources = self._active_sessions.get(system)
+        if resources is not None:
+            resources.append(resource)
+
+    def _cancel_system(self, system, timeout, thread):
+        """
+        Give up with a system after its collection deadline, closing the
+        sessions and channels opened by its worker so it does not block
+        further. The worker (``thread``) keeps counting against
+        ``MISC/max_workers`` until it returns, for :const:`CANCEL_GRACE`
+        seconds at most.
+        """
+        self.logger.error('{0} | Collection timed out after {1} seconds, '
+                          'skipping system'.format(system, timeout))
+        self.logs[system] = 'Could not get information from this system ' \
+                            '(timed out)'
+        self._hung_workers.append((thread, time.time() + CANCEL_GRACE))
+        for resource in reversed(self._active_sessions.pop(system, [])):
+            try:
+                resource.close()
+            except Exception as exc:
+                self.logger.debug('{0} | Error while closing the session: '
+                                  '{1}'.format(system, repr(exc)))
 
     def _run_systemwide(self, target, *args):
         """
         Run a target function systemwide and wait until all of them are
         finished.
-        The target function is supposed to leave the value for 'system' in
-        self.results_queue.
+        The target function is supposed to leave a tuple (system, dataframe)
+        in self.results_queue, :attr:`data` is consolidated once all of them
+        are done.
+
+        Up to ``MISC/max_workers`` systems (default: all) are run at the same
+        time. Systems not done after their ``collection_timeout`` (seconds,
+        default: no timeout) are cancelled and skipped.
+        """
+        results_queue = queue.Queue()  # only for the workers of this run
+        pending = self.systems[:]
+        running = {}  # {system: (deadline, timeout, thread)}
+        results = {}
+        while pending or running:
+            self._start_workers(pending, running, results_queue, target, *args)
+            if not running:  # cancelled workers still hold all the slots
+                (thread, release) = self._hung_workers[0]
+                thread.join(min(max(release - time.time(), 0), POLL_TICK))
+                continue
+            # wait for threads to end, first one to finish will leave
+            # the result in the queue
+            try:
+                (system, result_data) = results_queue.get(
+                    timeout=self._next_deadline(running)
+                )
+            except queue.Empty:
+                self._cancel_overdue(running)
+                continue
+            if system not in running:  # arrived after being cancelled
+                self.logger.debug('{0} | Discarding late result'
+                                  .format(system))
+                continue
+            del running[system]
+            results[system] = result_data
+            self.logger.info('{0} | Done collecting data!'.format(system))
+        self._consolidate_results(results)
+
+    def _start_workers(self, pending, running, results_queue, target, *args):
+        """
+        Start workers for the ``pending`` systems while there are free slots
+        (``MISC/max_workers``, counting the cancelled workers not returned
+        yet within :const:`CANCEL_GRACE`), adding them to ``running`` as
+        ``{system: (deadline, timeout, thread)}``
         """
-        for system in self.systems:
-            thread = threading.Thread(target=target,
+        max_workers = max(arguments.get_option(self.conf,
+                                               'MISC',
+                                               'max_workers',
+                                               fallback=len(self.systems),
+                                               kind=int), 1)
+        now = time.time()
+        for (thread, release) in self._hung_workers:
+            if thread.is_alive() and release <= now:  # left behind
+                self.logger.warning('{0} | Cancelled worker did not return '
+                                    'after {1} seconds, releasing its slot'
+                                    .format(thread.name, CANCEL_GRACE))
+        self._hung_workers = [(thread, release)
+                              for (thread, release) in self._hung_workers
+                              if thread.is_alive() and release > now]
+        while pending and \
+                len(running) + len(self._hung_workers) < max_workers:
+            system = pending.pop(0)
+            timeout = arguments.get_option(self.conf,
+                                           system,
+                                           'collection_timeout',
+                                           kind=float)
+            thread = threading.Thread(target=self._run_worker,
                                       name=system,
-                                      args=tuple([system] + list(args)))
+                                      args=tuple([results_queue,
+                                                  target,
+                                                  system] + list(args)))
             thread.daemon = True
             thread.start()
-        # wait for threads to end, first one to finish will leave
-        # the result in the queue
-        for system in self.systems:
-            self.logger.info('{0} | Done collecting data!'
-                             .format(self.results_queue.get()))
+            running[system] = (time.time() + timeout if timeout else None,
+                               timeout,
+                               thread)
+        if pending and not running:
+            self.logger.debug('Waiting for {0} cancelled worker(s) to '
+                              'return'.format(len(self._hung_workers)))
+
+    @staticmethod
+    def _next_deadline(running):
+        """
+        Return the seconds until the first deadline of the ``running``
+        workers, ``None`` if none of them has a deadline
+        """
+        deadlines = [deadline for (deadline, _, _) in running.values()
+                     if deadline is not None]
+        return max(min(deadlines) - time.time(), 0) if deadlines else None
+
+    def _cancel_overdue(self, running):
+        """ Cancel the ``running`` workers past their deadline """
+        now = time.time()
+        for (system, (deadline, timeout, thread)) in list(running.items()):
+            if deadline is not None and deadline <= now:
+                del running[system]
+                self._cancel_system(system, timeout, thread)
 
     def _threaded_handler(self):
         """
@@ -859,11 +2109,13 @@ class Collector(object):
         """
         Get data&logs. Serial (legacy) handler, working inside a for loop
         """
-        for system in self.systems:
+        results = {}
+        for system in self.systems[:]:
             self.logger.info('{0} | Initializing tunnel'.format(system))
             try:
                 self.init_tunnels(system=system)
                 self.get_data_and_logs(system=system)
+                (_, results[system]) = self.results_queue.get()
             except (sshtunnel.BaseSSHTunnelForwarderError,
                     IOError,
                     SFTPSessionError):
@@ -872,12 +2124,14 @@ class Collector(object):
                 continue
             finally:
                 self.stop_server()
+        self._consolidate_results(results)
 
     def start(self):
         """
         Main method for the data collection
         """
         try:
+            self._start_parser_pool()
             if self.safe:
                 self._serial_handler()
             else:
@@ -889,6 +2143,178 @@ class Collector(object):
             self.logger.error('Could not open remote connection')
         except Exception as exc:
             self.logger.exception(exc)
+        finally:
+            self._stop_parser_pool()
+            self.session_pool.close()
+            self.logger.info(str(self.session_pool))
+            if self.download_cache:
+                self.logger.info(str(self.download_cache))
+            if self.listing_cache.hits or self.listing_cache.misses:
+                self.logger.info(str(self.listing_cache))
+
+    def poll(self, callback=None, stop_event=None):
+        """
+        Daemon mode: collect the data and logs of each system every
+        ``poll_interval`` seconds (per system setting, default
+        :const:`DEFAULT_POLL_INTERVAL`) until ``stop_event`` is set.
+
+        Unlike :meth:`start`, the SSH tunnels and the pooled connections are
+        kept open between collections, and the folders are listed again each
+        time. Files are fetched through :attr:`download_cache` (``cache``
+        folder next to the settings file if ``MISC/cache_folder`` is not set),
+        so only the samples appended since the last poll are downloaded.
+
+        Each time a system is done, its rows in :attr:`data` are replaced by
+        the new ones and ``callback(system)`` is called (from this thread),
+        also for each of the :attr:`virtual_systems` aggregated again.
+        As in :meth:`start`, up to ``MISC/max_workers`` systems are collected
+        at the same time and systems not done after their
+        ``collection_timeout`` are cancelled until their next poll.
+
+        Keyword Arguments:
+            callback (Optional[callable]): function called for each result
+            stop_event (Optional[threading.Event]): stop polling when set
+        """
+        stop_event = stop_event or threading.Event()
+        intervals = dict((system, arguments.get_option(
+            self.conf,
+            system,
+            'poll_interval',
+            fallback=DEFAULT_POLL_INTERVAL,
+            kind=float
+        )) for system in self.systems)
+        # do not let the pooled connections expire between polls
+        idle_timeouts = [2 * interval for interval in intervals.values()]
+        self.session_pool.idle_timeout = max(
+            [self.session_pool.idle_timeout] + idle_timeouts
+        )
+        if not self.download_cache:
+            self.download_cache = DownloadCache(
+                os.path.join(os.path.dirname(os.path.abspath(
+                    self.settings_file
+                )), 'cache'),
+                logger=self.logger
+            )
+        next_poll = dict.fromkeys(self.systems, 0.0)
+        results_queue = queue.Queue()
+        pending = []
+        running = {}  # {system: (deadline, timeout, thread)}
+        try:
+            self._start_parser_pool()
+            self.init_tunnels()
+            while not stop_event.is_set():
+                self._check_tunnels()
+                self._cancel_overdue(running)
+                now = time.time()
+                for system in self.systems:
+                    if system in running or system in pending or \
+                       next_poll[system] > now:
+                        continue
+                    self._forget_file_lookups(system)
+                    next_poll[system] = now + intervals[system]
+                    pending.append(system)
+                self._start_workers(pending,
+                                    running,
+                                    results_queue,
+                                    self.get_data_and_logs)
+                timeout = self._next_deadline(running)
+                try:
+                    (system, result_data) = results_queue.get(
+                        timeout=POLL_TICK if timeout is None
+                        else min(timeout, POLL_TICK)
+                    )
+                except queue.Empty:
+                    continue
+                if system not in running:  # arrived after being cancelled
+                    self.logger.debug('{0} | Discarding late result'
+                                      .format(system))
+                    continue
+                del running[system]
+                self._replace_system_data(system, result_data)
+                if callback:
+                    for updated in [system] + self.virtual_systems:
+                        callback(updated)
+        finally:
+            self._stop_parser_pool()
+            self.session_pool.close()
+            if self.server:
+                self.stop_server()
+            self.logger.info(str(self.session_pool))
+            self.logger.info(str(self.download_cache))
+
+    def _check_tunnels(self):
+        """
+        Restart the SSH tunnels of the gateway connections which went down
+        (daemon mode), the tunnels through the other ones are left open
+        """
+        if not self.server or self.server.is_alive:
+            return
+        for server in [server for server in self.server.servers
+                       if not server.is_alive]:
+            self.logger.warning('{0} | SSH tunnels are down, restarting them'
+                                .format(server.gateway))
+            try:
+                server.stop()
+                self.server.replace(server,
+                                    self._open_tunnel(server.gateway,
+                                                      server.systems))
+            except sshtunnel.BaseSSHTunnelForwarderError:
+                self.logger.error('{0} | Could not restart the SSH tunnels, '
+                                  'retrying on next poll'
+                                  .format(server.gateway))
+
+    def _forget_file_lookups(self, system):
+        """ Drop the folder listings of a system cached in :attr:`filecache`
+        """
+        # other systems' workers may be adding listings meanwhile
+        for key in [key for key in list(self.filecache) if key[0] == system]:
+            self.filecache.pop(key, None)
+
+    def _replace_system_data(self, system, dataframe):
+        """
+        Replace the rows of a system in :attr:`data`, kept if ``dataframe``
+        is empty (i.e. the system could not be reached this time)
+        """
+        if dataframe.empty:
+            self.logger.warning('{0} | No new data, keeping the previous'
+                                .format(system))
+            return
+        replaced = {system: pd.DataFrame()}
+        if not self.data.empty and \
+           system in self.data.index.get_level_values('system'):
+            replaced[system] = self.data.xs(system, level='system')
+            self.data = self.data.drop(system, level='system')
+        self._consolidate_results({system: dataframe}, replaced=replaced)
+
+    def _start_parser_pool(self):
+        """
+        Start the pool of ``MISC/parser_processes`` processes (default: none)
+        where the CSV files are parsed, while the SFTP threads go on with the
+        downloads
+        """
+        processes = arguments.get_option(self.conf,
+                                         'MISC',
+                                         'parser_processes',
+                                         fallback=0,
+                                         kind=int)
+        if processes > 0 and not self._parser_pool:
+            self.logger.debug('Starting {0} CSV parser processes'
+                              .format(processes))
+            self._parser_pool = Pool(processes=processes)
+            self._parser_slots = threading.BoundedSemaphore(
+                max(arguments.get_option(self.conf,
+                                         'MISC',
+                                         'parser_backlog',
+                                         fallback=2 * processes,
+                                         kind=int), 1)
+            )
+
+    def _stop_parser_pool(self):
+        """ Stop the pool of CSV parser processes, if any """
+        if self._parser_pool:
+            self._parser_pool.close()
+            self._parser_pool.join()
+            self._parser_pool = self._parser_slots = None
 
     def to_pickle(self, name, compress=False, version=None):
         """
@@ -923,43 +2349,65 @@ class Collector(object):
             pkl_out.write(buffer_object.getvalue())
         buffer_object.close()
 
-    def _load_zipfile(self, zip_file, sftp_session=None):
+    def _load_zipfile(self, zip_file, sftp_session=None, chunksize=None):
         """
-        Inflate a zip file and call :meth:`get_stats_from_host` with the
-        decompressed CSV files
+        Load the CSV files inside a zip file into a single dataframe, the
+        same as :meth:`get_stats_from_host` would do with the decompressed
+        files.
+        With ``chunksize``, return an iterator of dataframes of up to
+        ``chunksize`` rows instead.
         """
-        temp_dir = tempfile.gettempdir()
-        self.logger.info('Decompressing ZIP file {0} into {1}...'
-                         .format(zip_file, temp_dir))
-        _df = pd.DataFrame()
-        if not isinstance(sftp_session, SFTPClient):
-            sftp_session = builtins  # open local file
-        with sftp_session.open(zip_file, 'rb') as file_descriptor:
-            c = six.BytesIO()
-            c.write(file_descriptor.read())
-            c.seek(0)
-        decompressed_files = []
+        frames = self._iter_zipfile(zip_file, sftp_session, chunksize)
+        if chunksize:
+            return frames
+        return next(frames, pd.DataFrame())
+
+    def _iter_zipfile(self, zip_file, sftp_session=None, chunksize=None):
+        """
+        Generator used by :meth:`_load_zipfile`.
+
+        The archive is read into memory once and its members are streamed
+        straight into the parser, nothing is extracted to disk. When there is
+        a pool of parser processes (and not in chunked mode), each member is
+        decompressed here while the previous ones are parsed in the pool.
+        """
+        self.logger.info('Decompressing ZIP file {0}...'.format(zip_file))
+        with df_tools.open_file(zip_file, sftp_session) as file_descriptor:
+            zip_buffer = six.BytesIO(file_descriptor.read())
         try:
-            with zipfile.ZipFile(c, 'r') as zip_data:
-                # extract all to a temporary folder
-                zip_data.extractall(temp_dir)
-                # Recursive call to get_stats_from_host using localfs
-                decompressed_files = [os.path.join(temp_dir,
-                                                   f.filename)
-                                      for f in zip_data.filelist]
-                _df = self.get_stats_from_host(
-                    filespec_list=decompressed_files
-                )
+            with zipfile.ZipFile(zip_buffer, 'r') as zip_data:
+                members = [member for member in zip_data.infolist()
+                           if not member.filename.endswith('/')]
+                if self._parser_pool and not chunksize:
+                    frames = [self._parse_in_pool(zip_data.read(member),
+                                                  member.filename)
+                              for member in members]
+                    frames = [frame.get() for frame in frames]
+                else:
+                    frames = []
+                    for member in members:
+                        with zip_data.open(member) as member_file:
+                            if chunksize:
+                                for chunk in df_tools.dataframize_stream(
+                                    member_file,
+                                    member.filename,
+                                    self.logger,
+                                    chunksize
+                                ):
+                                    yield chunk
+                            else:
+                                frames.append(df_tools.dataframize_stream(
+                                    member_file,
+                                    member.filename,
+                                    self.logger
+                                ))
+                if not chunksize:
+                    yield df_tools.merge_dataframes(frames)
         except (zipfile.BadZipfile, zipfile.LargeZipFile) as exc:
             self.logger.error('Bad ZIP file: {0}'.format(zip_file))
             self.logger.exception(exc)
         finally:
-            for a_file in decompressed_files:
-                self.logger.debug('Deleting file {0}'.format(a_file))
-                os.remove(a_file)
-            c.close()
-
-        return _df
+            zip_buffer.close()
 
 
 def load_zipfile(zipfile, system=None):
@@ -1020,6 +2468,7 @@ def add_methods_to_pandas_dataframe(logger=None):
     pd.DataFrame.oper_wrapper = calculations.oper_wrapper
     pd.DataFrame.recursive_lis = calculations.recursive_lis
     pd.DataFrame.apply_calcs = calculations.apply_calcs
+    pd.DataFrame.aggregate_calcs = calculations.aggregate_calcs
     pd.DataFrame.clean_calcs = calculations.clean_calcs
     pd.DataFrame.logger = logger or init_logger()
     pd.DataFrame.select_var = df_tools.select
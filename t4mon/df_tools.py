@@ -5,11 +5,13 @@ Dataframe-related functions used by other submodules.
 """
 
 import re
+import bz2
+import zlib
 import os.path
 from itertools import takewhile
 from collections import OrderedDict
 
-from six import string_types, advance_iterator
+from six import BytesIO, string_types
 
 import numpy as np
 import t4mon
@@ -18,11 +20,27 @@ from paramiko import SFTPClient
 from six.moves import builtins, cStringIO
 from t4mon.logger import init_logger
 
+try:
+    import lzma
+except ImportError:  # Python 2 without backports.lzma, no xz support
+    lzma = None
+
 SEPARATOR = ','  #: CSV separator
 START_HEADER_TAG = "$$$ START COLUMN HEADERS $$$"  #: Start of Format-2 header
 END_HEADER_TAG = "$$$ END COLUMN HEADERS $$$"  #: End of Format-2 header
 DATETIME_TAG = 'Sample Time'  #: Column containing sample datetime
 T4_DATE_FORMAT = '%Y-%b-%d %H:%M:%S.00'  #: Format for date column
+AVERAGE_TAG = 'Column Average'  #: Footer line closing the samples
+ENCODING = 'latin-1'  #: Encoding of T4-CSV files
+READ_BLOCKSIZE = 1 << 20  #: Size of the blocks read from T4-CSV files
+
+START_HEADER_TAG_B = START_HEADER_TAG.encode(ENCODING)
+AVERAGE_TAG_B = AVERAGE_TAG.encode(ENCODING)
+
+#: Extensions of the compressed T4-CSV files supported (other than ZIP)
+CODEC_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+#: Magic bytes of the compressed T4-CSV files supported (other than ZIP)
+CODEC_MAGIC = {b'\x1f\x8b': 'gzip', b'BZh': 'bz2', b'\xfd7zXZ\x00': 'xz'}
 
 
 class ToDfError(Exception):
@@ -81,6 +99,70 @@ def consolidate_data(partial_dataframe, dataframe=None, system=None):
     return pd.concat([dataframe, partial_dataframe])
 
 
+def merge_dataframes(dataframes):
+    """
+    Merge a sequence of dataframes in a single operation.
+
+    The result is the same as chaining ``combine_first`` over the sequence
+    (earlier dataframes win on overlapping index values, sorted index and
+    sorted union of the columns) but aligning all the data only once instead
+    of reallocating the accumulated dataframe on each step. As with
+    ``combine_first`` on an empty dataframe, a single dataframe is returned
+    untouched.
+
+    Note:
+        When merging several dataframes, unlike ``combine_first``, repeated
+        index values within a dataframe are merged into one row too (first
+        non-null value of each column), and rows with a null index
+        (unparsable sample time) are dropped.
+
+    Arguments:
+        dataframes (Iterable[pandas.DataFrame]): Input dataframes, in order
+    Return:
+        ``pandas.DataFrame``
+    """
+    dataframes = [_df for _df in dataframes if not _df.empty]
+    if not dataframes:
+        return pd.DataFrame()
+    if len(dataframes) == 1:
+        return dataframes[0]
+    _df = pd.concat(dataframes)
+    # first non-null value on each column for every index value
+    levels = list(range(_df.index.nlevels)) if _df.index.nlevels > 1 else 0
+    _df = _df.groupby(level=levels).first()
+    return _df.sort_index(axis=1)
+
+
+def consolidate_systems(partial_dataframes, dataframe=None):
+    """
+    Consolidate at once the single-index dataframes obtained for several
+    systems into a ``(Sample Time, system)`` MultiIndex dataframe, optionally
+    appended to ``dataframe``.
+
+    Arguments:
+        partial_dataframes (dict or Iterable[tuple]):
+            ``{system: pandas.DataFrame}`` or ``(system, pandas.DataFrame)``
+            pairs, in the order they will be stored
+    Keyword Arguments:
+        dataframe (pandas.DataFrame): Optional dataframe to consolidate with
+    Return:
+        ``pandas.DataFrame``
+    """
+    if isinstance(partial_dataframes, dict):
+        partial_dataframes = partial_dataframes.items()
+    frames = [] if dataframe is None or dataframe.empty else [dataframe]
+    for (system, partial_dataframe) in partial_dataframes:
+        if not isinstance(partial_dataframe, pd.DataFrame):
+            raise ToDfError('Cannot consolidate with a non-dataframe object')
+        if not isinstance(system, string_types) or not system:
+            raise ToDfError('Need a system to consolidate the dataframe')
+        if not partial_dataframe.empty:
+            frames.append(_add_secondary_index(partial_dataframe, system))
+    if not frames:
+        return pd.DataFrame() if dataframe is None else dataframe
+    return pd.concat(frames)
+
+
 def reload_from_csv(csv_filename, plain=False, index_col=0):
     """
     Load a CSV into a dataframe.
@@ -207,36 +289,361 @@ def select(dataframe, *args, **kwargs):
     return _df[get_matching_columns(_df, *args, excluded=excluded)]
 
 
-def _extract_t4csv(file_descriptor):
+class T4DataStream(object):
+
     """
-    Read Format1/Format2 T4-CSV and return:
+    File-like object streaming the data section of a T4-CSV file.
+
+    The header is consumed with :meth:`read_header`, which records in
+    :attr:`data_offset` the byte offset where the samples start. From there
+    :meth:`read` hands the sample lines to ``pandas.read_csv`` block by block
+    straight from the underlying file descriptor, stopping at the
+    ``Column Average`` footer or at a repeated Format-2 header, in which case
+    :attr:`new_header` is set so the caller can read the new header and go on.
+
+    Arguments:
+        file_descriptor: open local file or ``paramiko.SFTPFile``
+    Keyword Arguments:
+        blocksize (int): size of each read done on ``file_descriptor``
+    """
+
+    def __init__(self, file_descriptor, blocksize=READ_BLOCKSIZE):
+        self.file_descriptor = file_descriptor
+        self.blocksize = blocksize
+        self.data_offset = None  # byte offset where the samples start
+        self.new_header = False  # a repeated header stopped the stream
+        self.position = 0  # bytes consumed from file_descriptor
+        self._buffer = b''  # read from file_descriptor, not yet scanned
+        self._ready = ''  # scanned data, ready to be handed out
+        self._eof = False
+        self._stop = False
+
+    def __iter__(self):
+        for line in self.read().splitlines(True):
+            yield line
+
+    def __bool__(self):
+        """ Whether or not there are samples left in the stream """
+        while not self._ready and self._scan():
+            pass
+        return bool(self._ready)
+
+    __nonzero__ = __bool__
+
+    def _fill(self):
+        """ Append a block from the file descriptor to the buffer """
+        chunk = self.file_descriptor.read(self.blocksize)
+        if not chunk:
+            self._eof = True
+        elif not isinstance(chunk, bytes):  # file opened in text mode
+            chunk = chunk.encode(ENCODING)
+        self._buffer += chunk
+
+    def _consume(self, size):
+        """ Remove ``size`` bytes from the buffer and return them """
+        (data, self._buffer) = (self._buffer[:size], self._buffer[size:])
+        self.position += len(data)
+        return data
+
+    def _scan(self):
+        """
+        Move complete sample lines from the buffer to the ready queue.
+        The last complete line is held back so the title line preceding a
+        repeated header can be left out. Return ``False`` when no more
+        samples can be obtained.
+        """
+        if self._stop or (self._eof and not self._buffer):
+            return False
+        if not self._eof:
+            self._fill()
+        end = len(self._buffer) if self._eof \
+            else self._buffer.rfind(b'\n') + 1
+        scanned = b'\n' + self._buffer[:end]
+        footer = scanned.find(b'\n' + AVERAGE_TAG_B)
+        header = scanned.find(b'\n' + START_HEADER_TAG_B)
+        if header >= 0 and (footer < 0 or header < footer):
+            # Format-2 violation (t4 merge), the line before the tag is the
+            # title of the next file
+            cut = self._buffer.rfind(b'\n', 0, max(header - 1, 0)) + 1
+            self.new_header = self._stop = True
+        elif footer >= 0:
+            cut = footer
+            self._stop = True
+        elif self._eof:
+            cut = end
+        else:
+            cut = self._buffer.rfind(b'\n', 0, max(end - 1, 0)) + 1
+        self._ready += _to_text(self._consume(cut))
+        return True
+
+    def readline(self):
+        """ Return next line from the file, used for the header """
+        while b'\n' not in self._buffer and not self._eof:
+            self._fill()
+        end = self._buffer.find(b'\n') + 1 or len(self._buffer)
+        return _to_text(self._consume(end))
+
+    def read_header(self):
+        """
+        Read a Format1/Format2 T4-CSV header, return the list of field names
+        """
+        lines = [self.readline() for _ in range(2)]
+        if START_HEADER_TAG in lines[1]:  # Format 2
+            header = []
+            for line in iter(self.readline, ''):
+                line = line.rstrip()
+                if line == END_HEADER_TAG:
+                    break
+                header.append(line)
+            else:
+                raise ExtractCSVException('Missing end of header tag')
+        else:  # Format 1
+            lines.extend(self.readline() for _ in range(2))
+            header = [lines[3].rstrip()]
+        if not any(header):
+            raise ExtractCSVException('Empty header')
+        self.new_header = self._stop = False
+        self.data_offset = self.position
+        return SEPARATOR.join(header).split(SEPARATOR)
+
+    def skip_to_last_header(self, field_names):
+        """
+        Move the stream to the last repeated Format-2 header (t4 merge)
+        preceding the footer, so that only the samples after it are streamed
+        as done by :func:`to_dataframe`. The file is scanned (not parsed) and
+        then read again from that header, or from the current position if
+        there is no repeated header.
+
+        Arguments:
+            field_names (list): field names of the current header
+        Return:
+            list
+            field names of the last header, ``None`` if the file descriptor
+            cannot seek (i.e. decompressed on the fly), leaving it untouched
+        """
+        file_descriptor = self.file_descriptor
+        ready = len(self._ready.encode(ENCODING))  # scanned, not handed out
+        try:
+            origin = file_descriptor.tell() - len(self._buffer) - ready
+        except (AttributeError, IOError, ValueError):
+            return None
+        self.position -= ready
+        file_descriptor.seek(origin)
+        (start, pending, last_tag) = (origin, b'', None)
+        while True:
+            chunk = file_descriptor.read(self.blocksize)
+            if chunk and not isinstance(chunk, bytes):
+                chunk = chunk.encode(ENCODING)
+            block = pending + chunk
+            # keep the incomplete last line for the next round
+            cut = block.rfind(b'\n') + 1 if chunk else len(block)
+            scanned = b'\n' + block[:cut]
+            footer = scanned.find(b'\n' + AVERAGE_TAG_B)
+            header = scanned.rfind(b'\n' + START_HEADER_TAG_B,
+                                   0,
+                                   len(scanned) if footer < 0 else footer)
+            if header >= 0:
+                last_tag = start + header  # where the tag line starts
+            if footer >= 0 or not chunk:
+                break
+            (start, pending) = (start + cut, block[cut:])
+        (self._buffer, self._ready) = (b'', '')
+        self._eof = self._stop = self.new_header = False
+        if last_tag is None:
+            file_descriptor.seek(origin)
+            return field_names
+        # the title line before the tag belongs to the new header
+        previous = max(origin, last_tag - self.blocksize)
+        file_descriptor.seek(previous)
+        title = file_descriptor.read(last_tag - previous)
+        if not isinstance(title, bytes):
+            title = title.encode(ENCODING)
+        title_start = previous + title.rfind(b'\n', 0, len(title) - 1) + 1
+        self.position += title_start - origin
+        file_descriptor.seek(title_start)
+        return self.read_header()
+
+    def read(self, size=-1):
+        """ Return up to ``size`` characters from the data section """
+        while (size < 0 or len(self._ready) < size) and self._scan():
+            pass
+        if size < 0:
+            size = len(self._ready)
+        (data, self._ready) = (self._ready[:size], self._ready[size:])
+        return data
+
+
+class DecompressedFile(object):
+
+    """
+    Read-only file object decompressing on the fly the gzip, bzip2 or xz
+    data read from another file object (i.e. ``paramiko.SFTPFile``), so
+    compressed T4-CSV files can be streamed into :class:`T4DataStream`
+    without being downloaded or decompressed to disk first.
+    Concatenated streams (i.e. multi-member gzip files or bzip2 files written
+    by ``pbzip2``) are supported.
+
+    Arguments:
+        file_descriptor: compressed file object, closed along with this one
+        codec (str): one of the values in :const:`CODEC_EXTENSIONS`
+    Keyword Arguments:
+        blocksize (int): size of each read done on ``file_descriptor``
+    """
+
+    def __init__(self, file_descriptor, codec, blocksize=READ_BLOCKSIZE):
+        if codec == 'xz' and lzma is None:
+            raise IOError('xz files not supported, lzma module is missing')
+        self.file_descriptor = file_descriptor
+        self.codec = codec
+        self.blocksize = blocksize
+        self._decompressor = self._new_decompressor()
+        self._buffer = b''
+        self._eof = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _new_decompressor(self):
+        if self.codec == 'gzip':
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self.codec == 'bz2':
+            return bz2.BZ2Decompressor()
+        return lzma.LZMADecompressor()
+
+    def _fill(self):
+        """ Decompress the next block read from the file descriptor """
+        data = self.file_descriptor.read(self.blocksize)
+        if not data:
+            self._eof = True
+        while data:
+            if getattr(self._decompressor, 'eof', False):
+                # the previous stream ended, a new one starts here
+                self._decompressor = self._new_decompressor()
+            try:
+                self._buffer += self._decompressor.decompress(data)
+            except EOFError:  # stream ended, no eof attribute in python 2
+                self._decompressor = self._new_decompressor()
+                continue
+            # bytes after the end of a stream belong to the next one
+            data = self._decompressor.unused_data
+            if data:
+                self._decompressor = self._new_decompressor()
+
+    def read(self, size=-1):
+        """ Return up to ``size`` decompressed bytes """
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            self._fill()
+        if size < 0:
+            size = len(self._buffer)
+        (data, self._buffer) = (self._buffer[:size], self._buffer[size:])
+        return data
+
+    def close(self):
+        self.file_descriptor.close()
+
+
+def get_codec(data_file=None, head=b''):
+    """
+    Return the codec of a compressed file as in :const:`CODEC_EXTENSIONS`,
+    from the file extension or else from its first bytes (``head``).
+    ``None`` if the file is not compressed (or is a ZIP file).
+    """
+    if data_file:
+        # leave out the OpenVMS file version, if any
+        extension = os.path.splitext(re.sub(r';\d*$', '', data_file))[1]
+        if extension.lower() in CODEC_EXTENSIONS:
+            return CODEC_EXTENSIONS[extension.lower()]
+    for (magic, codec) in CODEC_MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def decompress_file(file_descriptor,
+                    data_file=None,
+                    blocksize=READ_BLOCKSIZE):
+    """
+    Return ``file_descriptor`` wrapped in a :class:`DecompressedFile` if it
+    is compressed (see :func:`get_codec`), otherwise as is.
+    ``file_descriptor`` must be seekable if the extension of ``data_file``
+    does not tell the codec, its first bytes are checked then.
+    """
+    codec = get_codec(data_file)
+    if not codec:
+        position = file_descriptor.tell()
+        codec = get_codec(head=file_descriptor.read(6))
+        file_descriptor.seek(position)
+    if not codec:
+        return file_descriptor
+    return DecompressedFile(file_descriptor, codec, blocksize)
+
+
+def _to_text(data):
+    """ Decode bytes read from a T4-CSV file """
+    return data if isinstance(data, str) else data.decode(ENCODING)
+
+
+def open_file(data_file, session=None, offset=0):
+    """
+    Open a file for reading in binary mode, from the local filesystem or from
+    the remote host if ``session`` is a valid SFTP session.
+
+    Remote files are read ahead with pipelined requests when ``session`` has
+    a ``prefetch_window`` set (see :class:`t4mon.sftpsession.SftpSession`),
+    instead of waiting for a round trip on each read.
+
+    Arguments:
+        data_file (str): Input filename
+    Keyword Arguments:
+        session (Optional[SFTPClient]): Active SFTP session to a remote host
+        offset (int): position where the file is to be read from, files are
+            not read ahead if not 0
+    Return:
+        file object
+    """
+    if not isinstance(session, SFTPClient):
+        file_descriptor = builtins.open(data_file, 'rb')  # open local file
+        file_descriptor.seek(offset)
+        return file_descriptor
+    file_descriptor = session.open(data_file, 'rb')
+    window = getattr(session, 'prefetch_window', None)
+    try:
+        if offset:
+            file_descriptor.seek(offset)
+        elif window is not None:
+            file_size = session.stat(data_file).st_size
+            try:
+                file_descriptor.prefetch(
+                    file_size,
+                    max_concurrent_requests=window or None
+                )
+            except TypeError:  # paramiko<3.3, no limit of concurrent reqs.
+                file_descriptor.prefetch(file_size)
+    except Exception:  # do not leak the remote file handle
+        file_descriptor.close()
+        raise
+    return file_descriptor
+
+
+def _extract_t4csv(file_descriptor, blocksize=READ_BLOCKSIZE):
+    """
+    Read Format1/Format2 T4-CSV header and return:
 
       - field_names: List of strings (column names)
-      - data_lines: List of strings (each one representing a sample)
+      - data: :class:`T4DataStream` positioned at the first sample
+
+    .. note::
+        The samples are not read here but streamed from ``file_descriptor``,
+        so ``data`` must be consumed (i.e. by :func:`to_dataframe`) before
+        the file is closed.
     """
     try:
-        data_lines = [li.rstrip()
-                      for li in takewhile(lambda x:
-                                          not x.startswith('Column Average'),
-                                          file_descriptor)]
-        if START_HEADER_TAG in data_lines[1]:  # Format 2
-            # Search from the bottom in case there's a format2 violation,
-            # common with t4 merge where files are glued just as with cat,
-            # so there are 2x headers, discarding the first part
-            # Our header will be between [h_ini, h_last]
-            h_ini = len(data_lines) - \
-                data_lines[::-1].index(START_HEADER_TAG)
-            h_last = len(data_lines) - \
-                data_lines[::-1].index(END_HEADER_TAG)
-
-            field_names = SEPARATOR.join(
-                data_lines[h_ini:h_last - 1]
-            ).split(SEPARATOR)  # This is now a list with all the columns
-            data_lines = data_lines[h_last:]
-        else:  # Format 1
-            field_names = data_lines[3].split(SEPARATOR)
-            data_lines = data_lines[4:]
-        return (field_names, data_lines)
+        data = T4DataStream(file_descriptor, blocksize=blocksize)
+        field_names = data.read_header()
+        return (field_names, data)
     except Exception:
         raise ExtractCSVException
 
@@ -349,32 +756,61 @@ def _to_t4csv(file_object, output, t4format=2, system_id=None):
         csvfile.write(file_object.read())
 
 
+def _read_t4data(field_names, data, chunksize=None):
+    """
+    Parse the samples in ``data`` (file-like object) with ``pd.read_csv``.
+    Return an iterator of dataframes of up to ``chunksize`` rows if
+    ``chunksize`` is given.
+    """
+    # Multiple columns may have a 'sample time' alike column,
+    # only use first (case insensitive search)
+    df_timecol = [s for s in field_names
+                  if DATETIME_TAG.upper() in s.upper()]
+    if not df_timecol:
+        raise ToDfError('No {0} column found'.format(DATETIME_TAG))
+    index_col = df_timecol[:1]
+
+    def _clean(_df):
+        # Remove redundant time columns (if any)
+        _df.drop(df_timecol[1:], axis=1, inplace=True)
+        # Remove duplicate columns to avoid problems with combine_first()
+        return remove_duplicate_columns(_df)
+
+    reader = pd.read_csv(data,
+                         header=None,
+                         parse_dates=index_col,
+                         index_col=index_col,
+                         names=field_names,
+                         chunksize=chunksize)
+    if chunksize:
+        return (_clean(chunk) for chunk in reader)
+    return _clean(reader)
+
+
 def to_dataframe(field_names, data):
     """
     Core method used by :func:`~dataframize`.
-    Load T4-CSV data into a pandas DataFrame
+    Load T4-CSV data into a pandas DataFrame.
+
+    ``data`` is usually the :class:`T4DataStream` returned by
+    :func:`_extract_t4csv`, a list of sample lines is also accepted.
+    When a merged file carries a repeated header, only the samples after the
+    last header are kept.
     """
     _df = pd.DataFrame()  # default to be returned if exception is found
     try:
         if field_names and data:  # else return empty dataframe
-            # put data in a file object and send it to pd.read_csv()
-            fbuffer = cStringIO()
-            fbuffer.writelines(('{0}\n'.format(line) for line in data))
-            fbuffer.seek(0)
-            # Multiple columns may have a 'sample time' alike column,
-            # only use first (case insensitive search)
-            df_timecol = (s for s in field_names
-                          if DATETIME_TAG.upper() in s.upper())
-            index_col = [advance_iterator(df_timecol)]
-            _df = pd.read_csv(fbuffer,
-                              header=None,
-                              parse_dates=index_col,
-                              index_col=index_col,
-                              names=field_names)
-            # Remove redundant time columns (if any)
-            _df.drop(df_timecol, axis=1, inplace=True)
-            # Remove duplicate columns to avoid problems with combine_first()
-            _df = remove_duplicate_columns(_df)
+            if not hasattr(data, 'read'):  # put lines in a file object
+                fbuffer = cStringIO()
+                fbuffer.writelines(('{0}\n'.format(line) for line in data))
+                fbuffer.seek(0)
+                data = fbuffer
+            _df = _read_t4data(field_names, data)
+            # Discard the part preceding a repeated header (t4 merge)
+            while getattr(data, 'new_header', False):
+                field_names = data.read_header()
+                _df = _read_t4data(field_names, data) if data \
+                    else pd.DataFrame()
 
     except (StopIteration, Exception) as exc:  # Not T4-compliant!
         raise ToDfError(exc)
@@ -382,7 +818,42 @@ def to_dataframe(field_names, data):
     return _df
 
 
-def dataframize(data_file, session=None, logger=None):
+def iter_dataframe(field_names, data, chunksize, prescan=True):
+    """
+    Like :func:`~to_dataframe` but yielding dataframes of up to ``chunksize``
+    rows, each with the :const:`DATETIME_TAG` index.
+
+    Note:
+        As with :func:`~to_dataframe`, only the samples after the last
+        repeated header of a merged file are returned. If ``prescan`` is set
+        and the file can seek, it is scanned for it first (see
+        :meth:`T4DataStream.skip_to_last_header`), otherwise the chunks of
+        each part are held until the next part starts or the file ends.
+        ``prescan`` should be unset for remote files, which would otherwise
+        be transferred twice.
+    """
+    try:
+        scan = prescan and field_names
+        streamed = scan and data.skip_to_last_header(field_names)
+        field_names = streamed or field_names
+        held = []  # chunks that a repeated header could still discard
+        while field_names and data:
+            for chunk in _read_t4data(field_names, data, chunksize):
+                if streamed:
+                    yield chunk
+                else:
+                    held.append(chunk)
+            if not data.new_header:
+                break
+            field_names = data.read_header()
+            held = []
+        for chunk in held:
+            yield chunk
+    except (StopIteration, Exception) as exc:  # Not T4-compliant!
+        raise ToDfError(exc)
+
+
+def dataframize(data_file, session=None, logger=None, chunksize=None):
     """
     Load CSV data into a pandas DataFrame.
 
@@ -394,37 +865,138 @@ def dataframize(data_file, session=None, logger=None):
     probably as a product of an horizontal merge of different CSVs. In those
     cases the first column having 'Sample Time' on its name will be used.
 
+    The file is streamed into ``pandas.read_csv`` from the open file
+    descriptor, no intermediate copies of its contents are kept in memory.
+    When ``chunksize`` is given, an iterator is returned instead, yielding
+    dataframes of up to ``chunksize`` rows (see :func:`~iter_dataframe`).
 
     If ``session`` is not a valid SFTP session, work with local file system.
 
+    Files compressed with gzip, bzip2 or xz (told by the extension, i.e.
+    ``.csv.gz``, or else by the first bytes of the file) are decompressed on
+    the fly while read (see :class:`DecompressedFile`).
+
     Arguments:
         data_file (str): Input T4-CSV filename
     Keyword Arguments:
         session (Optional[SFTPClient]): Active SFTP session to a remote host
         logger (Optional[logging.Logger]): logging instance
+        chunksize (Optional[int]): Number of rows of each yielded dataframe
+    Return:
+        pandas.DataFrame or iterator of pandas.DataFrame
+    """
+
+    logger = logger or init_logger()
+    frames = _dataframize(data_file, session, logger, chunksize)
+    if chunksize:
+        return frames
+    try:
+        return next(frames, pd.DataFrame())
+    finally:
+        frames.close()  # close the file descriptor
+
+
+def dataframize_buffer(data, data_file=None, loggername=None):
+    """
+    Same as :func:`~dataframize` for T4-CSV contents already read into
+    memory, i.e. downloaded by another thread.
+
+    Being a module level function taking only picklable arguments, it can be
+    sent to a ``multiprocessing.Pool``. Compressed contents (gzip, bzip2 or
+    xz) are decompressed while parsed.
+
+    Arguments:
+        data (bytes): T4-CSV file contents
+    Keyword Arguments:
+        data_file (Optional[str]): Input T4-CSV filename, for logging
+        loggername (Optional[str]): name of the logger to use
     Return:
         pandas.DataFrame
     """
+    logger = init_logger(name=loggername) if loggername else init_logger()
+    logger.info('Loading file {0}...'.format(data_file))
+    file_descriptor = BytesIO(data)
+    codec = get_codec(data_file, data[:6])
+    if codec:
+        file_descriptor = DecompressedFile(file_descriptor, codec)
+    frames = _parse_t4csv(file_descriptor, data_file, logger)
+    return next(frames, pd.DataFrame())
+
+
+def dataframize_stream(file_descriptor,
+                       data_file=None,
+                       logger=None,
+                       chunksize=None):
+    """
+    Same as :func:`~dataframize` for an already open file object, i.e. a
+    member of a ZIP archive opened with ``zipfile.ZipFile.open``, which is
+    parsed while being read. The file object is not closed.
 
+    Arguments:
+        file_descriptor: open file object, in binary mode
+    Keyword Arguments:
+        data_file (Optional[str]): Input T4-CSV filename, for logging
+        logger (Optional[logging.Logger]): logging instance
+        chunksize (Optional[int]): Number of rows of each yielded dataframe
+    Return:
+        pandas.DataFrame or iterator of pandas.DataFrame
+    """
     logger = logger or init_logger()
     logger.info('Loading file {0}...'.format(data_file))
+    frames = _parse_t4csv(file_descriptor, data_file, logger, chunksize)
+    if chunksize:
+        return frames
+    return next(frames, pd.DataFrame())
+
+
+def _dataframize(data_file, session, logger, chunksize=None):
+    """
+    Generator used by :func:`~dataframize`
+    """
+    logger.info('Loading file {0}...'.format(data_file))
+    blocksize = getattr(session, 'read_size', None) or READ_BLOCKSIZE
     try:
-        if not isinstance(session, SFTPClient):
-            session = builtins  # open local file
-        with session.open(data_file) as file_descriptor:
-            _single_df = to_dataframe(*_extract_t4csv(file_descriptor))
-        return _single_df
+        with open_file(data_file, session) as file_descriptor:
+            file_descriptor = decompress_file(file_descriptor,
+                                              data_file,
+                                              blocksize)
+            # remote files are read only once (see iter_dataframe)
+            for chunk in _parse_t4csv(file_descriptor,
+                                      data_file,
+                                      logger,
+                                      chunksize,
+                                      blocksize,
+                                      not isinstance(session, SFTPClient)):
+                yield chunk
     except IOError:  # non-existing files also return an empty dataframe
         logger.error('File not found: {0}'.format(data_file))
-        return pd.DataFrame()
+
+
+def _parse_t4csv(file_descriptor,
+                 data_file,
+                 logger,
+                 chunksize=None,
+                 blocksize=READ_BLOCKSIZE,
+                 prescan=True):
+    """
+    Generator yielding the dataframe(s) read from an open T4-CSV file
+    """
+    try:
+        (field_names, data) = _extract_t4csv(file_descriptor, blocksize)
+        if chunksize:
+            for chunk in iter_dataframe(field_names,
+                                        data,
+                                        chunksize,
+                                        prescan):
+                yield chunk
+        else:
+            yield to_dataframe(field_names, data)
     except ExtractCSVException:
         logger.error('An error occurred while extracting the CSV file: {0}'
                      .format(data_file))
-        return pd.DataFrame()
     except ToDfError:
         logger.error('Error occurred while processing CSV file: {0}'
                      .format(data_file))
-        return pd.DataFrame()
 
 
 def remove_outliers(dataframe, n_std=2):
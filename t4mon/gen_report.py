@@ -186,6 +186,22 @@ class Report(object):
         yield None
 
 
+def get_graphs_variables(graphs_definition_file):
+    """
+    Return the partial variable names plotted in a graphs definition file
+
+    Arguments:
+        graphs_definition_file (str): graphs definition filename
+    Return:
+        list
+    """
+    with open(graphs_definition_file, 'r') as graphs_txt:
+        lines = [line.strip() for line in graphs_txt]
+    return [name.strip() for line in lines
+            if line and line[0] != '#' and ';' in line
+            for name in line.split(';')[0].split(',') if name.strip()]
+
+
 def gen_report(container, system):
     """
     Convenience function for calling :meth:`.Report.render()` method
@@ -4,7 +4,9 @@
 import os
 import sys
 import types
+import signal
 import logging
+import threading
 import datetime as dt
 from functools import wraps
 from multiprocessing import Pool
@@ -58,6 +60,9 @@ class Orchestrator(object):
             Settings filename
         safe (boolean or False):
             Serial (slower) mode, not using threads or multiple processes
+        daemon (boolean or False):
+            Keep running, collecting the data periodically (see
+            :meth:`~t4mon.collector.Collector.poll`)
 
     Attributes:
         data (pandas.DataFrame): data retrieved from the remote hosts
@@ -72,6 +77,7 @@ class Orchestrator(object):
         reports_written (list): finished report's filenames
         settings_file (str): settings file as ``settings_file`` argument
         safe (boolean): flag indicating safe/threaded mode (``safe``` argument)
+        daemon (boolean): flag indicating daemon mode (``daemon`` argument)
         store_folder (str): output folder for retrieved data as per
             ``settings_file``
     """
@@ -82,6 +88,7 @@ class Orchestrator(object):
                  noreports=False,
                  settings_file=None,
                  safe=False,
+                 daemon=False,
                  **kwargs):
         self.data = pd.DataFrame()
         self.date_time = dt.date.strftime(dt.datetime.today(),
@@ -94,6 +101,7 @@ class Orchestrator(object):
         self.reports_written = []
         self.settings_file = settings_file or arguments.DEFAULT_SETTINGS_FILE
         self.safe = safe
+        self.daemon = daemon
         self.store_folder = None
         self.systems = None
         self.kwargs = kwargs
@@ -246,8 +254,7 @@ class Orchestrator(object):
                 'store_folder'
             ) if conf.has_option('MISC', 'store_folder') else './store'
 
-        self.systems = [item for item in conf.sections()
-                        if item not in ['GATEWAY', 'MISC']]
+        self.systems = arguments.get_systems(conf)
 
     def date_tag(self):
         """
@@ -343,11 +350,14 @@ class Orchestrator(object):
             safe=self.safe,
             **self.kwargs
         )
+        if self.daemon:
+            self._start_daemon(_collector)
+            return
 
         _collector.start()
         self.data = _collector.data
         self.logs = _collector.logs
-        self.systems = _collector.systems
+        self.systems = _collector.systems + _collector.virtual_systems
 
         if self.data.empty:
             self.logger.critical('Could not retrieve data!!! Aborting.')
@@ -364,6 +374,67 @@ class Orchestrator(object):
 
         self.logger.info('Done!')
 
+    def _start_daemon(self, _collector):  # pragma: no cover
+        """
+        Keep collecting the data until interrupted (Ctrl-C or SIGTERM),
+        storing the results and rendering the report of each system as soon
+        as they are available
+        """
+        stop_event = threading.Event()
+
+        def _stop(*args):
+            self.logger.info('Stopping the collector daemon')
+            stop_event.set()
+
+        try:
+            signal.signal(signal.SIGTERM, _stop)
+        except ValueError:  # not running in the main thread
+            pass
+        self.logger.info('Starting the collector daemon')
+        try:
+            _collector.poll(
+                callback=lambda system: self._store_system(_collector,
+                                                           system),
+                stop_event=stop_event
+            )
+        except KeyboardInterrupt:
+            _stop()
+        self.logger.info('Done!')
+
+    @check_folders
+    def _store_system(self, collector, system):
+        """
+        Make a local copy in CSV of the current data and logs for a system,
+        then render its report (daemon mode)
+        """
+        self.date_time = dt.date.strftime(dt.datetime.today(),
+                                          "%d/%m/%Y %H:%M:%S")
+        self.data = collector.data
+        self.logs = collector.logs
+        self.systems = collector.systems + collector.virtual_systems
+        if self.data.empty or \
+           system not in self.data.index.get_level_values('system'):
+            self.logger.warning('{0} | No data to store'.format(system))
+            return
+        destfile = '{0}/data_{1}_{2}.csv'.format(self.store_folder,
+                                                 self.date_tag(),
+                                                 system)
+        self.data.xs(system, level='system').to_csv(destfile)
+        self.logger.info('{0} | Data stored in {1}'.format(system, destfile))
+        if not collector.nologs and system in self.logs:
+            with open('{0}/logs_{1}_{2}.txt'.format(self.store_folder,
+                                                    system,
+                                                    self.date_tag()),
+                      'w') as logtxt:
+                logtxt.writelines(self.logs[system])
+        if self.noreports:
+            return
+        try:
+            self.reports_written.append(self.create_report(system))
+        except Exception as exc:
+            self.logger.error('{0} | Could not create the report: {1}'
+                              .format(system, repr(exc)))
+
     @check_files
     def create_reports_from_local(self,
                                   data_file,
@@ -399,7 +470,8 @@ class Orchestrator(object):
             if system:
                 self.systems = system if isinstance(system, list) else [system]
             else:
-                self.systems = _collector.systems
+                self.systems = _collector.systems + \
+                    getattr(_collector, 'virtual_systems', [])
         else:  # CSV
             if not system:
                 system = os.path.splitext(os.path.basename(data_file))[0]
@@ -7,6 +7,7 @@ Open the sftp session to the destination
 import time
 import getpass
 import logging
+import threading
 from socket import error as socket_error
 from socket import timeout as socket_timeout
 from os.path import expanduser
@@ -14,6 +15,8 @@ from os.path import expanduser
 import paramiko
 from sshtunnel import HandlerSSHTunnelForwarderError
 
+DEFAULT_IDLE_TIMEOUT = 300.0  #: idle pooled connections are closed after this
+
 
 class SFTPSessionError(Exception):
 
@@ -21,17 +24,135 @@ class SFTPSessionError(Exception):
     pass
 
 
+class SftpSessionPool(object):
+
+    """
+    Pool of SSH connections (``paramiko.SSHClient`` along with their SFTP
+    session) reused by :class:`SftpSession` instead of doing a new SSH
+    handshake each time, keyed by (hostname, user, port).
+
+    A connection is handed out to one session at a time. Before that, it is
+    checked with a keepalive message and replaced if broken. Connections
+    idle for more than ``idle_timeout`` seconds are closed.
+
+    Keyword Arguments:
+        idle_timeout (float): seconds an unused connection is kept open
+        logger (Optional[logging.Logger]): logging instance
+    """
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT, logger=None):
+        self.idle_timeout = idle_timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self.hits = 0  # connections reused
+        self.misses = 0  # new connections
+        self._idle = {}  # key: list of (SSHClient, time when released)
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return 'SSH connection pool: {0} connections, {1} reused'.format(
+            self.misses,
+            self.hits
+        )
+
+    def acquire(self, key):
+        """
+        Return a live idle connection for ``key``, ``None`` if there is none
+        (a new connection is expected then)
+        """
+        self.purge()
+        while True:
+            with self._lock:
+                try:
+                    (client, _) = self._idle.get(key, []).pop()
+                except IndexError:
+                    self.misses += 1
+                    return None
+            if self._is_alive(client):
+                with self._lock:
+                    self.hits += 1
+                return client
+            self.logger.debug('Dropping broken connection to %s', key)
+            self._close_client(client)
+
+    def release(self, key, client):
+        """ Give back a connection to the pool once the session is done """
+        with self._lock:
+            self._idle.setdefault(key, []).append((client, time.time()))
+        self.purge()
+
+    def purge(self, idle_timeout=None):
+        """
+        Close the connections idle for more than ``idle_timeout`` seconds,
+        defaults to :attr:`idle_timeout`
+        """
+        limit = time.time() - (self.idle_timeout if idle_timeout is None
+                               else idle_timeout)
+        expired = []
+        with self._lock:
+            for (key, clients) in list(self._idle.items()):
+                expired.extend(client for (client, released) in clients
+                               if released <= limit)
+                self._idle[key] = [item for item in clients
+                                   if item[1] > limit]
+                if not self._idle[key]:
+                    del self._idle[key]
+        for client in expired:
+            self._close_client(client)
+
+    def close(self):
+        """ Close all the idle connections """
+        self.purge(idle_timeout=-1)
+
+    @staticmethod
+    def _is_alive(client):
+        """ Check the connection is still up by sending a keepalive """
+        transport = client.get_transport()
+        sftp_session = getattr(client, 'sftp_session', None)
+        if not transport or not transport.is_active() or \
+           not sftp_session or sftp_session.sock.closed:
+            return False
+        try:
+            transport.send_ignore()
+        except (EOFError, socket_error, paramiko.SSHException):
+            return False
+        return True
+
+    @staticmethod
+    def _close_client(client):
+        """ Close a connection and its SFTP session """
+        try:
+            if getattr(client, 'sftp_session', None):
+                client.sftp_session.close()
+            client.close()
+        except (EOFError, socket_error, paramiko.SSHException):
+            pass
+
+
 class SftpSession(object):
 
     """
     Defines methods for opening a SFTP session to a remote OpenVMS system
     """
 
-    def __init__(self, hostname, **ssh_arguments):
+    def __init__(self,
+                 hostname,
+                 read_size=None,
+                 prefetch_window=None,
+                 pool=None,
+                 **ssh_arguments):
         """
         Initialize sftp session. Optional ssh argument list:
         ssh_user, ssh_pass, ssh_key, ssh_configfile, ssh_port, ssh_timeout
         Otherwise: open method will check ~/.ssh/config
+
+        ``read_size`` (bytes) and ``prefetch_window`` are made available to
+        the readers as attributes of the SFTP session. Files are read ahead
+        with pipelined requests (up to ``prefetch_window`` at a time, or no
+        limit if 0) unless ``prefetch_window`` is ``None``.
+
+        With a ``pool`` (:class:`SftpSessionPool`), a live connection to the
+        same (hostname, user, port) is reused if any, and the connection is
+        given back to the pool when the session is done instead of closed.
         """
         # Remove all "None" input values
         list(map(ssh_arguments.pop,
@@ -41,6 +162,12 @@ class SftpSession(object):
         self.logger = ssh_arguments.pop('logger') if 'logger' in \
             ssh_arguments else logging.getLogger(__name__)
         self.ssh_arguments = ssh_arguments
+        self.read_size = read_size
+        self.prefetch_window = prefetch_window
+        self.pool = pool
+        self.pool_key = (hostname,
+                         ssh_arguments.get('ssh_user'),
+                         ssh_arguments.get('ssh_port'))
         self.ssh_transport = None
         self.tcp_port = 22
 
@@ -48,9 +175,17 @@ class SftpSession(object):
         """
         Invoked when opening the sftp session (under with statements)
         """
-        sftp_session = self.connect()
+        client = self.pool.acquire(self.pool_key) if self.pool else None
+        if client:
+            self.logger.debug('%s > Reusing pooled connection', self.hostname)
+            self.ssh_transport = client
+            sftp_session = client.sftp_session
+        else:
+            sftp_session = self.connect()
         sftp_session.run_command = self.run_command
         sftp_session.ssh_transport = self.ssh_transport
+        sftp_session.read_size = self.read_size
+        sftp_session.prefetch_window = self.prefetch_window
         # if succeeded, return the sftp_session object, else exit
         self.logger.debug('%s > SFTP %sOK', self.hostname,
                           '' if sftp_session else '*NOT* ')
@@ -62,8 +197,16 @@ class SftpSession(object):
         pass
 
     def __exit__(self, etype, *args):
-        """ Gracefully terminate SSH and SFTP connections """
-
+        """
+        Gracefully terminate SSH and SFTP connections, or give them back to
+        the pool (if any)
+        """
+        if self.pool and self.ssh_transport and etype != self.Break:
+            self.pool.release(self.pool_key, self.ssh_transport)
+            self.ssh_transport = None
+            self.logger.debug('Connection to port %s back to the pool',
+                              self.tcp_port)
+            return None
         if self.ssh_transport:
             if self.ssh_transport.sftp_session:
                 self.ssh_transport.sftp_session.close()
@@ -186,7 +329,8 @@ class SftpSession(object):
         return self.__enter__()
 
     def close(self):
-        """ Close an existing SFTP connection """
+        """ Close an existing SFTP connection, even if pooled """
+        self.pool = None
         return self.__exit__(None)
 
     def _load_ssh_config(self):
@@ -0,0 +1,84 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+"""
+*t4mon* - Benchmark for the per-file merge stage in
+:meth:`t4mon.collector.Collector.get_stats_from_host`
+
+Compares the former accumulation with ``combine_first`` (once per file)
+against :func:`t4mon.df_tools.merge_dataframes` on synthetic per-file
+dataframes. Run with::
+
+    python -m test.benchmarks.bench_merge [number_of_files]
+"""
+from __future__ import print_function, absolute_import
+
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+from t4mon import df_tools
+
+N_FILES = 500  #: number of synthetic files in the largest run
+N_SAMPLES = 288  #: samples per file (one day at 5 minutes)
+N_COLUMNS = 40  #: counters per file
+OVERLAP = 12  #: samples repeated in consecutive files
+
+
+def synthetic_frames(n_files):
+    """
+    Return a list of ``n_files`` dataframes like those obtained from
+    consecutive T4-CSV files: overlapping time ranges and slightly different
+    sets of columns
+    """
+    frames = []
+    start = pd.Timestamp('2015-01-01')
+    for i in range(n_files):
+        offset = pd.Timedelta(minutes=5 * i * (N_SAMPLES - OVERLAP))
+        index = pd.date_range(start + offset,
+                              periods=N_SAMPLES,
+                              freq='5min')
+        # no frequency set, as when parsed from a CSV
+        index = pd.DatetimeIndex(index.values, name=df_tools.DATETIME_TAG)
+        columns = ['Counter{0:02d}'.format(k + i % 3)
+                   for k in range(N_COLUMNS)]
+        frames.append(pd.DataFrame(np.random.rand(N_SAMPLES, N_COLUMNS),
+                                   index=index,
+                                   columns=columns))
+    return frames
+
+
+def combine_first_loop(frames):
+    """ Former approach: accumulate with combine_first once per file """
+    _df = pd.DataFrame()
+    for frame in frames:
+        _df = _df.combine_first(frame)
+    return _df
+
+
+def main(n_files=N_FILES):
+    print('{0:>8} {1:>16} {2:>18} {3:>8}'.format('files',
+                                                 'combine_first (s)',
+                                                 'merge_dataframes (s)',
+                                                 'speedup'))
+    runs = sorted(set([max(n_files // 8, 1),
+                       max(n_files // 4, 1),
+                       max(n_files // 2, 1),
+                       n_files]))
+    for n_run in runs:
+        frames = synthetic_frames(n_run)
+        before = min(timeit.repeat(lambda: combine_first_loop(frames),
+                                   number=1, repeat=3))
+        after = min(timeit.repeat(lambda: df_tools.merge_dataframes(frames),
+                                  number=1, repeat=3))
+        print('{0:>8} {1:>16.3f} {2:>18.3f} {3:>7.1f}x'.format(
+            n_run, before, after, before / after
+        ))
+    # Both approaches must give the same result
+    frames = synthetic_frames(min(n_files, 20))
+    pd.util.testing.assert_frame_equal(combine_first_loop(frames),
+                                       df_tools.merge_dataframes(frames))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else N_FILES)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+"""
+*t4mon* - Benchmark for remote T4-CSV reads with and without prefetching
+
+A paramiko SFTP server serving the ``test`` folder runs in-process, the
+client reaches it through a link adding a fixed delay in each direction,
+which emulates a WAN connection to a remote data centre. The same file is
+downloaded and parsed with :func:`t4mon.df_tools.dataframize` first with
+one synchronous request per read, then with pipelined (prefetched) reads.
+Run with::
+
+    python -m test.benchmarks.bench_sftp [latency_ms]
+"""
+from __future__ import print_function, absolute_import
+
+import os
+import sys
+import time
+import socket
+import threading
+
+import paramiko
+from six.moves import queue
+from t4mon import df_tools
+
+TEST_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        os.pardir,
+                        'test_data.csv')
+LATENCY = 20.0  #: default one-way delay of the emulated link (ms)
+USERNAME = PASSWORD = 'bench'
+RUNS = [  # (description, read_size, prefetch_window)
+    ('synchronous reads', None, None),
+    ('prefetch, window=16', None, 16),
+    ('prefetch, no limit', None, 0),
+    ('prefetch, 4 MB reads', 4 << 20, 0),
+]
+
+
+class _Server(paramiko.ServerInterface):
+
+    """ Accept any session for the benchmark user """
+
+    def check_auth_password(self, username, password):
+        if (username, password) == (USERNAME, PASSWORD):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+
+class _SFTPServer(paramiko.SFTPServerInterface):
+
+    """ Read-only SFTP server for the local filesystem """
+
+    def open(self, path, flags, attr):
+        handle = paramiko.SFTPHandle(flags)
+        handle.readfile = open(path, 'rb')
+        handle.filename = path
+        return handle
+
+    def stat(self, path):
+        return paramiko.SFTPAttributes.from_stat(os.stat(path))
+
+    lstat = stat
+
+
+def _delay_line(source, destination, delay):
+    """
+    Forward everything received from ``source`` to ``destination``, each
+    block ``delay`` seconds after it was received
+    """
+    blocks = queue.Queue()
+
+    def _receive():
+        while True:
+            data = source.recv(65536)
+            blocks.put((time.time() + delay, data))
+            if not data:
+                return
+
+    def _send():
+        while True:
+            (due, data) = blocks.get()
+            time.sleep(max(due - time.time(), 0))
+            if not data:
+                destination.shutdown(socket.SHUT_WR)
+                return
+            destination.sendall(data)
+
+    for target in (_receive, _send):
+        thread = threading.Thread(target=target)
+        thread.daemon = True
+        thread.start()
+
+
+def start_server(latency):
+    """
+    Start the SFTP server behind an emulated link with ``latency`` (ms)
+    and return a client transport connected to it
+    """
+    (client_sock, link_client) = socket.socketpair()
+    (link_server, server_sock) = socket.socketpair()
+    _delay_line(link_client, link_server, latency / 1000.0)
+    _delay_line(link_server, link_client, latency / 1000.0)
+
+    server = paramiko.Transport(server_sock)
+    server.add_server_key(paramiko.RSAKey.generate(2048))
+    server.set_subsystem_handler('sftp', paramiko.SFTPServer, _SFTPServer)
+    server.start_server(event=threading.Event(), server=_Server())
+
+    client = paramiko.Transport(client_sock)
+    client.connect(username=USERNAME, password=PASSWORD)
+    return client
+
+
+def main(latency=LATENCY):
+    transport = start_server(latency)
+    size = os.path.getsize(TEST_CSV) / float(1 << 20)
+    print('{0:.2f} MB T4-CSV file, {1:.0f} ms latency each way'
+          .format(size, latency))
+    print('{0:>24} {1:>12} {2:>8}'.format('', 'time (s)', 'MB/s'))
+    reference = None
+    try:
+        for (description, read_size, prefetch_window) in RUNS:
+            session = paramiko.SFTPClient.from_transport(transport)
+            session.read_size = read_size
+            session.prefetch_window = prefetch_window
+            start = time.time()
+            dataframe = df_tools.dataframize(TEST_CSV, session=session)
+            elapsed = time.time() - start
+            session.close()
+            print('{0:>24} {1:>12.3f} {2:>8.2f}'.format(description,
+                                                        elapsed,
+                                                        size / elapsed))
+            if reference is None:
+                reference = dataframe
+            # Same result whichever the way of reading the file
+            assert dataframe.equals(reference)
+    finally:
+        transport.close()
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else LATENCY)
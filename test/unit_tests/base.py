@@ -4,6 +4,7 @@
 *t4mon* - T4 monitoring base test functions for functional tests
 """
 
+import os
 import sys
 import pickle
 import shutil
@@ -14,6 +15,7 @@ from os import path
 
 import numpy as np
 import pandas as pd
+from paramiko import SFTPAttributes
 from t4mon import logger
 from t4mon.arguments import read_config
 from t4mon.collector import (
@@ -24,6 +26,7 @@ from t4mon.collector import (
 from t4mon.orchestrator import Orchestrator
 
 __all__ = ('BaseTestClass',
+           'LocalSFTPSession',
            'OrchestratorSandbox',
            'MY_DIR',
            'LOGGER',
@@ -100,6 +103,38 @@ class MockLoggingHandler(logging.Handler, object):
             self.release()
 
 
+class LocalSFTPSession(object):
+
+    """
+    Stand-in for a remote SFTP session working on the local file system.
+    Not being a ``paramiko.SFTPClient``, files are opened locally by
+    ``df_tools.open_file``.
+    If ``run_command`` is given, the session can also run remote commands,
+    which are kept in ``commands`` and passed to ``run_command`` for the
+    output lines.
+    """
+
+    def __init__(self, run_command=None):
+        self.commands = []
+        if run_command:
+            def _run_command(command):
+                self.commands.append(command)
+                return run_command(command)
+            self.run_command = _run_command
+
+    chdir = staticmethod(os.chdir)
+    getcwd = staticmethod(os.getcwd)
+    listdir = staticmethod(os.listdir)
+    remove = staticmethod(os.remove)
+    stat = staticmethod(os.stat)
+
+    @staticmethod
+    def listdir_attr(folder='.'):
+        return [SFTPAttributes.from_stat(os.stat(path.join(folder, name)),
+                                         name)
+                for name in os.listdir(folder)]
+
+
 class OrchestratorSandbox(Orchestrator):
 
     def clone(self):
@@ -55,6 +55,17 @@ class TestArguments(unittest.TestCase):
                           arguments.read_config,
                           'badfilename')
 
+    def test_get_systems(self):
+        """ Test function for get_systems and get_gateways """
+        config = arguments.read_config(base.TEST_CONFIG)
+        config.add_section('GATEWAY2')
+        self.assertListEqual(arguments.get_gateways(config),
+                             ['GATEWAY', 'GATEWAY2'])
+        systems = arguments.get_systems(config)
+        self.assertNotIn('MISC', systems)
+        self.assertNotIn('GATEWAY2', systems)
+        self.assertIn('System_1', systems)
+
     def test_parse_arguments_main(self):
         parser = arguments._parse_arguments_main(
             ['--all',
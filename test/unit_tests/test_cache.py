@@ -0,0 +1,243 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+"""
+*t4mon* - T4 monitoring **test functions** for cache.py
+"""
+from __future__ import absolute_import
+
+import os
+import time
+import pickle
+import tempfile
+import unittest
+
+import pandas as pd
+from six import BytesIO
+from mock import patch
+from t4mon import df_tools
+from t4mon.cache import (
+    CACHE_EXTENSION,
+    FileTail,
+    ListingCache,
+    DownloadCache
+)
+from pandas.util.testing import assert_frame_equal
+
+from . import base
+
+
+class TestDownloadCache(unittest.TestCase):
+
+    """ Set of test functions for cache.py """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = DownloadCache(os.path.join(self.folder, 'cache'),
+                                   logger=base.LOGGER)
+
+    def tearDown(self):
+        base.delete_temporary_folder(self.folder)
+
+    def _entries(self):
+        return [item for item in os.listdir(self.cache.folder)
+                if item.endswith(CACHE_EXTENSION)]
+
+    def test_get_and_put(self):
+        """ Test function for DownloadCache.get and DownloadCache.put """
+        self.assertIsNone(self.cache.get('sys1', '/data/a.csv', 100, 1000))
+        self.cache.put(base.TEST_DATAFRAME, 'sys1', '/data/a.csv', 100, 1000)
+        assert_frame_equal(self.cache.get('sys1', '/data/a.csv', 100, 1000),
+                           base.TEST_DATAFRAME)
+        # any change in the key is a different entry
+        self.assertIsNone(self.cache.get('sys2', '/data/a.csv', 100, 1000))
+        self.assertIsNone(self.cache.get('sys1', '/data/b.csv', 100, 1000))
+        self.assertIsNone(self.cache.get('sys1', '/data/a.csv', 101, 1000))
+        self.assertIsNone(self.cache.get('sys1', '/data/a.csv', 100, 1001))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 5))
+        # empty dataframes are not cached
+        self.cache.put(pd.DataFrame(), 'sys1', '/data/c.csv', 100, 1000)
+        self.assertEqual(len(self._entries()), 1)
+        self.assertNotIn('.tmp', ''.join(os.listdir(self.cache.folder)))
+
+    def test_evict(self):
+        """ Test that least recently used entries are evicted first """
+        for (index, name) in enumerate(['a', 'b', 'c']):
+            self.cache.put(base.TEST_DATAFRAME, 'sys1', name, 100, 1000)
+            # set a distinct last access time for each entry
+            os.utime(self.cache._get_filename('sys1', name, 100, 1000),
+                     (index, index))
+        entry_size = os.path.getsize(
+            self.cache._get_filename('sys1', 'a', 100, 1000)
+        )
+        self.cache.get('sys1', 'a', 100, 1000)  # 'b' is now the oldest one
+        self.cache.max_size = 2 * entry_size
+        self.cache.evict()
+        self.assertEqual(len(self._entries()), 2)
+        self.assertIsNone(self.cache.get('sys1', 'b', 100, 1000))
+        self.assertIsNotNone(self.cache.get('sys1', 'a', 100, 1000))
+        self.assertIsNotNone(self.cache.get('sys1', 'c', 100, 1000))
+
+    def test_evict_indexed(self):
+        """
+        Test that the cache folder is only listed on start, and that entries
+        which cannot be loaded are misses
+        """
+        for (index, name) in enumerate(['a', 'b', 'c']):
+            self.cache.put(base.TEST_DATAFRAME, 'sys1', name, 100, 1000)
+            # 'a' is the most recently used one for a new instance
+            os.utime(self.cache._get_filename('sys1', name, 100, 1000),
+                     (2 - index, 2 - index))
+        entry_size = os.path.getsize(
+            self.cache._get_filename('sys1', 'a', 100, 1000)
+        )
+        cache = DownloadCache(self.cache.folder,
+                              max_size=2 * entry_size,
+                              logger=base.LOGGER)
+        with patch('os.listdir', side_effect=AssertionError):
+            cache.evict()
+            cache.put(base.TEST_DATAFRAME, 'sys1', 'd', 100, 1000)
+        self.assertEqual(len(self._entries()), 2)
+        self.assertIsNone(cache.get('sys1', 'b', 100, 1000))
+        self.assertIsNone(cache.get('sys1', 'c', 100, 1000))
+        self.assertIsNotNone(cache.get('sys1', 'a', 100, 1000))
+        with patch('t4mon.cache.cPickle.load', side_effect=ImportError):
+            self.assertIsNone(cache.get('sys1', 'd', 100, 1000))
+        with patch('t4mon.cache.cPickle.load', side_effect=AttributeError):
+            self.assertIsNone(cache.get('sys1', 'd', 100, 1000))
+
+    def test_discard(self):
+        """ Test function for DownloadCache.discard """
+        self.cache.put(base.TEST_DATAFRAME, 'sys1', 'a', 100, 1000)
+        self.cache.discard('sys1', 'a', 100, 1000)
+        self.cache.discard('sys1', 'a', 100, 1000)  # already removed
+        self.assertListEqual(self._entries(), [])
+
+    def test_tail(self):
+        """ Test function for DownloadCache.get_tail and put_tail """
+        self.assertIsNone(self.cache.get_tail('sys1', 'a'))
+        self.cache.put_tail(FileTail(['a', 'b'], 100, b'1,2\n', 120, 1000),
+                            'sys1',
+                            'a')
+        tail = self.cache.get_tail('sys1', 'a')
+        self.assertIsInstance(tail, FileTail)
+        self.assertEqual((tail.offset, tail.start), (100, 96))
+        self.assertIsNone(self.cache.get('sys1', 'a', 120, 1000))
+
+    def test_pickle(self):
+        """ Test that the cache can be pickled, i.e. inside a Collector """
+        self.cache.put(base.TEST_DATAFRAME, 'sys1', 'a', 100, 1000)
+        cache = pickle.loads(pickle.dumps(self.cache))
+        self.assertEqual(cache.folder, self.cache.folder)
+        assert_frame_equal(cache.get('sys1', 'a', 100, 1000),
+                           base.TEST_DATAFRAME)
+
+
+class TestFileTail(unittest.TestCase):
+
+    """ Set of test functions for cache.FileTail """
+
+    @classmethod
+    def setUpClass(cls):
+        with open(base.TEST_CSV, 'rb') as csvfile:
+            cls.contents = csvfile.read()
+        cls.full_dataframe = df_tools.dataframize(base.TEST_CSV)
+
+    def test_from_data(self):
+        """ Test function for FileTail.from_data """
+        # file being written, last line not complete yet
+        cut = len(self.contents) // 2
+        tail = FileTail.from_data(self.contents[:cut], cut, 1000)
+        (field_names, _) = df_tools._extract_t4csv(BytesIO(self.contents))
+        self.assertListEqual(tail.field_names, field_names)
+        self.assertEqual(tail.offset,
+                         self.contents.rfind(b'\n', 0, cut) + 1)
+        self.assertTrue(tail.last_line.endswith(b'\n'))
+        self.assertEqual(self.contents[tail.start:tail.offset],
+                         tail.last_line)
+        self.assertEqual((tail.size, tail.mtime), (cut, 1000))
+        # closed files or not T4-CSV files do not have a tail
+        self.assertIsNone(FileTail.from_data(
+            self.contents + b'Column Average,1.0\n', 0, 0
+        ))
+        self.assertIsNone(FileTail.from_data(b'not,a,t4csv\n', 0, 0))
+
+    def test_from_file(self):
+        """ Test that FileTail.from_file scans the file by blocks """
+        for cut in (len(self.contents) // 2, len(self.contents)):
+            expected = FileTail.from_data(self.contents[:cut], cut, 1000)
+            for blocksize in (7, 100, df_tools.READ_BLOCKSIZE):
+                tail = FileTail.from_file(BytesIO(self.contents[:cut]),
+                                          cut,
+                                          1000,
+                                          blocksize=blocksize)
+                self.assertEqual(tail.__dict__, expected.__dict__)
+        # a footer split across two blocks
+        self.assertIsNone(FileTail.from_file(
+            BytesIO(self.contents + b'Column Average,1.0\n'),
+            0,
+            0,
+            blocksize=7
+        ))
+
+    def test_append(self):
+        """ Test function for FileTail.append """
+        cut = len(self.contents) // 3
+        tail = FileTail.from_data(self.contents[:cut], cut, 1000)
+        dataframe = df_tools.dataframize_buffer(self.contents[:tail.offset])
+        tail.last_sample = dataframe.index.max()
+        # nothing complete was appended
+        assert_frame_equal(
+            tail.append(dataframe,
+                        self.contents[tail.start:tail.offset + 5],
+                        tail.offset + 5,
+                        1001),
+            dataframe
+        )
+        self.assertEqual(tail.mtime, 1001)
+        # the rest of the file
+        dataframe = tail.append(dataframe,
+                                self.contents[tail.start:],
+                                len(self.contents),
+                                1002)
+        assert_frame_equal(dataframe, self.full_dataframe)
+        self.assertEqual(tail.offset, len(self.contents))
+        self.assertEqual(tail.last_sample, self.full_dataframe.index.max())
+        # the file was replaced by another one
+        self.assertIsNone(tail.append(dataframe, b'1,2\n3,4\n', 8, 1003))
+
+
+class TestListingCache(unittest.TestCase):
+
+    """ Set of test functions for cache.ListingCache """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = ListingCache(os.path.join(self.folder, 'listings.db'),
+                                  logger=base.LOGGER)
+        self.key = ('sys1', 'DSA3:[STATS]', '*.CSV')
+
+    def tearDown(self):
+        base.delete_temporary_folder(self.folder)
+
+    def test_get_and_put(self):
+        """ Test function for ListingCache.get and ListingCache.put """
+        self.assertIsNone(self.cache.get(self.key, 60))
+        self.assertFalse(os.path.exists(self.cache.filename))
+        self.cache.put(self.key, ['A.CSV', 'B.CSV'], 1000)
+        self.assertListEqual(self.cache.get(self.key, 60, 1000),
+                             ['A.CSV', 'B.CSV'])
+        # folder modification time unknown, only the TTL applies
+        self.assertListEqual(self.cache.get(self.key, 60),
+                             ['A.CSV', 'B.CSV'])
+        # folder modified or listing too old
+        self.assertIsNone(self.cache.get(self.key, 60, 1001))
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get(self.key, 0.05, 1000))
+        self.assertIsNone(self.cache.get(('sys2', ) + self.key[1:], 60))
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 4))
+
+    def test_pickle(self):
+        """ Test that the cache can be pickled, i.e. inside a Collector """
+        self.cache.put(self.key, ['A.CSV'])
+        cache = pickle.loads(pickle.dumps(self.cache))
+        self.assertListEqual(cache.get(self.key, 60), ['A.CSV'])
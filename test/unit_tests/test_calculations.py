@@ -11,7 +11,7 @@ import tempfile
 import unittest
 
 import pandas as pd
-from t4mon import collector
+from t4mon import collector, calculations
 from pandas.util.testing import assert_frame_equal
 
 from .base import LOGGER
@@ -89,6 +89,155 @@ class TestCalculations(unittest.TestCase):
         self.assertTrue(all([math.isnan(self.testdf.G[k])
                              for k in self.testdf.index]))
 
+    def test_compile_calcs(self):
+        """ Test function for compile_calcs """
+        with tempfile.NamedTemporaryFile(mode='w') as calcs_file:
+            calcs_file.write('D = B * (2 - A) + C  # comment\n')
+            calcs_file.write('E = B + C * A\n')  # no operator precedence
+            calcs_file.write('F = (B + C\n')  # missing parenthesis
+            calcs_file.write('not a calculation\n')
+            calcs_file.file.close()
+            plan = calculations.compile_calcs(calcs_file.name, LOGGER)
+            self.assertIs(calculations.compile_calcs(calcs_file.name),
+                          plan)  # compiled only once
+            self.assertListEqual([result for (result, _) in plan.calcs],
+                                 ['D', 'E', 'F'])
+            self.assertEqual(plan.calcs[1][1],
+                             ('op', '*',
+                              ('op', '+', ('col', 'B'), ('col', 'C')),
+                              ('col', 'A')))
+            self.assertIsNone(plan.calcs[2][1])
+            results = plan.evaluate(self.testdf, LOGGER)
+            self.assertListEqual(list(results['D']), [16.0] * 4)
+            self.assertListEqual(list(results['E']), [48.0] * 4)
+            self.assertTrue(math.isnan(results['F']))
+            # same results as solving each line with recursive_lis
+            sign_pattern = re.compile(r'([+\-*/])')
+            parn_pattern = re.compile(r'.*\(+([\w .+\-*/]+)\)+.*')
+            self.testdf.recursive_lis(sign_pattern,
+                                      parn_pattern,
+                                      'E',
+                                      'B + C * A')
+            self.assertListEqual(list(results['E']), list(self.testdf.E))
+            # the input columns are not modified
+            self.assertListEqual(list(self.testdf.B), [8] * 4)
+
+    def test_required_calcs(self):
+        """ Test that only the calculations needed are evaluated """
+        with tempfile.NamedTemporaryFile(mode='w') as calcs_file:
+            calcs_file.write('D = B * A\n')  # 16
+            calcs_file.write('E = D + C\n')  # 32
+            calcs_file.write('F = X + A\n')  # X not in dataframe
+            calcs_file.write('G = F * D\n')
+            calcs_file.write('H = B - A\n')  # 6
+            calcs_file.write('D = D + H\n')  # 22, redefined
+            calcs_file.file.close()
+            plan = calculations.compile_calcs(calcs_file.name, LOGGER)
+            self.assertListEqual(plan.inputs, [{'A', 'B'}, {'C'}, {'X', 'A'},
+                                               set(), {'A', 'B'}, set()])
+            self.assertListEqual(plan.dependencies,
+                                 [set(), {0}, set(), {0, 2}, set(), {0, 4}])
+            self.assertSetEqual(plan.required(['e']), {0, 1})
+            self.assertSetEqual(plan.required(['D', 'XX']), {0, 4, 5})
+            results = plan.evaluate(self.testdf,
+                                    LOGGER,
+                                    selection=plan.required(['^[EG]']))
+            self.assertListEqual(list(results), ['D', 'E', 'F', 'G'])
+            self.assertListEqual(list(results['E']), [32.0] * 4)
+            self.assertTrue(math.isnan(results['F']))
+            self.assertTrue(all(math.isnan(value) for value in results['G']))
+            # same results in parallel
+            results = plan.evaluate(self.testdf, LOGGER, threads=3)
+            self.assertListEqual(list(results['D']), [22.0] * 4)
+            self.assertListEqual(list(results['E']), [32.0] * 4)
+            self.testdf.apply_calcs(calcs_file.name, variables=['^E'])
+        self.assertListEqual(list(self.testdf.columns),
+                             ['A', 'B', 'C', 'D', 'E'])
+        self.assertListEqual(list(self.testdf.D), [16.0] * 4)
+
+    def test_window_functions(self):
+        """ Test the window functions, applied to each system by time """
+        times = pd.to_datetime(['2016-01-01 00:00', '2016-01-01 00:05',
+                                '2016-01-01 00:10', '2016-01-01 00:15'])
+        counter = [4294967000.0, 100.0, 400.0, 50.0]  # wraps, then resets
+        dataframe = pd.concat([
+            pd.DataFrame({'A': counter, 'system': 'SYS1'}, index=times),
+            pd.DataFrame({'A': [1.0, 2.0, 3.0, 4.0], 'system': 'SYS2'},
+                         index=times)
+        ])
+        dataframe.index.name = 'Sample Time'
+        dataframe = dataframe.set_index('system', append=True).iloc[::-1]
+        with tempfile.NamedTemporaryFile(mode='w') as calcs_file:
+            calcs_file.write('D = delta(A)\n')
+            calcs_file.write('R = rate(A) * 300\n')
+            calcs_file.write('M = rolling_mean(A, 2)\n')
+            calcs_file.write('X = rolling_max(D, 3) + 1\n')
+            calcs_file.write('W = ewm(A, 1)\n')
+            calcs_file.write('U = unknown(A)\n')
+            calcs_file.write('V = delta(A, 2)\n')
+            calcs_file.file.close()
+            dataframe.apply_calcs(calcs_file.name)
+        sys1 = dataframe.xs('SYS1', level='system').sort_index()
+        sys2 = dataframe.xs('SYS2', level='system').sort_index()
+        self.assertTrue(math.isnan(sys1.D.iloc[0]))
+        self.assertListEqual(list(sys1.D.iloc[1:]), [396.0, 300.0, 50.0])
+        self.assertListEqual(list(sys2.D.iloc[1:]), [1.0] * 3)
+        self.assertListEqual(list(sys1.R.iloc[1:]), list(sys1.D.iloc[1:]))
+        self.assertListEqual(list(sys2.M), [1.0, 1.5, 2.5, 3.5])
+        self.assertListEqual(list(sys1.X.iloc[1:]), [397.0, 397.0, 397.0])
+        self.assertListEqual(list(sys2.W), list(sys2.A))
+        for column in ['U', 'V']:
+            self.assertTrue(dataframe[column].isnull().all())
+
+    def test_aggregate_calcs(self):
+        """ Test the aggregations over the systems (virtual systems) """
+        times = pd.to_datetime(['2016-01-01 00:00', '2016-01-01 00:05'])
+        dataframe = pd.concat([
+            pd.DataFrame({'A': [1.0, 2.0], 'system': system}, index=times)
+            for system in ('SYS1', 'SYS2', 'SYS3')
+        ])
+        dataframe.index.name = 'Sample Time'
+        dataframe = dataframe.set_index('system', append=True)
+        # SYS3 samples one minute late
+        late = dataframe.xs('SYS3', level='system', drop_level=False)
+        late.index = pd.MultiIndex.from_arrays(
+            [late.index.get_level_values(0) + pd.Timedelta('1min'),
+             late.index.get_level_values(1)],
+            names=late.index.names
+        )
+        dataframe = pd.concat([dataframe.drop('SYS3', level='system'), late])
+        with tempfile.NamedTemporaryFile(mode='w') as calcs_file:
+            calcs_file.write('B = A * 2\n')
+            calcs_file.write('TOTAL = sum_systems(B)\n')
+            calcs_file.write('PEAK = max_systems(A + 1)\n')
+            calcs_file.write('C = TOTAL + 1\n')  # not usable, skipped
+            calcs_file.write('N = sum_systems(A) + 1\n')  # not whole expr.
+            calcs_file.file.close()
+            dataframe.apply_calcs(calcs_file.name)
+            self.assertNotIn('TOTAL', dataframe)
+            self.assertTrue(dataframe['C'].isnull().all())
+            virtual = dataframe.aggregate_calcs(calcs_file.name, freq='5min')
+            self.assertListEqual(list(virtual.columns), ['TOTAL', 'PEAK'])
+            self.assertListEqual(list(virtual.index.names),
+                                 ['Sample Time', 'system'])
+            self.assertListEqual(list(virtual.TOTAL), [6.0, 12.0])
+            self.assertListEqual(list(virtual.PEAK), [2.0, 3.0])
+            grouped = dataframe.aggregate_calcs(
+                calcs_file.name,
+                groups={'SYS1': 'CLU1', 'SYS2': 'CLU1'},
+                freq='5min'
+            )
+            self.assertListEqual(
+                sorted(grouped.index.get_level_values('system').unique()),
+                ['CLU1']
+            )
+            self.assertListEqual(list(grouped.TOTAL), [4.0, 8.0])
+            # without aligning the times SYS3 falls in its own samples
+            self.assertEqual(len(dataframe.aggregate_calcs(calcs_file.name)),
+                             4)
+        plan = calculations.CalcPlan([])
+        self.assertTrue(plan.aggregate(dataframe).empty)
+
     def test_clean_calculations(self):
         """ Test function for clean_calculations """
         df_with_calcs = self.testdf.copy()
@@ -5,16 +5,31 @@
 """
 from __future__ import absolute_import
 
+import os
+import shutil
 import logging
+import zipfile
 import datetime as dt
 import tempfile
+import threading
 
+import six
 import pandas as pd
-from t4mon import df_tools, arguments, collector
+from mock import MagicMock, patch
+from t4mon import df_tools, arguments, collector, calculations
+from t4mon.cache import ListingCache, DownloadCache
 from six.moves import queue, configparser
 from pandas.util.testing import assert_frame_equal
 
-from .base import TEST_CSV, TEST_PKL, TEST_CALC, TEST_ZIPFILE, BaseTestClass
+from .base import (
+    TEST_CSV,
+    TEST_PKL,
+    TEST_CALC,
+    TEST_ZIPFILE,
+    BaseTestClass,
+    LocalSFTPSession,
+    delete_temporary_folder
+)
 
 
 class TestCollector(BaseTestClass):
@@ -36,6 +51,288 @@ class TestCollector(BaseTestClass):
         self.assertIsInstance(df2, pd.DataFrame)
         assert_frame_equal(df1, df2)
 
+    def test_parse_in_pool(self):
+        """
+        Test that the files waiting for the parser pool are bounded, and
+        errors in the callbacks neither block the results nor the slots
+        """
+        self.collector_test.conf.set('MISC', 'parser_processes', '1')
+        self.collector_test.conf.set('MISC', 'parser_backlog', '1')
+        with open(TEST_CSV, 'rb') as csvfile:
+            data = csvfile.read()
+        try:
+            self.collector_test._start_parser_pool()
+            slots = self.collector_test._parser_slots
+            result = self.collector_test._parse_in_pool(
+                data,
+                TEST_CSV,
+                callback=MagicMock(side_effect=ValueError)
+            )
+            self.assertFalse(result.get(30).empty)
+            # the next file would not be sent before this one is parsed
+            result = self.collector_test._parse_in_pool(data, TEST_CSV)
+            self.assertFalse(slots.acquire(False))
+            result.get(30)
+            self.collector_test._stop_parser_pool()
+            self.assertTrue(slots.acquire(False))
+        finally:
+            self.collector_test._stop_parser_pool()
+            for option in ['parser_processes', 'parser_backlog']:
+                self.collector_test.conf.remove_option('MISC', option)
+
+    def test_getstats_parser_pool(self):
+        """
+        Test function for get_stats_from_host when parsing the files in a
+        pool of processes
+        """
+        self.collector_test.conf.set('MISC', 'parser_processes', '2')
+        try:
+            self.collector_test._start_parser_pool()
+            self.assertIsNotNone(self.collector_test._parser_pool)
+            df1 = self.collector_test.get_stats_from_host(
+                filespec_list=[TEST_CSV, 'non-existing-file']
+            )
+        finally:
+            self.collector_test._stop_parser_pool()
+            self.collector_test.conf.remove_option('MISC', 'parser_processes')
+        self.assertIsNone(self.collector_test._parser_pool)
+        assert_frame_equal(
+            df1,
+            self.collector_test.get_stats_from_host(filespec_list=TEST_CSV)
+        )
+
+    def test_getstats_multichannel(self):
+        """ Test function for _load_files_multichannel """
+        class _SFTPSession(object):  # not an SFTPClient, reads local files
+            opened = []
+
+            def __init__(self):
+                self.ssh_transport = self
+                self.closed = False
+
+            def open_sftp(self):
+                session = _SFTPSession()
+                self.opened.append(session)
+                return session
+
+            def close(self):
+                self.closed = True
+
+        session = _SFTPSession()
+        files = [TEST_CSV, 'non-existing-file', TEST_CSV]
+        frames = self.collector_test._load_files_multichannel(files,
+                                                              session,
+                                                              channels=4)
+        # Only as many channels as files were opened, and closed after use
+        self.assertEqual(len(_SFTPSession.opened), 2)
+        self.assertTrue(all(item.closed for item in _SFTPSession.opened))
+        self.assertFalse(session.closed)
+        # Results keep the order of the files
+        self.assertListEqual([frame.empty for frame in frames],
+                             [False, True, False])
+        assert_frame_equal(frames[2], df_tools.dataframize(TEST_CSV))
+        # Also for local files, merged with the columns sorted
+        assert_frame_equal(
+            self.collector_test.get_stats_from_host(
+                filespec_list=[TEST_CSV, TEST_CSV],
+                sftp_channels=2
+            ),
+            self.collector_test.get_stats_from_host(
+                filespec_list=TEST_CSV
+            ).sort_index(axis=1)
+        )
+
+    def test_load_file_cached(self):
+        """ Test function for _load_file with a download cache """
+        cache_folder = tempfile.mkdtemp()
+        self.collector_test.download_cache = DownloadCache(cache_folder)
+        try:
+            df1 = self.collector_test._load_file(TEST_CSV,
+                                                 LocalSFTPSession(),
+                                                 'my_sys')
+            self.assertEqual(self.collector_test.download_cache.misses, 1)
+            df2 = self.collector_test._load_file(TEST_CSV,
+                                                 LocalSFTPSession(),
+                                                 'my_sys')
+            self.assertEqual(self.collector_test.download_cache.hits, 1)
+            assert_frame_equal(df1, df2)
+            # local files are not cached
+            self.collector_test._load_file(TEST_CSV)
+            cache = self.collector_test.download_cache
+            self.assertEqual(cache.hits + cache.misses, 2)
+        finally:
+            self.collector_test.download_cache = None
+            delete_temporary_folder(cache_folder)
+
+    def test_load_file_incremental(self):
+        """
+        Test function for _load_file with a download cache, when the remote
+        file grows between calls
+        """
+        with open(TEST_CSV, 'rb') as csvfile:
+            contents = csvfile.read()
+        cache_folder = tempfile.mkdtemp()
+        self.collector_test.download_cache = DownloadCache(cache_folder)
+        try:
+            remote_file = os.path.join(cache_folder, 't4_remote.csv')
+            with open(remote_file, 'wb') as growing_file:
+                growing_file.write(contents[:len(contents) // 2])
+            df1 = self.collector_test._load_file(remote_file,
+                                                 LocalSFTPSession(),
+                                                 'my_sys')
+            tail = self.collector_test.download_cache.get_tail('my_sys',
+                                                               remote_file)
+            # the last line is not complete yet, left for the next time
+            assert_frame_equal(
+                df1,
+                df_tools.dataframize_buffer(contents[:tail.offset])
+            )
+            self.assertEqual(df1.index.max(), tail.last_sample)
+            with open(remote_file, 'wb') as growing_file:
+                growing_file.write(contents)
+            df2 = self.collector_test._load_file(remote_file,
+                                                 LocalSFTPSession(),
+                                                 'my_sys')
+            assert_frame_equal(df2, df_tools.dataframize(TEST_CSV))
+            self.assertEqual(
+                self.collector_test.download_cache.get_tail(
+                    'my_sys',
+                    remote_file
+                ).offset,
+                len(contents)
+            )
+            # only the last version of the dataframe is kept in the cache
+            self.assertEqual(
+                len([item for item in os.listdir(cache_folder)
+                     if item.endswith('.pkl')]),
+                2  # dataframe and tail
+            )
+        finally:
+            self.collector_test.download_cache = None
+            delete_temporary_folder(cache_folder)
+
+    def test_load_file_incremental_fallback(self):
+        """
+        Test that the whole file is fetched again if the appended bytes
+        cannot be read
+        """
+        with open(TEST_CSV, 'rb') as csvfile:
+            contents = csvfile.read()
+        cache_folder = tempfile.mkdtemp()
+        self.collector_test.download_cache = DownloadCache(cache_folder)
+        try:
+            remote_file = os.path.join(cache_folder, 't4_remote.csv')
+            with open(remote_file, 'wb') as growing_file:
+                growing_file.write(contents[:len(contents) // 2])
+            self.collector_test._load_file(remote_file,
+                                           LocalSFTPSession(),
+                                           'my_sys')
+            with open(remote_file, 'wb') as growing_file:
+                growing_file.write(contents)
+            with patch.object(self.collector_test,
+                              '_read_file',
+                              return_value=None):
+                dataframe = self.collector_test._load_file(remote_file,
+                                                           LocalSFTPSession(),
+                                                           'my_sys')
+            assert_frame_equal(dataframe, df_tools.dataframize(TEST_CSV))
+            self.assertNotIn('.tmp', ''.join(os.listdir(cache_folder)))
+        finally:
+            self.collector_test.download_cache = None
+            delete_temporary_folder(cache_folder)
+
+    def test_getstats_chunks(self):
+        """ Test function for get_stats_from_host in chunked mode """
+        chunks = self.collector_test.get_stats_from_host(
+            filespec_list=TEST_CSV,
+            chunksize=200
+        )
+        self.assertNotIsInstance(chunks, pd.DataFrame)
+        chunks = list(chunks)
+        self.assertListEqual([len(chunk) for chunk in chunks], [200, 86])
+        assert_frame_equal(
+            pd.concat(chunks),
+            self.collector_test.get_stats_from_host(filespec_list=TEST_CSV)
+        )
+        # Compressed files also yield chunks, already consolidated
+        chunks = list(self.collector_test.get_stats_from_host(
+            filespec_list=TEST_ZIPFILE,
+            hostname='CSV',
+            compressed=True,
+            chunksize=1000
+        ))
+        self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+        self.assertListEqual(chunks[0].index.names,
+                             [df_tools.DATETIME_TAG, 'system'])
+
+    def test_getstats_remote_compress(self):
+        """
+        Test function for get_stats_from_host when the files are archived
+        remotely before being downloaded
+        """
+        def _run_command(command):  # runs the commands locally
+            if command.startswith('dir '):  # folder listing
+                return os.listdir(command.split()[-1])
+            (name, archive) = command.split()[:2]
+            if name == 'zip':
+                with zipfile.ZipFile(archive, 'a') as zip_file:
+                    for a_file in command.split()[2:]:
+                        zip_file.write(a_file, os.path.basename(a_file))
+            return []
+
+        def _archive_commands(session):
+            return [command for command in session.commands
+                    if not command.startswith('dir ')]
+
+        folder = tempfile.mkdtemp()
+        for name in ('t4_sys1_a.csv', 't4_sys1_b.csv'):
+            shutil.copy(TEST_CSV, os.path.join(folder, name))
+        expected = self.collector_test.get_stats_from_host(
+            filespec_list=['t4_sys1', '.csv'],
+            files_folder=folder
+        )
+        try:
+            for command in ('zip {archive} {files}', 'true {archive}'):
+                session = LocalSFTPSession(run_command=_run_command)
+                self.collector_test.filecache.clear()
+                assert_frame_equal(
+                    self.collector_test.get_stats_from_host(
+                        hostname='my_sys',
+                        filespec_list=['t4_sys1', '.csv'],
+                        sftp_session=session,
+                        files_folder=folder,
+                        remote_compress_cmd=command
+                    ),
+                    expected
+                )
+                self.assertEqual(len(_archive_commands(session)), 1)
+                # remote archive removed after use
+                self.assertListEqual(sorted(os.listdir(folder)),
+                                     ['t4_sys1_a.csv', 't4_sys1_b.csv'])
+            self.assertTrue(_archive_commands(session)[0].startswith(
+                'true {0}/t4mon_my_sys_'.format(folder)
+            ))
+            # the files are added in batches to keep the commands short
+            session = LocalSFTPSession(run_command=_run_command)
+            self.collector_test.filecache.clear()
+            with patch.object(collector, 'MAX_COMMAND_LENGTH', 1):
+                assert_frame_equal(
+                    self.collector_test.get_stats_from_host(
+                        hostname='my_sys',
+                        filespec_list=['t4_sys1', '.csv'],
+                        sftp_session=session,
+                        files_folder=folder,
+                        remote_compress_cmd='zip {archive} {files}'
+                    ),
+                    expected
+                )
+            self.assertEqual(len(_archive_commands(session)), 2)
+            self.assertListEqual(sorted(os.listdir(folder)),
+                                 ['t4_sys1_a.csv', 't4_sys1_b.csv'])
+        finally:
+            self.collector_test.filecache.clear()
+            delete_temporary_folder(folder)
+
     def test_collector_class(self):
         """ Test methods related to the Collector class """
         # first of all, check default values
@@ -87,6 +384,436 @@ class TestCollector(BaseTestClass):
                       ),
                       self.collector_test.__str__())
 
+    def test_run_systemwide(self):
+        """
+        Test function for _run_systemwide, data is consolidated once all
+        systems are done
+        """
+        my_collector = self.collector_test.clone()
+        my_collector.data = pd.DataFrame()
+        test_df = self.collector_test.get_stats_from_host(
+            filespec_list=TEST_CSV
+        )
+
+        def _target(system):
+            my_collector.results_queue.put((system, test_df))
+
+        my_collector._run_systemwide(_target)
+        self.assertListEqual(
+            list(my_collector.data.index.get_level_values('system').unique()),
+            my_collector.systems
+        )
+        for system in my_collector.systems:
+            assert_frame_equal(my_collector.data.xs(system, level='system'),
+                               test_df)
+        self.assertTrue(my_collector.results_queue.empty())
+
+    def test_consolidated_calculations(self):
+        """
+        Test that the calculations applied once to the consolidated data give
+        the same results as applied to each system
+        """
+        my_collector = self.collector_test.clone()
+        test_df = self.collector_test.get_stats_from_host(
+            filespec_list=TEST_CSV
+        )
+        results = dict((system, test_df.copy())
+                       for system in my_collector.systems)
+        my_collector.data = pd.DataFrame()
+        for system in my_collector.systems:
+            my_collector._apply_calculations(results[system], system)
+        my_collector._consolidate_results(results)
+        expected = my_collector.data
+        self.assertGreater(len(expected.columns), len(test_df.columns))
+
+        my_collector.conf.set('MISC', 'calculations_mode', 'consolidated')
+        my_collector.data = pd.DataFrame()
+        my_collector._consolidate_results(
+            dict((system, test_df.copy()) for system in my_collector.systems)
+        )
+        assert_frame_equal(my_collector.data, expected)
+        # new results are appended after applying the calculations
+        my_collector._consolidate_results({my_collector.systems[0]: test_df})
+        self.assertEqual(len(my_collector.data),
+                         len(expected) + len(test_df))
+        self.assertEqual(len(my_collector.data.columns),
+                         len(expected.columns))
+
+    def test_aggregate_systems(self):
+        """
+        Test that the virtual systems are aggregated and replaced along with
+        the collected data
+        """
+        my_collector = self.collector_test.clone()
+        test_df = pd.DataFrame({'A': 1.0},
+                               index=pd.date_range('2016-01-01',
+                                                   periods=3,
+                                                   freq='5min',
+                                                   name='Sample Time'))
+        with tempfile.NamedTemporaryFile(mode='w') as calcs_file:
+            calcs_file.write('TOTAL = sum_systems(A)\n')
+            calcs_file.file.close()
+            my_collector.conf.set('MISC', 'calculations_file',
+                                  calcs_file.name)
+            my_collector.data = pd.DataFrame()
+            my_collector._consolidate_results(
+                dict((system, test_df.copy())
+                     for system in my_collector.systems)
+            )
+            self.assertListEqual(my_collector.virtual_systems, ['ALL'])
+            total = my_collector.data.xs('ALL', level='system').TOTAL
+            self.assertTrue((total == len(my_collector.systems)).all())
+            self.assertIn('ALL', my_collector.logs)
+            # grouped by cluster_id, replacing the previous virtual systems
+            my_collector.conf.set('MISC', 'aggregate_by', 'cluster_id')
+            my_collector._consolidate_results({})
+            clusters = sorted(my_collector.conf.get(system, 'cluster_id')
+                              for system in my_collector.systems)
+            self.assertListEqual(sorted(my_collector.virtual_systems),
+                                 clusters)
+            self.assertNotIn(
+                'ALL',
+                my_collector.data.index.get_level_values('system')
+            )
+            # a virtual system named as a real one is renamed
+            (sys1, sys2) = my_collector.systems
+            my_collector.conf.set(sys2, 'cluster_id', sys1)
+            my_collector._consolidate_results({})
+            self.assertListEqual(
+                sorted(my_collector.virtual_systems),
+                sorted([my_collector.conf.get(sys1, 'cluster_id'),
+                        'cluster_id_{0}'.format(sys1)])
+            )
+            assert_frame_equal(
+                my_collector.data.xs(sys1, level='system')[['A']],
+                test_df
+            )
+            # only the sample times which changed are aggregated again
+            changed = test_df.copy()
+            changed.iloc[1] = 5.0
+            with patch.object(pd.DataFrame,
+                              'aggregate_calcs',
+                              autospec=True,
+                              side_effect=calculations.aggregate_calcs) \
+                    as aggregate_calcs:
+                my_collector._replace_system_data(sys2, changed)
+            source = aggregate_calcs.call_args[0][0]
+            self.assertListEqual(
+                list(source.index.get_level_values(0).unique()),
+                [test_df.index[1]]
+            )
+            total = my_collector.data.xs('cluster_id_{0}'.format(sys1),
+                                         level='system').TOTAL
+            self.assertListEqual(list(total.sort_index()), [1.0, 5.0, 1.0])
+
+    def test_run_systemwide_bounded_with_deadlines(self):
+        """
+        Test _run_systemwide with a limited number of workers, skipping
+        systems that do not finish before their deadline
+        """
+        my_collector = self.collector_test.clone()
+        my_collector.data = pd.DataFrame()
+        (hung_system, good_system) = my_collector.systems[:2]
+        my_collector.conf.set('MISC', 'max_workers', '1')
+        my_collector.conf.set(hung_system, 'collection_timeout', '0.5')
+        test_df = pd.DataFrame({'A': [1.0]},
+                               index=pd.DatetimeIndex(['2016-01-01'],
+                                                      name='Sample Time'))
+        release = threading.Event()
+        channel = MagicMock()
+        running = []
+
+        def _hung_worker_alive():
+            return any(thread.name == hung_system and thread.is_alive()
+                       for thread in threading.enumerate())
+
+        def _target(system):
+            if system == hung_system:
+                # closed when cancelled, which releases the worker
+                my_collector._track(system, MagicMock(close=release.set))
+                my_collector._track(system, channel)
+                running.append((system, False))
+                release.wait(10)
+            else:
+                running.append((system, _hung_worker_alive()))
+            my_collector.results_queue.put((system, test_df))
+
+        try:
+            my_collector._run_systemwide(_target)
+        finally:
+            release.set()
+        # systems were started one by one, the hung one first and the rest
+        # only after it returned
+        self.assertListEqual(running, [(system, False)
+                                       for system in my_collector.systems])
+        self.assertListEqual(
+            list(my_collector.data.index.get_level_values('system').unique()),
+            [system for system in my_collector.systems
+             if system != hung_system]
+        )
+        self.assertIn('timed out', my_collector.logs[hung_system])
+        channel.close.assert_called_once_with()
+        self.assertDictEqual(my_collector._active_sessions, {})
+
+        # Its result is not taken as a late one in the next run
+        my_collector.conf.remove_option(hung_system, 'collection_timeout')
+        my_collector.data = pd.DataFrame()
+        my_collector._run_systemwide(_target)
+        self.assertListEqual(
+            list(my_collector.data.index.get_level_values('system').unique()),
+            my_collector.systems
+        )
+
+        # A worker raising an exception does not block the rest
+        def _failing_target(system):
+            raise ValueError
+
+        my_collector.data = pd.DataFrame()
+        my_collector._run_systemwide(_failing_target)
+        self.assertTrue(my_collector.data.empty)
+        self.assertTrue(my_collector.results_queue.empty())
+
+    def test_run_systemwide_hung_worker(self):
+        """
+        Test _run_systemwide when a cancelled worker does not return even
+        after its sessions are closed, its slot is released after a while
+        """
+        my_collector = self.collector_test.clone()
+        my_collector.data = pd.DataFrame()
+        hung_system = my_collector.systems[0]
+        my_collector.conf.set('MISC', 'max_workers', '1')
+        my_collector.conf.set(hung_system, 'collection_timeout', '0.5')
+        test_df = pd.DataFrame({'A': [1.0]},
+                               index=pd.DatetimeIndex(['2016-01-01'],
+                                                      name='Sample Time'))
+        release = threading.Event()
+        session = MagicMock()
+        running = []
+
+        def _target(system):
+            if system == hung_system:
+                my_collector._track(system, session)  # close() is ignored
+                release.wait(10)
+            running.append(system)
+            my_collector.results_queue.put((system, test_df))
+
+        try:
+            with patch.object(collector, 'CANCEL_GRACE', 0.5):
+                my_collector._run_systemwide(_target)
+            # the rest of systems were collected with the worker still hung
+            self.assertListEqual(running, my_collector.systems[1:])
+        finally:
+            release.set()
+        session.close.assert_called_once_with()
+        self.assertIn('timed out', my_collector.logs[hung_system])
+        self.assertListEqual(
+            list(my_collector.data.index.get_level_values('system').unique()),
+            my_collector.systems[1:]
+        )
+
+    def test_poll(self):
+        """
+        Test function for poll (daemon mode), each system's data is replaced
+        when collected again
+        """
+        my_collector = self.collector_test.clone()
+        my_collector.data = pd.DataFrame()
+        my_collector.conf.set('DEFAULT', 'use_gateway', 'no')
+        my_collector.conf.set('DEFAULT', 'poll_interval', '3600')
+        system = my_collector.systems[0]
+        my_collector.conf.set(system, 'poll_interval', '0')
+        folder = tempfile.mkdtemp()
+        my_collector.download_cache = DownloadCache(folder,
+                                                    logger=self.logger)
+        test_df = self.collector_test.get_stats_from_host(
+            filespec_list=TEST_CSV
+        )
+        calls = []
+        done = []
+        stop_event = threading.Event()
+
+        def _target(_system):
+            calls.append(_system)
+            # the system is not reachable the third time
+            failed = calls.count(_system) == 3
+            my_collector.results_queue.put((_system,
+                                            pd.DataFrame() if failed
+                                            else test_df))
+
+        def _callback(_system):
+            done.append(_system)
+            if done.count(system) == 3 and \
+               set(done) == set(my_collector.systems):
+                stop_event.set()
+
+        my_collector.get_data_and_logs = _target
+        my_collector.filecache[(system, 'folder', 'filespec')] = []
+        timer = threading.Timer(10, stop_event.set)
+        timer.start()
+        try:
+            my_collector.poll(callback=_callback, stop_event=stop_event)
+        finally:
+            timer.cancel()
+            delete_temporary_folder(folder)
+        self.assertEqual(calls.count(system), 3)
+        for other in my_collector.systems[1:]:
+            self.assertEqual(calls.count(other), 1)
+        self.assertDictEqual(my_collector.filecache, {})
+        for _system in my_collector.systems:
+            assert_frame_equal(my_collector.data.xs(_system, level='system'),
+                               test_df)
+
+    def test_poll_bounded_with_deadlines(self):
+        """
+        Test that poll runs up to max_workers systems at a time and cancels
+        the ones past their collection_timeout
+        """
+        my_collector = self.collector_test.clone()
+        my_collector.data = pd.DataFrame()
+        my_collector.conf.set('DEFAULT', 'use_gateway', 'no')
+        my_collector.conf.set('DEFAULT', 'poll_interval', '3600')
+        my_collector.conf.set('MISC', 'max_workers', '1')
+        system = my_collector.systems[0]
+        my_collector.conf.set(system, 'collection_timeout', '0.5')
+        folder = tempfile.mkdtemp()
+        my_collector.download_cache = DownloadCache(folder,
+                                                    logger=self.logger)
+        test_df = self.collector_test.get_stats_from_host(
+            filespec_list=TEST_CSV
+        )
+        release = threading.Event()
+        active = []
+        peak = []
+        done = []
+        stop_event = threading.Event()
+
+        def _target(_system):
+            active.append(_system)
+            peak.append(len(active))
+            try:
+                if _system == system:  # hangs until its session is closed
+                    my_collector._track(_system, MagicMock(close=release.set))
+                    release.wait(10)
+                else:
+                    my_collector.results_queue.put((_system, test_df))
+            finally:
+                active.remove(_system)
+
+        def _callback(_system):
+            done.append(_system)
+            if set(done) >= set(my_collector.systems[1:]):
+                stop_event.set()
+
+        my_collector.get_data_and_logs = _target
+        timer = threading.Timer(10, stop_event.set)
+        timer.start()
+        try:
+            my_collector.poll(callback=_callback, stop_event=stop_event)
+        finally:
+            timer.cancel()
+            delete_temporary_folder(folder)
+        self.assertTrue(release.is_set())
+        self.assertIn('timed out', my_collector.logs[system])
+        self.assertEqual(max(peak), 1)
+        self.assertNotIn(system,
+                         my_collector.data.index.get_level_values('system'))
+        for other in my_collector.systems[1:]:
+            assert_frame_equal(my_collector.data.xs(other, level='system'),
+                               test_df)
+
+    def test_assign_gateways(self):
+        """ Test that systems are spread across the gateway connections """
+        my_collector = self.collector_test.clone()
+        (sys1, sys2) = my_collector.systems[:2]
+        systems = [sys1, sys2, 'sys3', 'sys4']
+        self.assertDictEqual(my_collector._assign_gateways(systems),
+                             {('GATEWAY', 0): systems})
+        my_collector.conf.set('GATEWAY', 'connections', '2')
+        my_collector.conf.add_section('GATEWAY2')
+        self.assertDictEqual(my_collector._assign_gateways(systems),
+                             {('GATEWAY', 0): [sys1, 'sys4'],
+                              ('GATEWAY', 1): [sys2],
+                              ('GATEWAY2', 0): ['sys3']})
+        # pinned systems
+        my_collector.conf.set(sys1, 'gateway', 'GATEWAY2')
+        my_collector.conf.set(sys2, 'gateway', 'GATEWAY9')  # not found
+        self.assertDictEqual(my_collector._assign_gateways([sys1, sys2]),
+                             {('GATEWAY', 0): [sys2],
+                              ('GATEWAY2', 0): [sys1]})
+
+    def test_tunnel_group(self):
+        """ Test function for TunnelGroup """
+        group = collector.TunnelGroup()
+        self.assertFalse(group.is_alive)
+        servers = [MagicMock(local_bind_ports=[10001, 10002],
+                             tunnel_is_up={('127.0.0.1', 10001): True,
+                                           ('127.0.0.1', 10002): False}),
+                   MagicMock(local_bind_ports=[10003],
+                             tunnel_is_up={('127.0.0.1', 10003): True})]
+        group.add(servers[0], ['sys1', 'sys2'])
+        group.add(servers[1], ['sys3'])
+        self.assertDictEqual(group.tunnelports,
+                             {'sys1': 10001, 'sys2': 10002, 'sys3': 10003})
+        self.assertEqual(len(group.tunnel_is_up), 3)
+        self.assertTrue(group.is_alive)
+        servers[1].is_alive = False
+        self.assertFalse(group.is_alive)
+        group.stop()
+        for server in servers:
+            server.stop.assert_called_once_with()
+        my_collector = self.collector_test.clone()
+        my_collector.server = group
+        self.assertTrue(my_collector.check_if_tunnel_is_up('sys3'))
+        self.assertFalse(my_collector.check_if_tunnel_is_up('sys2'))
+
+    def test_check_tunnels(self):
+        """ Test that only the gateway connections which went down restart """
+        group = collector.TunnelGroup()
+        servers = [MagicMock(local_bind_ports=[10001, 10002]),
+                   MagicMock(local_bind_ports=[10003])]
+        group.add(servers[0], ['sys1', 'sys2'], 'GATEWAY')
+        group.add(servers[1], ['sys3'], 'GATEWAY2')
+        servers[1].is_alive = False
+        new_server = MagicMock(local_bind_ports=[10004])
+        my_collector = self.collector_test.clone()
+        my_collector.server = group
+        with patch.object(my_collector,
+                          '_open_tunnel',
+                          return_value=new_server) as open_tunnel:
+            my_collector._check_tunnels()
+            open_tunnel.assert_called_once_with('GATEWAY2', ['sys3'])
+            servers[1].stop.assert_called_once_with()
+            servers[0].stop.assert_not_called()
+            self.assertListEqual(group.servers, [servers[0], new_server])
+            self.assertDictEqual(group.tunnelports,
+                                 {'sys1': 10001, 'sys2': 10002, 'sys3': 10004})
+            # nothing to do while all of them are up
+            my_collector._check_tunnels()
+            self.assertEqual(open_tunnel.call_count, 1)
+
+    def test_get_system_logs_async(self):
+        """
+        Test function for _get_system_logs_async, the remote command runs
+        while the caller goes on
+        """
+        started = threading.Event()
+        release = threading.Event()
+
+        class _SSHSession(object):
+            def exec_command(self, command):
+                started.set()
+                release.wait(10)
+                return (None, six.StringIO('{0}\nok\n'.format(command)), None)
+
+        wait_for_logs = self.collector_test._get_system_logs_async(
+            _SSHSession(),
+            'my_sys',
+            'show system'
+        )
+        self.assertTrue(started.wait(10))  # running in the background
+        release.set()
+        self.assertListEqual(wait_for_logs(), ['show system\n', 'ok\n'])
+
     def test_compressed_pickle(self):
         """ Test to_pickle and read_pickle for compressed pkl.gz files """
         self.logger.error(self.collector_test.__dict__)
@@ -119,6 +846,235 @@ class TestCollector(BaseTestClass):
         _df = collector.load_zipfile(TEST_PKL)
         self.assertTrue(_df.empty)
 
+    def test_load_zipfile_parser_pool(self):
+        """
+        Test function for _load_zipfile, members are parsed in a pool of
+        processes and nothing is extracted to disk
+        """
+        temp_files = set(os.listdir(tempfile.gettempdir()))
+        _df = self.collector_test._load_zipfile(TEST_ZIPFILE)
+        self.assertSetEqual(set(os.listdir(tempfile.gettempdir())),
+                            temp_files)
+        self.collector_test.conf.set('MISC', 'parser_processes', '2')
+        try:
+            self.collector_test._start_parser_pool()
+            assert_frame_equal(
+                self.collector_test._load_zipfile(TEST_ZIPFILE),
+                _df
+            )
+        finally:
+            self.collector_test._stop_parser_pool()
+            self.collector_test.conf.remove_option('MISC', 'parser_processes')
+
+    def test_get_remote_filespec(self):
+        """ Test function for get_remote_filespec """
+        self.assertEqual(
+            collector.get_remote_filespec(['.csv', '17oct2015', 'sys1']),
+            '*17OCT2015*.*'
+        )
+        # compressed CSV files are listed too
+        self.assertEqual(collector.get_remote_filespec(['.csv']), '*.*')
+        self.assertEqual(collector.get_remote_filespec(['.zip']), '*.ZIP')
+        self.assertEqual(collector.get_remote_filespec(['t4', '', 'data']),
+                         '*DATA*.*')
+        # not valid in an OpenVMS file specification, no filter
+        self.assertEqual(collector.get_remote_filespec(['my data', '.csv']),
+                         '*.*')
+        self.assertEqual(collector.get_remote_filespec(['data.2015']), '*.*')
+
+    def test_file_index(self):
+        """ Test function for FileIndex """
+        names = ['T4_SYS1_17OCT2015.CSV',
+                 't4_sys10_18oct2015.csv',
+                 'T4_SYS2_17OCT2015.CSV.ZIP',
+                 'T4_SYS1_17OCT2015.CSVX',
+                 'my data_sys1.csv']
+        index = collector.FileIndex(names)
+        self.assertListEqual(list(index), names)
+        self.assertListEqual(index.match(['.csv', 'sys1']),
+                             [names[0], names[1], names[3], names[4]])
+        self.assertListEqual(index.match(['.csv', '17oct2015', 'sys1']),
+                             [names[0], names[3]])
+        self.assertListEqual(index.match(['.zip']), [names[2]])
+        self.assertListEqual(index.match(['a_s']), [names[4]])
+        self.assertListEqual(index.match([]), names)
+        self.assertListEqual(index.match(['nothing']), [])
+        # date ranges
+        self.assertListEqual(
+            index.match(['sys1'], any_of=['17oct2015', '18oct2015']),
+            [names[0], names[1], names[3]]
+        )
+        self.assertListEqual(index.match(['sys1'], any_of=[]), [])
+        # same result as matching each name
+        for spec_list in (['.csv'], ['t4', 's', '5'], ['.c', 'V', '4_s']):
+            self.assertListEqual(
+                index.match(spec_list),
+                [f for f in names
+                 if all([v.upper() in f.upper() for v in spec_list])]
+            )
+
+    def test_files_lookup_remote(self):
+        """
+        Test function for files_lookup when listing remote OpenVMS folders
+        """
+        # named as an OpenVMS directory, so its listing is filtered remotely
+        folder = tempfile.mkdtemp(suffix='[STATS]')
+        cache_folder = tempfile.mkdtemp()
+        for (name, size) in (('T4_SYS1_17OCT2015.CSV;1', 200),
+                             ('T4_SYS2_17OCT2015.CSV;1', 300)):
+            with open(os.path.join(folder, name), 'wb') as a_file:
+                a_file.write(b'0' * size)
+        # output of the OpenVMS dir command
+        listing = ['DSA3:[STATS]{0}\n'.format(name)
+                   for name in sorted(os.listdir(folder))]
+        session = LocalSFTPSession(run_command=lambda command: listing)
+        try:
+            files = self.collector_test.files_lookup(
+                hostname='my_sys',
+                filespec_list=['.csv', '17oct2015', 'sys1'],
+                sftp_session=session,
+                files_folder=folder
+            )
+            self.assertListEqual(session.commands,
+                                 ['dir /noheading /notrailing '
+                                  '{0}*17OCT2015*.*'.format(folder)])
+            self.assertListEqual([os.path.basename(f) for f in files],
+                                 ['T4_SYS1_17OCT2015.CSV;1'])
+            # Listing is cached
+            self.collector_test.files_lookup(
+                hostname='my_sys',
+                filespec_list=['.csv', '17oct2015', 'sys1'],
+                sftp_session=session,
+                files_folder=folder
+            )
+            self.assertEqual(len(session.commands), 1)
+            self.assertDictEqual(self.collector_test.fileattrs, {})
+            # With a download cache, the folder is still filtered server side
+            self.collector_test.download_cache = DownloadCache(cache_folder)
+            files = self.collector_test.files_lookup(
+                hostname='my_sys2',
+                filespec_list=['.csv', '17oct2015', 'sys1'],
+                sftp_session=session,
+                files_folder=folder
+            )
+            self.assertEqual(len(session.commands), 2)
+            self.assertDictEqual(self.collector_test.fileattrs, {})
+            # attributes are requested when the file is downloaded
+            attributes = os.stat(files[0])
+            attributes = (attributes.st_size, attributes.st_mtime)
+            self.assertEqual(attributes[0], 200)
+            self.assertTupleEqual(
+                self.collector_test._get_cache_key(files[0],
+                                                   session,
+                                                   'my_sys2'),
+                ('my_sys2', files[0]) + attributes
+            )
+            # Without remote commands, the listing has the attributes,
+            # which are kept for the matching files only
+            session = LocalSFTPSession()
+            files = self.collector_test.files_lookup(
+                hostname='my_sys3',
+                filespec_list=['.csv', '17oct2015', 'sys1'],
+                sftp_session=session,
+                files_folder=folder
+            )
+            self.assertListEqual([os.path.basename(f) for f in files],
+                                 ['T4_SYS1_17OCT2015.CSV;1'])
+            self.assertDictEqual(self.collector_test.fileattrs,
+                                 {('my_sys3', files[0]): attributes})
+            # and used (once) instead of asking again
+            with patch.object(session, 'stat') as stat:
+                self.assertTupleEqual(
+                    self.collector_test._get_cache_key(files[0],
+                                                       session,
+                                                       'my_sys3'),
+                    ('my_sys3', files[0]) + attributes
+                )
+            self.assertFalse(stat.called)
+            self.assertDictEqual(self.collector_test.fileattrs, {})
+        finally:
+            self.collector_test.download_cache = None
+            self.collector_test.filecache.clear()
+            self.collector_test.fileattrs.clear()
+            delete_temporary_folder(folder)
+            delete_temporary_folder(cache_folder)
+
+    def test_files_lookup_listing_cache(self):
+        """
+        Test function for files_lookup when the folder listings are kept in
+        the persistent listing cache
+        """
+        folder = tempfile.mkdtemp()
+        listing_cache = self.collector_test.listing_cache
+        self.collector_test.listing_cache = ListingCache(
+            os.path.join(folder, 'store', 'listings.db')
+        )
+        self.collector_test.conf.set('MISC', 'listing_cache_ttl', '3600')
+        data_folder = os.path.join(folder, 'data')
+        os.makedirs(data_folder)
+        open(os.path.join(data_folder, 'data_1.csv'), 'w').close()
+        try:
+            for _ in range(2):  # a new run does not list the folder again
+                self.collector_test.filecache.clear()
+                files = self.collector_test.files_lookup(
+                    filespec_list=['data', '.csv'],
+                    files_folder=data_folder
+                )
+                self.assertListEqual([os.path.basename(f) for f in files],
+                                     ['data_1.csv'])
+            self.assertEqual((self.collector_test.listing_cache.hits,
+                              self.collector_test.listing_cache.misses),
+                             (1, 1))
+            # listing is refreshed once the folder is modified
+            open(os.path.join(data_folder, 'data_2.csv'), 'w').close()
+            os.utime(data_folder, (0, 0))
+            self.collector_test.filecache.clear()
+            files = self.collector_test.files_lookup(
+                filespec_list=['data', '.csv'],
+                files_folder=data_folder
+            )
+            self.assertListEqual(sorted(os.path.basename(f) for f in files),
+                                 ['data_1.csv', 'data_2.csv'])
+            self.assertEqual(self.collector_test.listing_cache.misses, 2)
+        finally:
+            self.collector_test.listing_cache = listing_cache
+            self.collector_test.conf.remove_option('MISC',
+                                                   'listing_cache_ttl')
+            self.collector_test.filecache.clear()
+            delete_temporary_folder(folder)
+
+    def test_get_system_data_days(self):
+        """
+        Test that get_system_data looks up the files of several days at once
+        """
+        folder = tempfile.mkdtemp()
+        for day in ('16OCT2015', '17OCT2015', '18OCT2015'):
+            shutil.copy(TEST_CSV,
+                        os.path.join(folder, 't4_sys1_{0}.csv'.format(day)))
+        try:
+            with patch.object(self.collector_test,
+                              'get_stats_from_host',
+                              return_value=pd.DataFrame()) as get_stats:
+                self.collector_test.get_system_data(None,
+                                                    'System_1',
+                                                    ['16oct2015', '18oct2015'])
+            kwargs = get_stats.call_args[1]
+            self.assertNotIn('16oct2015', kwargs['filespec_list'])
+            self.assertListEqual(kwargs['date_tags'],
+                                 ['16oct2015', '18oct2015'])
+            files = self.collector_test.files_lookup(
+                filespec_list=['t4_sys1', '.csv'],
+                files_folder=folder,
+                date_tags=kwargs['date_tags']
+            )
+            self.assertListEqual(sorted(os.path.basename(a_file)
+                                        for a_file in files),
+                                 ['t4_sys1_16OCT2015.csv',
+                                  't4_sys1_18OCT2015.csv'])
+        finally:
+            self.collector_test.filecache.clear()
+            delete_temporary_folder(folder)
+
     def test_get_datetag(self):
         """ Test function for get_datetag """
         today = dt.datetime.today()
@@ -5,13 +5,20 @@
 """
 from __future__ import absolute_import
 
+import io
+import os
+import bz2
+import gzip
 import tempfile
 import unittest
 
 import numpy as np
 import pandas as pd
 import pytest
+from mock import MagicMock, patch
+from six import BytesIO
 from t4mon import df_tools, collector
+from paramiko import SFTPClient
 from pandas.util.testing import assert_frame_equal
 
 from . import base
@@ -21,6 +28,14 @@ TEST_PKL_SHAPE = (286, 942)  # dataframe shape after calculations (as stored)
 TEST_PLAINCSV = 'test/plain_data.csv'
 
 
+class _Unseekable(object):
+
+    """ File object which cannot seek, i.e. decompressed on the fly """
+
+    def __init__(self, contents):
+        self.read = BytesIO(contents).read
+
+
 class TestAuxiliaryFunctions(unittest.TestCase):
 
     """ Test auxiliary functions, do not require setting anything up
@@ -79,8 +94,10 @@ class TestDFTools(base.BaseTestClass):
 
     def test_extract_t4csv(self):
         """ Test function for _extract_t4csv """
-        with open(base.TEST_CSV, 'r') as filedescriptor:
+        with open(base.TEST_CSV, 'rb') as filedescriptor:
             (fields, data) = df_tools._extract_t4csv(filedescriptor)
+            self.assertIsInstance(data, df_tools.T4DataStream)
+            data = data.read().splitlines()
 
         self.assertIsInstance(fields, list)
         self.assertIsInstance(data, list)
@@ -94,6 +111,41 @@ class TestDFTools(base.BaseTestClass):
         self.assertIn('[DISK_BCK0]%Used', fields)
         self.assertIn('Counter01_message_External_Failure', fields)
 
+    def test_extract_t4csv_merged_file(self):
+        """
+        Test _extract_t4csv with a file containing repeated headers (t4 merge)
+        and a column average footer
+        """
+        with open(base.TEST_CSV, 'rb') as filedescriptor:
+            contents = filedescriptor.read().rstrip()
+        merged = BytesIO(b'\n'.join([contents,
+                                     contents,
+                                     b'Column Average,1.0,2.0',
+                                     contents]))
+        (fields, data) = df_tools._extract_t4csv(merged)
+        first_offset = data.data_offset
+        header_lines = len(contents.splitlines()) - TEST_CSV_SHAPE[0]
+        self.assertEqual(contents[:first_offset].count(b'\n'), header_lines)
+        self.assertEqual(len(data.read().splitlines()), TEST_CSV_SHAPE[0])
+        # The title line of the second file is not part of the samples
+        self.assertTrue(data.new_header)
+        self.assertListEqual(fields, data.read_header())
+        self.assertEqual(data.data_offset, len(contents) + 1 + first_offset)
+        self.assertEqual(len(data.read().splitlines()), TEST_CSV_SHAPE[0])
+        # Nothing is read past the footer
+        self.assertFalse(data.new_header)
+        self.assertEqual(data.read(), '')
+        merged.seek(0)
+        dataframe = df_tools.to_dataframe(*df_tools._extract_t4csv(merged))
+        self.assertTupleEqual(dataframe.shape, TEST_CSV_SHAPE)
+        # Same samples when chunked, whether the file can seek or not
+        for blocksize in (100, df_tools.READ_BLOCKSIZE):
+            for stream in (BytesIO(merged.getvalue()),
+                           _Unseekable(merged.getvalue())):
+                (fields, data) = df_tools._extract_t4csv(stream, blocksize)
+                chunks = df_tools.iter_dataframe(fields, data, chunksize=100)
+                assert_frame_equal(pd.concat(list(chunks)), dataframe)
+
     def test_select(self):
         """ Test function for select """
 
@@ -142,13 +194,14 @@ class TestDFTools(base.BaseTestClass):
 
     def test_todataframe(self):
         """ Test function for to_dataframe """
-        with open(base.TEST_CSV, 'r') as testcsv:
+        with open(base.TEST_CSV, 'rb') as testcsv:
             (field_names, data) = df_tools._extract_t4csv(testcsv)
-        dataframe = df_tools.to_dataframe(field_names, data)
+            # Missing header should return an empty DF
+            self.assertTrue(df_tools.to_dataframe([], data).empty)
+            # data is streamed from the file, parse it before closing it
+            dataframe = df_tools.to_dataframe(field_names, data)
         self.assertIsInstance(dataframe, pd.DataFrame)
         self.assertTupleEqual(dataframe.shape, TEST_CSV_SHAPE)
-        # Missing header should return an empty DF
-        self.assertTrue(df_tools.to_dataframe([], data).empty)
         # # Missing data should return an empty DF
         self.assertTrue(df_tools.to_dataframe(field_names, []).empty)
         my_df = df_tools.to_dataframe(['COL1', 'My Sample Time'],
@@ -162,14 +215,14 @@ class TestDFTools(base.BaseTestClass):
         """
         Test to_dataframe when a no header passed matching the datetime tag
         """
-        with open(base.TEST_CSV, 'r') as testcsv:
+        with open(base.TEST_CSV, 'rb') as testcsv:
             (field_names, data) = df_tools._extract_t4csv(testcsv)
-        # fake the header
-        df_timecol = next(s for s in field_names if
-                          df_tools.DATETIME_TAG in s)
-        field_names[field_names.index(df_timecol)] = 'time_index'
-        with self.assertRaises(df_tools.ToDfError):
-            df_tools.to_dataframe(field_names, data)
+            # fake the header
+            df_timecol = next(s for s in field_names if
+                              df_tools.DATETIME_TAG in s)
+            field_names[field_names.index(df_timecol)] = 'time_index'
+            with self.assertRaises(df_tools.ToDfError):
+                df_tools.to_dataframe(field_names, data)
 
     def test_dataframize(self):
         """ Test function for dataframize """
@@ -185,6 +238,153 @@ class TestDFTools(base.BaseTestClass):
         assert_frame_equal(pd.DataFrame(),
                            df_tools.dataframize('non-existing-file'))
 
+    def test_dataframize_chunks(self):
+        """ Test function for dataframize in chunked mode """
+        chunks = list(df_tools.dataframize(base.TEST_CSV,
+                                           logger=self.logger,
+                                           chunksize=100))
+        self.assertListEqual([chunk.shape for chunk in chunks],
+                             [(100, TEST_CSV_SHAPE[1]),
+                              (100, TEST_CSV_SHAPE[1]),
+                              (86, TEST_CSV_SHAPE[1])])
+        for chunk in chunks:
+            self.assertEqual(chunk.index.name, df_tools.DATETIME_TAG)
+        assert_frame_equal(pd.concat(chunks),
+                           df_tools.dataframize(base.TEST_CSV))
+        # non existing files yield nothing
+        self.assertListEqual(
+            list(df_tools.dataframize('non-existing-file', chunksize=100)),
+            []
+        )
+        # remote merged files are read only once, not scanned beforehand
+        with open(base.TEST_CSV, 'rb') as csvfile:
+            contents = csvfile.read().rstrip()
+        session = MagicMock(spec=SFTPClient)
+        session.prefetch_window = None
+        session.open.return_value = io.BytesIO(b'\n'.join([contents,
+                                                           contents]))
+        with patch.object(df_tools.T4DataStream,
+                          'skip_to_last_header') as skip_to_last_header:
+            chunks = list(df_tools.dataframize('remote.csv',
+                                               session=session,
+                                               chunksize=100))
+        self.assertFalse(skip_to_last_header.called)
+        assert_frame_equal(pd.concat(chunks),
+                           df_tools.dataframize(base.TEST_CSV))
+
+    def test_open_file(self):
+        """ Test function for open_file, with and without prefetching """
+        with df_tools.open_file(base.TEST_CSV) as local_file:
+            self.assertTrue(local_file.read().startswith(b'SYSTEM1'))
+        with df_tools.open_file(base.TEST_CSV, offset=2) as local_file:
+            self.assertEqual(local_file.read(5), b'STEM1')
+        # Remote files
+        session = MagicMock(spec=SFTPClient)
+        session.stat.return_value.st_size = 1000
+        session.prefetch_window = None
+        df_tools.open_file('remote.csv', session)
+        session.open.assert_called_once_with('remote.csv', 'rb')
+        self.assertFalse(session.open.return_value.prefetch.called)
+        # with pipelined reads
+        session.prefetch_window = 16
+        df_tools.open_file('remote.csv', session).prefetch\
+            .assert_called_once_with(1000, max_concurrent_requests=16)
+        session.open.return_value.reset_mock()
+        session.prefetch_window = 0  # no limit
+        df_tools.open_file('remote.csv', session).prefetch\
+            .assert_called_once_with(1000, max_concurrent_requests=None)
+        # not read ahead when reading from an offset
+        session.open.return_value.reset_mock()
+        df_tools.open_file('remote.csv', session, offset=10).seek\
+            .assert_called_once_with(10)
+        self.assertFalse(session.open.return_value.prefetch.called)
+        # the remote file is closed if it cannot be prepared
+        session.open.return_value.reset_mock()
+        session.stat.side_effect = IOError
+        with self.assertRaises(IOError):
+            df_tools.open_file('remote.csv', session)
+        session.open.return_value.close.assert_called_once_with()
+
+    def test_dataframize_buffer(self):
+        """ Test function for dataframize_buffer """
+        with open(base.TEST_CSV, 'rb') as csvfile:
+            data = csvfile.read()
+        assert_frame_equal(df_tools.dataframize_buffer(data, base.TEST_CSV),
+                           df_tools.dataframize(base.TEST_CSV))
+        # not a T4-CSV, should return empty DF
+        assert_frame_equal(pd.DataFrame(),
+                           df_tools.dataframize_buffer(b'not,a,t4csv\n'))
+
+    def test_dataframize_compressed(self):
+        """ Test function for dataframize with gzip, bz2 and xz files """
+        with open(base.TEST_CSV, 'rb') as csvfile:
+            contents = csvfile.read()
+        expected = df_tools.dataframize(base.TEST_CSV)
+        half = len(contents) // 2
+        gzip_data = BytesIO()
+        with gzip.GzipFile(fileobj=gzip_data, mode='wb') as compressed_file:
+            compressed_file.write(contents)
+        compressed = {'.gz': gzip_data.getvalue(),
+                      '.bz2': bz2.compress(contents)}
+        if df_tools.lzma:
+            compressed['.xz'] = df_tools.lzma.compress(contents)
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for (extension, data) in compressed.items():
+                for name in ('t4{0}'.format(extension),
+                             't4_without_extension'):  # magic bytes
+                    filename = os.path.join(temp_dir, name)
+                    with open(filename, 'wb') as compressed_file:
+                        compressed_file.write(data)
+                    assert_frame_equal(df_tools.dataframize(filename),
+                                       expected)
+                assert_frame_equal(df_tools.dataframize_buffer(data),
+                                   expected)
+            # multi-member gzip file, read in small blocks
+            filename = os.path.join(temp_dir, 't4_members.csv.gz')
+            for part in (contents[:half], contents[half:]):
+                with gzip.open(filename, 'ab') as compressed_file:
+                    compressed_file.write(part)
+            with open(filename, 'rb') as compressed_file:
+                decompressed = df_tools.DecompressedFile(compressed_file,
+                                                         'gzip',
+                                                         blocksize=1000)
+                self.assertEqual(decompressed.read(10), contents[:10])
+                self.assertEqual(decompressed.read(), contents[10:])
+                self.assertEqual(decompressed.read(), b'')
+            # two bzip2 streams (as written by pbzip2), the first one ending
+            # at the end of a read block
+            first = bz2.compress(contents[:half])
+            decompressed = df_tools.DecompressedFile(
+                BytesIO(first + bz2.compress(contents[half:])),
+                'bz2',
+                blocksize=len(first)
+            )
+            self.assertEqual(decompressed.read(), contents)
+            if df_tools.lzma:
+                first = df_tools.lzma.compress(contents[:half])
+                decompressed = df_tools.DecompressedFile(
+                    BytesIO(first + df_tools.lzma.compress(contents[half:])),
+                    'xz',
+                    blocksize=len(first)
+                )
+                self.assertEqual(decompressed.read(), contents)
+        finally:
+            base.delete_temporary_folder(temp_dir)
+        self.assertEqual(df_tools.get_codec('DSA3:[STATS]T4.CSV.GZ;3'),
+                         'gzip')
+        self.assertIsNone(df_tools.get_codec('t4.csv', b'PK\x03\x04'))
+
+    def test_dataframize_stream(self):
+        """ Test function for dataframize_stream """
+        with open(base.TEST_CSV, 'rb') as csvfile:
+            assert_frame_equal(df_tools.dataframize_stream(csvfile),
+                               df_tools.dataframize(base.TEST_CSV))
+            self.assertFalse(csvfile.closed)
+            csvfile.seek(0)
+            chunks = list(df_tools.dataframize_stream(csvfile, chunksize=200))
+        self.assertListEqual([len(chunk) for chunk in chunks], [200, 86])
+
     def test_consolidate_data(self):
         """ Test dataframe consolidation function """
         midx = pd.MultiIndex(levels=[[0, 1, 2, 3, 4], ['sys1']],
@@ -221,6 +421,72 @@ class TestDFTools(base.BaseTestClass):
         assert_frame_equal(df1, data.xs('sys1', level='system'))
         assert_frame_equal(df2, data.xs('sys2', level='system'))
 
+    def test_merge_dataframes(self):
+        """ Test merging dataframes as successive combine_first() calls """
+        df1 = pd.DataFrame({'B': [1.0, 2.0, 3.0], 'A': [1.0, np.nan, 3.0]},
+                           index=[0, 1, 2],
+                           columns=['B', 'A'])
+        df2 = pd.DataFrame({'A': [20.0, 30.0, 40.0], 'C': [2.0, 3.0, 4.0]},
+                           index=[3, 2, 1])
+        df3 = pd.DataFrame({'B': [50.0]}, index=[5])
+        # sorted union of the columns, whatever the pandas version
+        expected = df1.combine_first(df2).combine_first(df3)
+        merged = df_tools.merge_dataframes([df1, df2, df3])
+        assert_frame_equal(merged, expected.sort_index(axis=1))
+        self.assertListEqual(list(merged.columns), ['A', 'B', 'C'])
+        self.assertListEqual(list(merged.index), [0, 1, 2, 3, 5])
+        # empty dataframes are ignored, a single one is kept as it is
+        assert_frame_equal(df_tools.merge_dataframes([pd.DataFrame(), df2]),
+                           df2)
+        self.assertTrue(df_tools.merge_dataframes([]).empty)
+        # repeated index values are merged, null index values dropped
+        times = pd.to_datetime(['2016-01-01 00:05', '2016-01-01 00:00',
+                                '2016-01-01 00:05', None])
+        repeated = pd.DataFrame({'A': [np.nan, 1.0, 2.0, 3.0],
+                                 'B': [5.0, 6.0, 7.0, 8.0]},
+                                index=times)
+        merged = df_tools.merge_dataframes([repeated,
+                                            pd.DataFrame({'C': [1.0]},
+                                                         index=times[1:2])])
+        self.assertListEqual(list(merged.index), list(times[:2][::-1]))
+        self.assertListEqual(list(merged.A), [1.0, 2.0])
+        self.assertListEqual(list(merged.B), [6.0, 5.0])
+
+    def test_consolidate_systems(self):
+        """ Test consolidating the dataframes of several systems at once """
+        df1 = pd.DataFrame(np.random.randint(0, 10, (5, 3)),
+                           columns=['A', 'B', 'C'])
+        df1.index.name = df_tools.DATETIME_TAG
+        df2 = pd.DataFrame(np.random.randint(0, 10, (4, 2)),
+                           columns=['A', 'D'])
+        df2.index.name = df_tools.DATETIME_TAG
+
+        data = df_tools.consolidate_systems([('sys1', df1),
+                                             ('sys2', df2),
+                                             ('sys3', pd.DataFrame())])
+        self.assertTupleEqual(data.shape, (9, 4))
+        self.assertListEqual(list(data.index.get_level_values('system')
+                                  .unique()),
+                             ['sys1', 'sys2'])
+        # columns missing in the other system were filled with NaN (float)
+        assert_frame_equal(df1,
+                           data.xs('sys1', level='system')[df1.columns],
+                           check_dtype=False)
+        # Same result as consolidating one by one
+        data2 = df_tools.consolidate_data(df1, system='sys1')
+        data2 = df_tools.consolidate_data(df2, dataframe=data2, system='sys2')
+        assert_frame_equal(data, data2)
+        # Appending to an existing dataframe
+        data1 = data2.xs('sys1', level='system', drop_level=False)
+        data3 = df_tools.consolidate_systems({'sys2': df2}, dataframe=data1)
+        assert_frame_equal(data, data3)
+        # Bad input
+        with self.assertRaises(df_tools.ToDfError):
+            df_tools.consolidate_systems([(None, df1)])
+        with self.assertRaises(df_tools.ToDfError):
+            df_tools.consolidate_systems([('sys1', 'not a dataframe')])
+        self.assertTrue(df_tools.consolidate_systems({}).empty)
+
     def test_dataframe_to_t4csv(self):
         """ Test reverse conversion (dataframe to T4-CSV) """
 
@@ -12,7 +12,7 @@ import tempfile
 import six
 
 import pandas as pd
-from t4mon.gen_report import Report, gen_report
+from t4mon.gen_report import Report, gen_report, get_graphs_variables
 
 from . import base
 
@@ -74,6 +74,14 @@ class TestGenReport(base.BaseTestClass):
         with self.assertRaises(StopIteration):
             gen_report(self.my_container, '')
 
+    def test_get_graphs_variables(self):
+        """ Test function for get_graphs_variables """
+        variables = get_graphs_variables(base.TEST_GRAPHS_FILE)
+        self.assertListEqual(variables[:3], ['message_buffered',
+                                             'successful_FDA',
+                                             'length_message_cumulative'])
+        self.assertNotIn('', variables)
+
     def test_rendergraphs(self):
         """ Test function for render_graphs """
         _report = Report(self.my_container, self.system)
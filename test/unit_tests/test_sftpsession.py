@@ -0,0 +1,89 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+"""
+*t4mon* - T4 monitoring **test functions** for sftpsession.py
+"""
+from __future__ import absolute_import
+
+import unittest
+
+import paramiko
+from mock import MagicMock
+from t4mon.sftpsession import SftpSession, SftpSessionPool
+
+from . import base
+
+
+def _client(alive=True):
+    """ Mock an SSHClient with an open SFTP session """
+    client = MagicMock()
+    client.get_transport.return_value.is_active.return_value = alive
+    client.sftp_session.sock.closed = False
+    return client
+
+
+class TestSftpSessionPool(unittest.TestCase):
+
+    """ Set of test functions for sftpsession.SftpSessionPool """
+
+    def setUp(self):
+        self.pool = SftpSessionPool(logger=base.LOGGER)
+        self.key = ('127.0.0.1', 'user', 22)
+
+    def test_acquire_and_release(self):
+        """ Test function for SftpSessionPool.acquire and release """
+        self.assertIsNone(self.pool.acquire(self.key))
+        client = _client()
+        self.pool.release(self.key, client)
+        self.assertIsNone(self.pool.acquire(('127.0.0.1', 'user', 23)))
+        self.assertIs(self.pool.acquire(self.key), client)
+        client.get_transport.return_value.send_ignore.assert_called_once_with()
+        # handed out to a single session at a time
+        self.assertIsNone(self.pool.acquire(self.key))
+        self.assertEqual((self.pool.hits, self.pool.misses), (1, 3))
+
+    def test_broken_connections(self):
+        """ Test that broken connections are closed instead of reused """
+        (inactive, no_keepalive) = (_client(alive=False), _client())
+        no_keepalive.get_transport.return_value.send_ignore.side_effect = \
+            paramiko.SSHException
+        for client in (inactive, no_keepalive):
+            self.pool.release(self.key, client)
+        self.assertIsNone(self.pool.acquire(self.key))
+        for client in (inactive, no_keepalive):
+            client.close.assert_called_once_with()
+
+    def test_purge(self):
+        """ Test that idle connections are closed """
+        client = _client()
+        self.pool.release(self.key, client)
+        self.pool.purge()
+        client.close.assert_not_called()
+        self.pool.idle_timeout = 0
+        self.pool.purge()
+        client.sftp_session.close.assert_called_once_with()
+        client.close.assert_called_once_with()
+        self.assertIsNone(self.pool.acquire(self.key))
+
+    def test_session(self):
+        """ Test pooled connections handed out by SftpSession """
+        client = _client()
+        session = SftpSession('127.0.0.1',
+                              pool=self.pool,
+                              ssh_user='user',
+                              ssh_port=22,
+                              logger=base.LOGGER)
+        session.connect = MagicMock(side_effect=AssertionError)
+        self.pool.release(self.key, client)
+        with session as sftp_session:  # no new connection
+            self.assertIs(sftp_session, client.sftp_session)
+            self.assertIsNone(self.pool.acquire(self.key))
+        # back to the pool when done
+        self.assertIs(self.pool.acquire(self.key), client)
+        client.close.assert_not_called()
+        # unless explicitly closed, i.e. when cancelling a system
+        self.pool.release(self.key, client)
+        session.open()
+        session.close()
+        client.close.assert_called_once_with()
+        self.assertIsNone(self.pool.acquire(self.key))